@@ -0,0 +1,121 @@
+"""Benchmarks decoding Echidna byte strings and emitting unicode escapes on large payloads"""
+import re
+import time
+import random
+import argparse
+from typing import Any, Callable
+
+from fuzz_utils.utils.encoding import (
+    ascii_escape_map,
+    byte_to_escape_sequence,
+    parse_echidna_byte_string,
+)
+
+# The names Haskell uses to show control characters, e.g. `\DLE`
+SHOWN_NAMES = {byte[0]: seq for seq, byte in ascii_escape_map.items() if len(seq) > 2}
+
+
+def legacy_parse_echidna_byte_string(s: str, isBytes: bool) -> str:
+    """
+    The previous implementation, which tries every escape sequence for each backslash, reading the escapes like Haskell:
+    a decimal escape takes all the following digits, and `\\&` is an empty escape
+    """
+    result_bytes = bytearray()
+    decimal_pattern = re.compile(r"\\([0-9]+)")
+    i = 0
+    while i < len(s):
+        if s[i] == "\\":
+            dec_match = decimal_pattern.match(s, i)
+            if dec_match:
+                result_bytes.append(int(dec_match.group(1)))
+                i += len(dec_match.group(0))
+                continue
+            matched = False
+            for seq, byte in ascii_escape_map.items():
+                if s.startswith(seq, i):
+                    result_bytes.extend(byte)
+                    i += len(seq)
+                    matched = True
+                    break
+            if not matched:
+                # `\&` is empty, other characters like `\\` and `\"` are escaped by the backslash
+                i += 1
+                if i < len(s) and s[i] != "&":
+                    result_bytes.append(ord(s[i]))
+                i += 1
+        else:
+            result_bytes.append(ord(s[i]))
+            i += 1
+
+    if not isBytes:
+        return legacy_byte_to_escape_sequence(bytes(result_bytes))
+    return result_bytes.hex()
+
+
+def legacy_byte_to_escape_sequence(byte_data: bytes) -> str:
+    """The previous implementation, which formats each byte separately"""
+    arr = []
+    for b in byte_data:
+        arr.append(f"\\u{b:04x}")
+    return "".join(arr)
+
+
+def show_bytes(data: bytes) -> str:
+    """Returns the bytes as Haskell shows them in Echidna corpora"""
+    shown: list[str] = []
+    for value in data:
+        # Haskell separates a decimal escape from a following digit with `\&`
+        if shown and shown[-1][-1].isdigit() and shown[-1][0] == "\\" and chr(value).isdigit():
+            shown.append("\\&")
+        # `\\SO` is separated from a following `H`, so it isn't read as `\\SOH`
+        if shown and shown[-1] == "\\SO" and value == ord("H"):
+            shown.append("\\&")
+        if 32 <= value < 127 and chr(value) not in '"\\':
+            shown.append(chr(value))
+        elif value in SHOWN_NAMES:
+            shown.append(SHOWN_NAMES[value])
+        else:
+            shown.append(f"\\{value}")
+    return "".join(shown)
+
+
+def time_call(function: Callable[..., str], *args: Any) -> tuple[float, str]:
+    """Returns the seconds taken by the call, and its result"""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    """Runs the benchmark and checks that both implementations return the same literals"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1 << 20, help="Payload size in bytes.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random payload.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    data = bytes(rng.getrandbits(8) for _ in range(args.size))
+    shown = show_bytes(data)
+
+    for is_bytes, kind in ((True, "bytes"), (False, "string")):
+        legacy, expected = time_call(legacy_parse_echidna_byte_string, shown, is_bytes)
+        current, result = time_call(parse_echidna_byte_string, shown, is_bytes)
+        assert result == expected
+        if is_bytes:
+            assert result == data.hex()
+        print(
+            f"parse_echidna_byte_string ({kind}, {args.size} bytes): legacy {legacy:.3f}s, "
+            f"current {current:.3f}s, {legacy / current:.1f}x faster"
+        )
+
+    legacy, expected = time_call(legacy_byte_to_escape_sequence, data)
+    current, result = time_call(byte_to_escape_sequence, data)
+    assert result == expected
+    print(
+        f"byte_to_escape_sequence ({args.size} bytes): legacy {legacy:.3f}s, "
+        f"current {current:.3f}s, {legacy / current:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmarks loading and unpacking the test data corpora with the stdlib `json` path and the typed msgspec path"""
+import os
+import glob
+import json
+import time
+import argparse
+from functools import partial
+from typing import Any, Callable
+
+from fuzz_utils.utils.corpus_decoding import (
+    decode_corpus_file,
+    has_fast_decoding,
+    unpack_echidna_call,
+    unpack_medusa_call,
+)
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "test_data")
+CORPORA: dict[str, tuple[str, Callable[[Any], tuple]]] = {
+    "Echidna": ("echidna-corpora/*/*/*.txt", unpack_echidna_call),
+    "Medusa": ("medusa-corpora/*/*/**/*.json", unpack_medusa_call),
+}
+
+
+def load_corpus_files(pattern: str) -> list[bytes]:
+    """Returns the content of the test data corpus files matching the pattern"""
+    files: list[bytes] = []
+    for path in glob.glob(os.path.join(TEST_DATA_DIR, pattern), recursive=True):
+        with open(path, "rb") as file:
+            files.append(file.read())
+    return files
+
+
+def time_decoding(
+    files: list[bytes], decode: Callable[[bytes], Any], unpack: Callable[[Any], tuple]
+) -> float:
+    """Returns the seconds taken to decode every corpus file and unpack each of its calls"""
+    start = time.perf_counter()
+    for data in files:
+        for call in decode(data):
+            unpack(call)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Runs the benchmark for each fuzzer and prints the speedup of the typed path"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Number of copies of the test corpora to decode."
+    )
+    args = parser.parse_args()
+
+    if not has_fast_decoding():
+        print("msgspec is not installed, install it with `pip install fuzz-utils[fast]`")
+        return
+
+    for fuzzer_name, (pattern, unpack) in CORPORA.items():
+        files = load_corpus_files(pattern) * args.repeat
+        size = sum(len(data) for data in files) / 1024 / 1024
+        decode_typed = partial(decode_corpus_file, fuzzer_name=fuzzer_name)
+        # Warm up both paths before timing them
+        time_decoding(files[:10], json.loads, unpack)
+        time_decoding(files[:10], decode_typed, unpack)
+
+        stdlib = time_decoding(files, json.loads, unpack)
+        typed = time_decoding(files, decode_typed, unpack)
+        print(
+            f"{fuzzer_name}: {len(files)} files ({size:.1f} MB), json {stdlib:.3f}s, "
+            f"msgspec {typed:.3f}s, {stdlib / typed:.2f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Benchmarks the end-to-end generation of unit tests from synthetic corpora of increasing size, for each fuzzer.
+Reports the throughput of `FoundryTest.create_poc`, the latency of the decoding, parsing, and rendering stages, and the
+peak RSS, and saves the results as JSON so they can be compared between commits
+"""
+import os
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from multiprocessing.connection import Connection
+from typing import Any
+
+from slither import Slither
+from fuzz_utils.generate.FoundryTest import FoundryTest
+from fuzz_utils.generate.call_sequence import render_sequence
+from fuzz_utils.generate.fuzzers.Echidna import Echidna
+from fuzz_utils.generate.fuzzers.Medusa import Medusa
+from fuzz_utils.utils.compile_cache import load_slither
+from fuzz_utils.utils.corpus_decoding import decode_corpus_file
+
+TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tests", "test_data"))
+TARGET = "BasicTypes"
+TARGET_PATH = f"./src/{TARGET}.sol"
+# The seed corpus files that the calls of the synthetic sequences are sampled from, and the corpus directory the
+# synthetic sequences are written to
+FUZZERS: dict[str, tuple[type[Echidna] | type[Medusa], str, str, str]] = {
+    "Echidna": (Echidna, "echidna-corpora/corpus-basic", "coverage", ".txt"),
+    "Medusa": (Medusa, "medusa-corpora/corpus-basic", "call_sequences/immutable", ".json"),
+}
+MAX_SEQUENCE_LENGTH = 10
+
+
+def load_seed_calls(corpus_dir: str) -> list[Any]:
+    """Returns every call of the seed corpus files, which the synthetic sequences are made of"""
+    calls: list[Any] = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.*"), recursive=True)):
+        with open(path, "rb") as file:
+            calls.extend(json.loads(file.read()))
+    return calls
+
+
+def write_synthetic_corpus(
+    seed_calls: list[Any], corpus_dir: str, sequences: int, extension: str, seed: int
+) -> None:
+    """Writes sequences made of random seed calls, so the corpus is the same for every run with the same seed"""
+    rng = random.Random(seed)
+    os.makedirs(corpus_dir, exist_ok=True)
+    for idx in range(sequences):
+        calls = rng.choices(seed_calls, k=rng.randint(1, MAX_SEQUENCE_LENGTH))
+        with open(os.path.join(corpus_dir, f"{idx}{extension}"), "w", encoding="utf-8") as file:
+            json.dump(calls, file)
+
+
+# pylint: disable=too-many-locals
+def run_case(
+    fuzzer_name: str, corpus_path: str, tests_dir: str, jobs: int, slither: Slither
+) -> dict[str, Any]:
+    """Generates the tests of a synthetic corpus, then times each stage separately on the same corpus files"""
+    fuzzer_class, _, sequences_dir, _ = FUZZERS[fuzzer_name]
+    config = {
+        "targetContract": TARGET,
+        "inheritancePath": f"../src/{TARGET}.sol",
+        "corpusDir": corpus_path,
+        "testsDir": tests_dir,
+        "allSequences": True,
+        "jobs": jobs,
+    }
+    start = time.perf_counter()
+    FoundryTest(config, slither, fuzzer_class(TARGET, corpus_path, slither, False)).create_poc()
+    elapsed = time.perf_counter() - start
+    # The peak RSS of the generation, including the worker processes that parsed the corpus
+    peak_rss = (
+        max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        / 1024
+    )
+
+    fuzzer = fuzzer_class(TARGET, corpus_path, slither, False)
+    stages = {"read": 0.0, "decode": 0.0, "parse": 0.0, "render": 0.0}
+    files = sorted(glob.glob(os.path.join(corpus_path, sequences_dir, "*")))
+    for idx, path in enumerate(files):
+        stage_start = time.perf_counter()
+        with open(path, "rb") as file:
+            data = file.read()
+        read_end = time.perf_counter()
+        content = decode_corpus_file(data, fuzzer.name)
+        decode_end = time.perf_counter()
+        sequence = fuzzer.parse_call_sequence(content)
+        parse_end = time.perf_counter()
+        render_sequence(sequence, path, idx)
+        render_end = time.perf_counter()
+        stages["read"] += read_end - stage_start
+        stages["decode"] += decode_end - read_end
+        stages["parse"] += parse_end - decode_end
+        stages["render"] += render_end - parse_end
+
+    return {
+        "fuzzer": fuzzer_name,
+        "sequences": len(files),
+        "jobs": jobs,
+        "seconds": elapsed,
+        "sequencesPerSecond": len(files) / elapsed,
+        "stageMicrosecondsPerSequence": {
+            stage: seconds / len(files) * 1e6 for stage, seconds in stages.items()
+        },
+        "peakRssMb": peak_rss,
+    }
+
+
+def run_case_in_process(connection: Connection, *args: Any) -> None:
+    """Runs a case in a forked process, so its peak RSS isn't raised by the previous cases"""
+    connection.send(run_case(*args))
+    connection.close()
+
+
+def get_commit() -> str | None:
+    """Returns the commit of the benchmarked tree, if it is a git repository"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare_results(results: list[dict[str, Any]], previous_path: str) -> None:
+    """Prints the throughput of each case relative to the same case in a previous results file"""
+    with open(previous_path, "r", encoding="utf-8") as file:
+        previous = json.load(file)
+    baseline = {
+        (result["fuzzer"], result["sequences"], result["jobs"]): result
+        for result in previous["results"]
+    }
+    print(f"Compared to {previous_path} ({previous.get('commit')}):")
+    for result in results:
+        old = baseline.get((result["fuzzer"], result["sequences"], result["jobs"]))
+        if old is None:
+            continue
+        print(
+            f"  {result['fuzzer']} {result['sequences']}: {old['sequencesPerSecond']:.0f} -> "
+            f"{result['sequencesPerSecond']:.0f} sequences/s "
+            f"({result['sequencesPerSecond'] / old['sequencesPerSecond']:.2f}x), peak RSS "
+            f"{old['peakRssMb']:.0f} -> {result['peakRssMb']:.0f} MB"
+        )
+
+
+# pylint: disable=too-many-locals
+def main() -> None:
+    """Runs the benchmark for each fuzzer and corpus size, and saves the results"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Number of sequences of the synthetic corpora.",
+    )
+    parser.add_argument(
+        "--fuzzers", nargs="+", default=list(FUZZERS), choices=list(FUZZERS), help="Fuzzers to run."
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Number of processes used to parse the corpus."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpora.")
+    parser.add_argument(
+        "--output", default="benchmark-results.json", help="Path of the JSON results file."
+    )
+    parser.add_argument("--compare", help="Path of a previous JSON results file to compare with.")
+    args = parser.parse_args()
+    # The paths are relative to the directory the benchmark is run from, not the test data directory
+    output = os.path.abspath(args.output)
+    compare = os.path.abspath(args.compare) if args.compare else None
+
+    os.chdir(TEST_DATA_DIR)
+    # Slither is loaded once from the test contracts, and reused from the compilation cache by later runs
+    slither = load_slither(TARGET_PATH, True)
+    context = multiprocessing.get_context("fork")
+    results: list[dict[str, Any]] = []
+
+    work_dir = tempfile.mkdtemp(prefix="fuzz-utils-bench-")
+    try:
+        for fuzzer_name in args.fuzzers:
+            _, seed_dir, sequences_dir, extension = FUZZERS[fuzzer_name]
+            seed_calls = load_seed_calls(seed_dir)
+            for size in args.sizes:
+                corpus_path = os.path.join(work_dir, f"{fuzzer_name}-{size}")
+                tests_dir = os.path.join(work_dir, f"{fuzzer_name}-{size}-tests")
+                os.makedirs(tests_dir)
+                write_synthetic_corpus(
+                    seed_calls, os.path.join(corpus_path, sequences_dir), size, extension, args.seed
+                )
+
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=run_case_in_process,
+                    args=(sender, fuzzer_name, corpus_path, tests_dir, args.jobs, slither),
+                )
+                process.start()
+                result = receiver.recv()
+                process.join()
+                results.append(result)
+                stages = ", ".join(
+                    f"{stage} {latency:.0f}us"
+                    for stage, latency in result["stageMicrosecondsPerSequence"].items()
+                )
+                print(
+                    f"{fuzzer_name} {size}: {result['sequencesPerSecond']:.0f} sequences/s "
+                    f"({result['seconds']:.2f}s), {stages}, peak RSS {result['peakRssMb']:.0f} MB"
+                )
+                shutil.rmtree(corpus_path)
+                shutil.rmtree(tests_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "commit": get_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    print(f"Saved the results to {output}")
+
+    if compare:
+        compare_results(results, compare)
+
+
+if __name__ == "__main__":
+    main()
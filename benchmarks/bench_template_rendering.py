@@ -0,0 +1,54 @@
+"""Benchmarks the per-call cost of rendering the unit test templates, compiling them per call versus once"""
+import time
+import argparse
+from typing import Callable
+import jinja2
+
+from fuzz_utils.templates.foundry_templates import templates
+from fuzz_utils.templates.template_cache import get_template
+
+CALL_ARGS = {
+    "warp": True,
+    "roll": True,
+    "prank": True,
+    "time_delay": 570987,
+    "block_delay": 27285,
+    "caller": "0x0000000000000000000000000000000000010000",
+    "value": 0,
+    "function_parameters": "uint256(5), true",
+    "function_name": "check_uint256",
+}
+TEST_ARGS = {
+    "function_name": "check_uint256_0",
+    "call_list": ["vm.prank(0x0000000000000000000000000000000000010000);"] * 5,
+    "file_path": "corpus/reproducers/0.txt",
+    "has_low_level_call": False,
+}
+
+
+def time_renders(name: str, count: int, get: Callable[[str], jinja2.Template]) -> float:
+    """Returns the average microseconds taken to get and render the template"""
+    args = CALL_ARGS if name == "CALL" else TEST_ARGS
+    start = time.perf_counter()
+    for _ in range(count):
+        get(templates[name]).render(**args)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark for the templates rendered for each call and each test"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000, help="Number of renders per template.")
+    args = parser.parse_args()
+
+    for name in ("CALL", "TEST"):
+        compiled_per_call = time_renders(name, args.count, jinja2.Template)
+        cached = time_renders(name, args.count, get_template)
+        print(
+            f"{name}: compiled per call {compiled_per_call:.1f}us, cached {cached:.1f}us, "
+            f"{compiled_per_call / cached:.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
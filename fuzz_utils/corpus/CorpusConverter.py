@@ -0,0 +1,345 @@
+"""The CorpusConverter class that converts call sequences between the Echidna and Medusa corpus formats"""
+import os
+import json
+import uuid
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterator
+
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_utils import to_checksum_address
+from fuzz_utils.corpus.CorpusSynthesizer import SEQUENCE_DIRS, abi_type, echidna_call, medusa_call
+from fuzz_utils.generate.run_metrics import SequenceError, sequence_error
+from fuzz_utils.utils.corpus_decoding import (
+    decode_corpus_file,
+    unpack_echidna_call,
+    unpack_medusa_call,
+)
+from fuzz_utils.utils.encoding import parse_echidna_byte_string
+from fuzz_utils.utils.error_handler import (
+    CorpusFormatError,
+    UnknownFunctionError,
+    UnknownTagError,
+    handle_exit,
+)
+from fuzz_utils.utils.file_manager import atomic_open
+from fuzz_utils.utils.target_snapshot import ContractSnapshot, FunctionSnapshot, index_entry_points
+
+# The directories, relative to the corpus directory, that hold the call sequences of each fuzzer
+CORPUS_DIRS = {
+    "echidna": ["coverage", "reproducers"],
+    "medusa": [
+        os.path.join("call_sequences", "immutable"),
+        os.path.join("call_sequences", "mutable"),
+        "test_results",
+    ],
+}
+# The names of the fuzzers used by the typed corpus records
+FUZZER_NAMES = {"echidna": "Echidna", "medusa": "Medusa"}
+# The number of corpus files sent to a worker process at once
+CONVERT_BATCH_SIZE = 16
+
+
+class CorpusConverter:
+    """
+    Converts call sequences from the corpus format of one fuzzer to the format of the other, so that a campaign can be
+    warm-started with the corpus of the other fuzzer. The calls are matched to the entry points of the target, whose
+    parameter types are used to decode and encode the values
+    """
+
+    def __init__(self, target: ContractSnapshot, from_fuzzer: str, to_fuzzer: str) -> None:
+        self.from_fuzzer = from_fuzzer.lower()
+        self.to_fuzzer = to_fuzzer.lower()
+        for fuzzer in (self.from_fuzzer, self.to_fuzzer):
+            if fuzzer not in CORPUS_DIRS:
+                handle_exit(
+                    f"\n* The requested fuzzer {fuzzer} is not supported. Supported fuzzers: echidna, medusa."
+                )
+        if self.from_fuzzer == self.to_fuzzer:
+            handle_exit("The corpus can only be converted to the format of the other fuzzer.")
+        self.target = target
+        self.entry_points_by_name, self.entry_points_by_selector = index_entry_points(target)
+        # The ABI decoder of the parameters of each entry point, built the first time it is called
+        self.decoders: dict[str, TupleDecoder] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Each worker process builds its own decoders
+        state = self.__dict__.copy()
+        state["decoders"] = {}
+        return state
+
+    def convert_corpus(
+        self, corpus_dir: str, output_dir: str, jobs: int
+    ) -> tuple[str, int, list[SequenceError]]:
+        """
+        Converts the call sequences of the corpus directory, and writes them to the sequence directory of the other
+        fuzzer in the output directory. The corpus files are streamed, and converted in `jobs` processes. Returns the
+        sequence directory, the number of converted files, and the errors of the files that were skipped
+        """
+        sequence_dir = os.path.join(output_dir, SEQUENCE_DIRS[self.to_fuzzer])
+        os.makedirs(sequence_dir, exist_ok=True)
+        file_paths = self._corpus_files(corpus_dir)
+        results: Iterator[tuple[str | None, SequenceError | None]]
+        if jobs > 1:
+            results = _convert_in_parallel(self, file_paths, sequence_dir, jobs)
+        else:
+            results = (_convert_file(self, file_path, sequence_dir) for file_path in file_paths)
+
+        converted = 0
+        errors: list[SequenceError] = []
+        for output_path, error in results:
+            if error is not None:
+                errors.append(error)
+            elif output_path is not None:
+                converted += 1
+        return sequence_dir, converted, errors
+
+    def convert_file(self, file_path: str, sequence_dir: str) -> str:
+        """
+        Converts a corpus file and returns the path of the converted file. The name of the converted file is derived
+        from the content of the corpus file, so converting a corpus again overwrites the same files
+        """
+        with open(file_path, "rb") as file:
+            data = file.read()
+        sequence = self.convert_sequence(decode_corpus_file(data, FUZZER_NAMES[self.from_fuzzer]))
+
+        digest = hashlib.sha256(data).digest()
+        if self.to_fuzzer == "echidna":
+            file_name = f"{int.from_bytes(digest[:8], 'big') >> 1}.txt"
+        else:
+            file_name = f"{uuid.UUID(bytes=digest[:16], version=4)}.json"
+        output_path = os.path.join(sequence_dir, file_name)
+        # Encoding the whole sequence at once is much faster than streaming it with `json.dump`
+        with atomic_open(output_path) as outfile:
+            outfile.write(json.dumps(sequence))
+        return output_path
+
+    def convert_sequence(self, calls: Any) -> list[dict]:
+        """Returns the call sequence in the corpus format of the other fuzzer"""
+        if self.from_fuzzer == "echidna":
+            converted = self._convert_echidna_sequence(calls)
+        else:
+            converted = self._convert_medusa_sequence(calls)
+        if not converted:
+            raise CorpusFormatError("The call sequence has no calls that can be converted")
+        return converted
+
+    def _corpus_files(self, corpus_dir: str) -> Iterator[str]:
+        """Yields the paths of the call sequences in the corpus directory"""
+        for directory in CORPUS_DIRS[self.from_fuzzer]:
+            directory = os.path.join(corpus_dir, directory)
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        yield os.path.join(directory, entry.name)
+
+    def _convert_echidna_sequence(self, calls: Any) -> list[dict]:
+        """
+        Converts Echidna calls to Medusa calls. Medusa only calls the functions of the target, so Echidna empty calls
+        and transfers are skipped, and their delays are added to the delays of the next call
+        """
+        converted: list[dict] = []
+        # Medusa increments the nonce of each sender with every call
+        nonces: dict[str, int] = {}
+        time_delay, block_delay = 0, 0
+        for call in calls:
+            (
+                call_time_delay,
+                call_block_delay,
+                value,
+                caller,
+                function_name,
+                function_parameters,
+            ) = unpack_echidna_call(call)
+            time_delay += call_time_delay
+            block_delay += call_block_delay
+            # The function name is None for empty calls, and empty for transfers
+            if not function_name:
+                continue
+
+            nonce = nonces.get(caller, 0)
+            nonces[caller] = nonce + 1
+            converted.append(
+                self._to_medusa_call(
+                    function_name,
+                    function_parameters,
+                    caller,
+                    nonce,
+                    value,
+                    time_delay,
+                    block_delay,
+                )
+            )
+            time_delay, block_delay = 0, 0
+
+        # The delays after the last call are dropped: Medusa applies the delays of a call before making it, so it can't
+        # represent them, and adding them to the last call would change when it is made
+        return converted
+
+    def _to_medusa_call(
+        self,
+        function_name: str,
+        function_parameters: list[Any],
+        caller: str,
+        nonce: int,
+        value: int,
+        time_delay: int,
+        block_delay: int,
+    ) -> dict:
+        """Returns the Medusa call of an Echidna call to a function of the target"""
+        entry_point = self._echidna_entry_point(function_name, function_parameters)
+        values = [_decode_echidna_value(parameter) for parameter in function_parameters]
+        return medusa_call(
+            entry_point,
+            values,
+            caller,
+            nonce,
+            value if entry_point.payable else 0,
+            time_delay,
+            block_delay,
+        )
+
+    def _convert_medusa_sequence(self, calls: Any) -> list[dict]:
+        """Converts Medusa calls to Echidna calls"""
+        converted: list[dict] = []
+        for call in calls:
+            (
+                time_delay,
+                block_delay,
+                value,
+                caller,
+                data,
+                method_name,
+                method_signature,
+            ) = unpack_medusa_call(call)
+            entry_point = self._medusa_entry_point(data, method_name, method_signature)
+            values: list[Any] = []
+            if entry_point.parameters:
+                decoder = self._get_decoder(entry_point)
+                values = list(decoder(ContextFramesBytesIO(bytes.fromhex(data[10:]))))  # type: ignore[no-untyped-call]
+            converted.append(
+                echidna_call(
+                    entry_point,
+                    values,
+                    caller,
+                    value if entry_point.payable else 0,
+                    time_delay,
+                    block_delay,
+                )
+            )
+        return converted
+
+    def _get_decoder(self, entry_point: FunctionSnapshot) -> TupleDecoder:
+        """Returns the ABI decoder of the parameters of an entry point"""
+        decoder = self.decoders.get(entry_point.selector)
+        if decoder is None:
+            types = [abi_type(parameter.type) for parameter in entry_point.parameters]
+            decoder = self.decoders[entry_point.selector] = registry.get_tuple_decoder(*types)
+        return decoder
+
+    def _echidna_entry_point(self, function_name: str, parameters: list[Any]) -> FunctionSnapshot:
+        """Returns the entry point of an Echidna call, whose overloads are told apart by their number of parameters"""
+        overloads = self.entry_points_by_name.get(function_name, [])
+        for entry_point in overloads:
+            if len(entry_point.parameters) == len(parameters):
+                return entry_point
+        raise UnknownFunctionError(
+            f"Slither could not find the function `{function_name}` with {len(parameters)} parameters specified in the call object"
+        )
+
+    def _medusa_entry_point(
+        self, data: str, method_name: str | None, method_signature: str | None
+    ) -> FunctionSnapshot:
+        """Returns the entry point of a Medusa call, identified by its selector, or by its name if it isn't known"""
+        entry_point = self.entry_points_by_selector.get(data[:10].lower())
+        if entry_point is not None:
+            return entry_point
+        function_name = method_name or (method_signature or "").split("(")[0]
+        overloads = self.entry_points_by_name.get(function_name)
+        if not overloads:
+            raise UnknownFunctionError(
+                f"Slither could not find the function `{function_name}` specified in the call object"
+            )
+        return overloads[-1]
+
+
+# pylint: disable=too-many-return-statements
+def _decode_echidna_value(parameter: dict) -> Any:
+    """Returns the value of a tagged Echidna parameter, in the representation used to ABI encode it"""
+    contents: Any = parameter.get("contents")
+    match parameter["tag"]:
+        case "AbiBool":
+            return contents
+        case "AbiUInt" | "AbiInt":
+            return int(contents[1])
+        case "AbiAddress":
+            return to_checksum_address(contents)
+        case "AbiBytes":
+            return bytes.fromhex(parse_echidna_byte_string(contents[1].strip('"'), True))
+        case "AbiBytesDynamic" | "AbiString":
+            return bytes.fromhex(parse_echidna_byte_string(contents.strip('"'), True))
+        case "AbiArray":
+            return [_decode_echidna_value(element) for element in contents[2]]
+        case "AbiArrayDynamic":
+            return [_decode_echidna_value(element) for element in contents[1]]
+        case "AbiTuple":
+            return tuple(_decode_echidna_value(element) for element in contents)
+    raise UnknownTagError(f"Unknown parameter tag {parameter['tag']}")
+
+
+def _convert_file(
+    converter: CorpusConverter, file_path: str, sequence_dir: str
+) -> tuple[str | None, SequenceError | None]:
+    """Converts a corpus file, and returns the path of the converted file or the error of the conversion"""
+    try:
+        return converter.convert_file(file_path, sequence_dir), None
+    # A sequence that can't be converted is skipped, so it doesn't discard the rest of the corpus
+    except Exception as e:  # pylint: disable=broad-except
+        return None, sequence_error(file_path, "convert", e)
+
+
+def _convert_in_parallel(
+    converter: CorpusConverter, file_paths: Iterator[str], sequence_dir: str, jobs: int
+) -> Iterator[tuple[str | None, SequenceError | None]]:
+    """
+    Converts the corpus files in a process pool. Only a bounded number of batches is in flight at once, so the paths
+    of the corpus files are never fully listed in memory
+    """
+    max_pending = 2 * jobs
+    pending: deque[Future] = deque()
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(converter, sequence_dir)
+    ) as executor:
+        while True:
+            batch = list(islice(file_paths, CONVERT_BATCH_SIZE))
+            if not batch:
+                break
+            pending.append(executor.submit(_convert_in_worker, batch))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# The converter and sequence directory used by a worker process, set once when the process pool starts
+_worker_converter: CorpusConverter
+_worker_sequence_dir: str
+
+
+def _init_worker(converter: CorpusConverter, sequence_dir: str) -> None:
+    """Stores the converter in the worker process so it isn't pickled for every batch"""
+    global _worker_converter, _worker_sequence_dir  # pylint: disable=global-statement
+    _worker_converter = converter
+    _worker_sequence_dir = sequence_dir
+
+
+def _convert_in_worker(batch: list[str]) -> list[tuple[str | None, SequenceError | None]]:
+    """Converts a batch of corpus files in a worker process, which reads and writes the files itself"""
+    return [
+        _convert_file(_worker_converter, file_path, _worker_sequence_dir) for file_path in batch
+    ]
@@ -0,0 +1,407 @@
+"""The CorpusSynthesizer class that generates random call sequences in the fuzzer corpus formats"""
+import os
+import copy
+import json
+import uuid
+import random
+from typing import Any, Iterator
+
+from eth_abi import encode
+from eth_utils import to_checksum_address
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.encoding import bytes_to_echidna_byte_string
+from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.file_manager import atomic_open
+from fuzz_utils.utils.target_snapshot import (
+    ArrayTypeSnapshot,
+    ContractSnapshot,
+    ElementaryTypeSnapshot,
+    EnumTypeSnapshot,
+    FunctionSnapshot,
+    StructTypeSnapshot,
+    TypeSnapshot,
+)
+from fuzz_utils.templates.default_config import default_config
+
+# The addresses the fuzzers deploy the target contract to by default
+ECHIDNA_TARGET_ADDRESS = "0x00a329c0648769A73afAc7F9381E08FB43dBEA72"
+MEDUSA_TARGET_ADDRESS = "0xa647ff3c36cfab592509e13860ab8c4f28781a66"
+GAS_LIMIT = 12500000
+# The directory, relative to the corpus directory, that the synthetic sequences are written to
+SEQUENCE_DIRS = {"echidna": "coverage", "medusa": os.path.join("call_sequences", "immutable")}
+LENGTH_DISTRIBUTIONS = ("uniform", "geometric")
+# Fallback and receive functions aren't called by name, so they aren't part of the synthetic sequences
+UNNAMED_ENTRY_POINTS = ("fallback", "receive")
+# The characters of the synthetic strings, including multi-byte UTF-8 characters
+STRING_ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 _-.,:;!?\"\\'\n\téü€♥𝔘"
+)
+MAX_BYTES_LENGTH = 64
+
+
+def synthesize_corpus(
+    target: ContractSnapshot, fuzzer: str, sequences: int, config: dict | None = None
+) -> Iterator[list[dict]]:
+    """
+    Yields random but valid call sequences to the entry points of the target, in the corpus format of the fuzzer.
+    The sequences only depend on the target and the configuration, including its `seed`
+    """
+    synthesizer = CorpusSynthesizer(target, fuzzer, config or {})
+    for _ in range(sequences):
+        yield synthesizer.generate_sequence()
+
+
+# pylint: disable=too-few-public-methods
+class CorpusSynthesizer:
+    """
+    Generates random call sequences to the entry points of a target, with ABI values derived from the types of their
+    parameters, and writes them in the Echidna or Medusa corpus format
+    """
+
+    config: dict = copy.deepcopy(default_config["corpus"])
+
+    def __init__(self, target: ContractSnapshot, fuzzer: str, config: dict) -> None:
+        self.config = copy.deepcopy(CorpusSynthesizer.config)
+        for key, value in config.items():
+            if key in self.config:
+                self.config[key] = value
+
+        self.fuzzer = fuzzer.lower()
+        if self.fuzzer not in SEQUENCE_DIRS:
+            handle_exit(
+                f"\n* The requested fuzzer {fuzzer} is not supported. Supported fuzzers: echidna, medusa."
+            )
+        if self.config["lengthDistribution"] not in LENGTH_DISTRIBUTIONS:
+            handle_exit(
+                f"The length distribution {self.config['lengthDistribution']} is not supported. Supported distributions: {', '.join(LENGTH_DISTRIBUTIONS)}."
+            )
+        if not 0 < self.config["minLength"] <= self.config["maxLength"]:
+            handle_exit(
+                "The minimum sequence length must be positive and at most the maximum length."
+            )
+
+        self.rng = random.Random(self.config["seed"])
+        # The senders can be written in the short form of the fuzzers' configurations, e.g. `0x10000`
+        self.senders = [
+            to_checksum_address(f"0x{int(sender, 16):040x}") for sender in self.config["senders"]
+        ]
+        self.entry_points: list[FunctionSnapshot] = []
+        for entry_point in target.functions_entry_points:
+            if entry_point.name in UNNAMED_ENTRY_POINTS:
+                continue
+            if all(_is_supported(parameter.type) for parameter in entry_point.parameters):
+                self.entry_points.append(entry_point)
+            else:
+                CryticPrint().print_warning(
+                    f"Skipping {entry_point.name}, the types of its parameters can't be synthesized."
+                )
+        if not self.entry_points:
+            handle_exit(f"The target {target.name} has no entry points that can be called.")
+        # Medusa increments the nonce of each sender with every call
+        self.nonces: dict[str, int] = {}
+
+    def generate_sequence(self) -> list[dict]:
+        """Returns a random call sequence in the corpus format of the fuzzer"""
+        self.nonces = {}
+        return [self._generate_call() for _ in range(self._sequence_length())]
+
+    def write_corpus(self, corpus_dir: str, sequences: int) -> str:
+        """Writes the random call sequences to the corpus directory, and returns the directory they were written to"""
+        sequence_dir = os.path.join(corpus_dir, SEQUENCE_DIRS[self.fuzzer])
+        os.makedirs(sequence_dir, exist_ok=True)
+        for idx in range(sequences):
+            sequence = self.generate_sequence()
+            # The names follow the fuzzers' conventions, and are derived from the seed like the sequences
+            if self.fuzzer == "echidna":
+                file_name = f"{self.rng.getrandbits(63)}.txt"
+            else:
+                file_name = f"{idx}-{uuid.UUID(int=self.rng.getrandbits(128), version=4)}.json"
+            with atomic_open(os.path.join(sequence_dir, file_name)) as outfile:
+                json.dump(sequence, outfile)
+        return sequence_dir
+
+    def _sequence_length(self) -> int:
+        """Returns the length of a sequence, drawn from the configured distribution"""
+        min_length, max_length = self.config["minLength"], self.config["maxLength"]
+        if self.config["lengthDistribution"] == "uniform":
+            return self.rng.randint(min_length, max_length)
+        # Each additional call is half as likely as the previous one
+        length = min_length
+        while length < max_length and self.rng.random() < 0.5:
+            length += 1
+        return length
+
+    def _generate_call(self) -> dict:
+        """Returns a random call to an entry point of the target"""
+        entry_point = self.rng.choice(self.entry_points)
+        sender = self.rng.choice(self.senders)
+        value = self.rng.randint(0, self.config["maxValue"]) if entry_point.payable else 0
+        time_delay = self._delay(self.config["maxTimeDelay"])
+        block_delay = self._delay(self.config["maxBlockDelay"])
+        values = [self._generate_value(parameter.type) for parameter in entry_point.parameters]
+
+        if self.fuzzer == "echidna":
+            return echidna_call(entry_point, values, sender, value, time_delay, block_delay)
+
+        nonce = self.nonces.get(sender, 0)
+        self.nonces[sender] = nonce + 1
+        return medusa_call(entry_point, values, sender, nonce, value, time_delay, block_delay)
+
+    def _delay(self, max_delay: int) -> int:
+        """Returns a random delay, which is zero for a quarter of the calls"""
+        if max_delay == 0 or self.rng.random() < 0.25:
+            return 0
+        return self.rng.randint(1, max_delay)
+
+    # pylint: disable=too-many-return-statements
+    def _generate_value(self, parameter_type: TypeSnapshot) -> Any:
+        """Returns a random value of the type, favoring the boundary values of integers"""
+        match parameter_type:
+            case EnumTypeSnapshot():
+                return self.rng.randrange(max(len(parameter_type.values), 1))
+            case StructTypeSnapshot():
+                return tuple(self._generate_value(field.type) for field in parameter_type.fields)
+            case ArrayTypeSnapshot():
+                length = parameter_type.length
+                if length is None:
+                    length = self.rng.randint(0, self.config["maxArrayLength"])
+                return [self._generate_value(parameter_type.type) for _ in range(length)]
+
+        elementary_type = str(parameter_type)
+        if elementary_type == "bool":
+            return self.rng.random() < 0.5
+        if elementary_type == "address":
+            return self.rng.choice(
+                [*self.senders, to_checksum_address(self.rng.randbytes(20)), "0x" + "0" * 40]
+            )
+        if elementary_type == "string":
+            length = self.rng.randint(0, MAX_BYTES_LENGTH)
+            return "".join(self.rng.choices(STRING_ALPHABET, k=length)).encode("utf-8")
+        if elementary_type == "bytes":
+            return self.rng.randbytes(self.rng.randint(0, MAX_BYTES_LENGTH))
+        if elementary_type.startswith("bytes"):
+            return self.rng.randbytes(int(elementary_type[5:]))
+
+        signed = elementary_type.startswith("int")
+        bits = int(elementary_type[3 if signed else 4 :] or 256)
+        low, high = (-(2 ** (bits - 1)), 2 ** (bits - 1) - 1) if signed else (0, 2**bits - 1)
+        return self.rng.choice(
+            [low, high, 0, 1, self.rng.randint(low, high), self.rng.randint(low, high)]
+        )
+
+
+# pylint: disable=too-many-arguments
+def echidna_call(
+    entry_point: FunctionSnapshot,
+    values: list[Any],
+    sender: str,
+    value: int,
+    time_delay: int,
+    block_delay: int,
+) -> dict:
+    """Returns a call to the entry point of the target with the parameter values, in the Echidna corpus format"""
+    return {
+        "call": {
+            "contents": [
+                entry_point.name,
+                [
+                    _echidna_value(parameter.type, parameter_value)
+                    for parameter, parameter_value in zip(entry_point.parameters, values)
+                ],
+            ],
+            "tag": "SolCall",
+        },
+        "delay": [_hex_word(time_delay), _hex_word(block_delay)],
+        "dst": ECHIDNA_TARGET_ADDRESS,
+        "gas": GAS_LIMIT,
+        "gasprice": _hex_word(0),
+        "src": to_checksum_address(sender),
+        "value": _hex_word(value),
+    }
+
+
+# pylint: disable=too-many-arguments
+def medusa_call(
+    entry_point: FunctionSnapshot,
+    values: list[Any],
+    sender: str,
+    nonce: int,
+    value: int,
+    time_delay: int,
+    block_delay: int,
+) -> dict:
+    """
+    Returns a call to the entry point of the target with the parameter values, in the Medusa corpus format. The nonce
+    is the number of calls the sender made before in the sequence
+    """
+    types = [abi_type(parameter.type) for parameter in entry_point.parameters]
+    return {
+        "call": {
+            "from": sender,
+            "to": MEDUSA_TARGET_ADDRESS,
+            "nonce": nonce,
+            "value": hex(value),
+            "gasLimit": GAS_LIMIT,
+            "gasPrice": "0x1",
+            "gasFeeCap": "0x0",
+            "gasTipCap": "0x0",
+            "data": entry_point.selector + encode(types, values).hex(),
+            "dataAbiValues": {
+                "methodName": entry_point.name,
+                "inputValues": [
+                    _medusa_value(parameter.type, parameter_value)
+                    for parameter, parameter_value in zip(entry_point.parameters, values)
+                ],
+            },
+            "AccessList": None,
+            "SkipAccountChecks": False,
+        },
+        "blockNumberDelay": block_delay,
+        "blockTimestampDelay": time_delay,
+    }
+
+
+def _is_supported(parameter_type: TypeSnapshot) -> bool:
+    """Returns True if random values of the type can be generated and encoded"""
+    match parameter_type:
+        case EnumTypeSnapshot():
+            return True
+        case StructTypeSnapshot():
+            return all(_is_supported(field.type) for field in parameter_type.fields)
+        case ArrayTypeSnapshot():
+            return _is_supported(parameter_type.type)
+        case ElementaryTypeSnapshot():
+            return parameter_type.type in (
+                "bool",
+                "address",
+                "string",
+                "bytes",
+            ) or parameter_type.type.startswith(("uint", "int", "bytes"))
+    return False
+
+
+def _hex_word(value: int) -> str:
+    """Returns the value as a 32-byte hex string, like Echidna's delays and values"""
+    return f"0x{value:064x}"
+
+
+def abi_type(parameter_type: TypeSnapshot) -> str:
+    """
+    Returns the ABI type used to encode values of the type. Strings have the same encoding as bytes, and are encoded as
+    bytes, since the strings of a corpus aren't always valid UTF-8
+    """
+    match parameter_type:
+        case EnumTypeSnapshot():
+            return "uint8"
+        case StructTypeSnapshot():
+            return f"({','.join(abi_type(field.type) for field in parameter_type.fields)})"
+        case ArrayTypeSnapshot():
+            length = parameter_type.length if parameter_type.length is not None else ""
+            return f"{abi_type(parameter_type.type)}[{length}]"
+    if str(parameter_type) == "string":
+        return "bytes"
+    return str(parameter_type)
+
+
+# pylint: disable=too-many-return-statements
+def _echidna_type(parameter_type: TypeSnapshot) -> dict:
+    """Returns the tagged Echidna representation of the type"""
+    match parameter_type:
+        case EnumTypeSnapshot():
+            return {"contents": 8, "tag": "AbiUIntType"}
+        case StructTypeSnapshot():
+            return {
+                "contents": [_echidna_type(field.type) for field in parameter_type.fields],
+                "tag": "AbiTupleType",
+            }
+        case ArrayTypeSnapshot():
+            if parameter_type.length is None:
+                return {
+                    "contents": _echidna_type(parameter_type.type),
+                    "tag": "AbiArrayDynamicType",
+                }
+            return {
+                "contents": [parameter_type.length, _echidna_type(parameter_type.type)],
+                "tag": "AbiArrayType",
+            }
+
+    elementary_type = str(parameter_type)
+    match elementary_type:
+        case "bool":
+            return {"tag": "AbiBoolType"}
+        case "address":
+            return {"tag": "AbiAddressType"}
+        case "string":
+            return {"tag": "AbiStringType"}
+        case "bytes":
+            return {"tag": "AbiBytesDynamicType"}
+    if elementary_type.startswith("bytes"):
+        return {"contents": int(elementary_type[5:]), "tag": "AbiBytesType"}
+    if elementary_type.startswith("int"):
+        return {"contents": int(elementary_type[3:] or 256), "tag": "AbiIntType"}
+    return {"contents": int(elementary_type[4:] or 256), "tag": "AbiUIntType"}
+
+
+def _echidna_value(parameter_type: TypeSnapshot, value: Any) -> dict:
+    """Returns the tagged Echidna representation of a value of the type"""
+    match parameter_type:
+        case EnumTypeSnapshot():
+            return {"contents": [8, str(value)], "tag": "AbiUInt"}
+        case StructTypeSnapshot():
+            return {
+                "contents": [
+                    _echidna_value(field.type, field_value)
+                    for field, field_value in zip(parameter_type.fields, value)
+                ],
+                "tag": "AbiTuple",
+            }
+        case ArrayTypeSnapshot():
+            elements = [_echidna_value(parameter_type.type, element) for element in value]
+            if parameter_type.length is None:
+                return {
+                    "contents": [_echidna_type(parameter_type.type), elements],
+                    "tag": "AbiArrayDynamic",
+                }
+            return {
+                "contents": [parameter_type.length, _echidna_type(parameter_type.type), elements],
+                "tag": "AbiArray",
+            }
+
+    elementary_type = str(parameter_type)
+    match elementary_type:
+        case "bool":
+            return {"contents": value, "tag": "AbiBool"}
+        case "address":
+            # The addresses decoded from Medusa calldata are lowercase, which solc rejects as address literals
+            return {"contents": to_checksum_address(value), "tag": "AbiAddress"}
+        case "string":
+            return {"contents": bytes_to_echidna_byte_string(value), "tag": "AbiString"}
+        case "bytes":
+            return {"contents": bytes_to_echidna_byte_string(value), "tag": "AbiBytesDynamic"}
+    if elementary_type.startswith("bytes"):
+        return {"contents": [len(value), bytes_to_echidna_byte_string(value)], "tag": "AbiBytes"}
+    if elementary_type.startswith("int"):
+        return {"contents": [int(elementary_type[3:] or 256), str(value)], "tag": "AbiInt"}
+    return {"contents": [int(elementary_type[4:] or 256), str(value)], "tag": "AbiUInt"}
+
+
+def _medusa_value(parameter_type: TypeSnapshot, value: Any) -> Any:
+    """Returns the Medusa representation of a value of the type in `inputValues`"""
+    match parameter_type:
+        case EnumTypeSnapshot():
+            return str(value)
+        case StructTypeSnapshot():
+            return {
+                field.name: _medusa_value(field.type, field_value)
+                for field, field_value in zip(parameter_type.fields, value)
+            }
+        case ArrayTypeSnapshot():
+            return [_medusa_value(parameter_type.type, element) for element in value]
+    # Like Medusa, the bytes of a string that aren't valid UTF-8 are replaced
+    if str(parameter_type) == "string":
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
@@ -0,0 +1,137 @@
+"""The CorpusManifest class that tracks the corpus files already converted to unit tests"""
+import os
+import re
+import json
+import hashlib
+from importlib import metadata
+from typing import Any, Iterator
+
+from fuzz_utils.utils.file_manager import atomic_open
+
+MANIFEST_VERSION = 3
+TEST_NAME_PATTERN = re.compile(r"function (test_auto_\w+)\(")
+
+
+def get_tool_version() -> str:
+    """Returns the installed fuzz-utils version, so manifests of other versions are not reused"""
+    try:
+        return metadata.version("fuzz-utils")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def hash_content(data: bytes) -> str:
+    """Returns the hex digest used to detect a changed corpus file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class CorpusManifest:
+    """
+    Maps each converted corpus file to its size, mtime, content hash, index, and emitted test variants, so that only
+    new or changed corpus files are parsed by later runs. Indices are never reassigned, keeping test names stable.
+    """
+
+    def __init__(self, path: str, settings: dict[str, Any]) -> None:
+        self.path = path
+        self.settings = settings
+        self.next_index = 0
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.reused = 0
+        self.parsed = 0
+
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") != MANIFEST_VERSION:
+            return
+
+        self.next_index = manifest["nextIndex"]
+        self.entries = manifest["entries"]
+        # Tests rendered with different settings can't be reused, but their indices are kept
+        if manifest["settings"] != settings:
+            for entry in self.entries.values():
+                entry["test"] = None
+                entry["name"] = None
+                entry["sequence"] = None
+                entry["features"] = None
+
+    def is_up_to_date(self, file_path: str, stat: os.stat_result) -> bool:
+        """Returns True if the corpus file has a cached test and its size and mtime didn't change"""
+        entry = self.entries.get(file_path)
+        if entry is None or entry["test"] is None:
+            return False
+        if entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+            return False
+        self.reused += 1
+        return True
+
+    def matches_content(self, file_path: str, stat: os.stat_result, digest: str) -> bool:
+        """Returns True if the corpus file has a cached test for the same content, e.g. after being touched"""
+        entry = self.entries.get(file_path)
+        if entry is None or entry["test"] is None or entry["hash"] != digest:
+            return False
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime_ns
+        self.reused += 1
+        return True
+
+    def update(self, file_path: str, stat: os.stat_result, digest: str) -> int:
+        """Records a new or changed corpus file that is about to be parsed, and returns its index"""
+        entry = self.entries.get(file_path)
+        if entry is None:
+            entry = {"index": self.next_index}
+            self.next_index += 1
+            self.entries[file_path] = entry
+        entry.update(
+            {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": digest,
+                "name": None,
+                "test": None,
+                "sequence": None,
+                "features": None,
+            }
+        )
+        return entry["index"]
+
+    def set_test(
+        self, file_path: str, test: tuple[str, ...], sequence_hash: str, features: list[str]
+    ) -> None:
+        """Stores the test variants emitted for a parsed corpus file, the hash of its call sequence, and its features"""
+        entry = self.entries[file_path]
+        match = TEST_NAME_PATTERN.search(test[0])
+        entry["name"] = match.group(1) if match else None
+        entry["test"] = list(test)
+        entry["sequence"] = sequence_hash
+        entry["features"] = features
+        self.parsed += 1
+
+    def tests(self, file_paths: list[str]) -> Iterator[tuple[tuple[str, ...], str, list[str]]]:
+        """
+        Yields the test variants, call sequence hashes, and features of the given corpus files, ordered by their index
+        """
+        entries = [self.entries[path] for path in file_paths if path in self.entries]
+        entries.sort(key=lambda entry: entry["index"])
+        for entry in entries:
+            if entry["test"] is not None:
+                yield tuple(entry["test"]), entry["sequence"], entry["features"]
+
+    def save(self) -> None:
+        """Writes the manifest, dropping the entries of corpus files that no longer exist"""
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with atomic_open(self.path) as outfile:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "settings": self.settings,
+                    "nextIndex": self.next_index,
+                    "entries": self.entries,
+                },
+                outfile,
+            )
@@ -1,19 +1,56 @@
 """The FoundryTest class that handles generation of unit tests from call sequences"""
 import os
-import json
+import sys
 import copy
-from typing import Any
+import time
+import hashlib
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterator
 import jinja2
 
 from slither import Slither
+from fuzz_utils.utils.corpus_decoding import decode_corpus_file
 from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.profiler import stage, stop_profiling
 from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.generate.CorpusManifest import CorpusManifest, get_tool_version, hash_content
+from fuzz_utils.generate.call_sequence import (
+    OPTIMIZATION_PASSES,
+    OptimizationReport,
+    call_features,
+    makes_low_level_call,
+    optimize_sequence,
+    render_calls,
+    render_test,
+)
+from fuzz_utils.generate.output_writers import SingleFileWriter, ShardedFileWriter
+from fuzz_utils.generate.run_metrics import (
+    RunMetrics,
+    SequenceError,
+    print_error_report,
+    sequence_error,
+)
+from fuzz_utils.generate.sequence_selection import (
+    SELECTION_MODES,
+    reproducer_feature,
+    select_sequences,
+)
+from fuzz_utils.templates.template_cache import get_template
 from fuzz_utils.templates.default_config import default_config
 
 from fuzz_utils.generate.fuzzers.Medusa import Medusa
 from fuzz_utils.generate.fuzzers.Echidna import Echidna
 from fuzz_utils.templates.foundry_templates import templates
 
+# The number of corpus files sent to a worker process at once
+PARSE_BATCH_SIZE = 16
+# The directory, relative to the tests directory, that holds the manifests of incremental runs
+MANIFEST_DIR = ".fuzz-utils"
+
 # pylint: disable=too-few-public-methods,too-many-instance-attributes
 class FoundryTest:
     """
@@ -29,62 +66,483 @@ class FoundryTest:
         fuzzer: Echidna | Medusa,
     ) -> None:
         self.slither = slither
+        # Each instance has its own copy of the defaults, since several targets can be generated in one process
+        self.config = copy.deepcopy(FoundryTest.config)
         for key, value in config.items():
             if key in self.config:
                 self.config[key] = value
 
+        for name in self.config["optimizations"]:
+            if name not in OPTIMIZATION_PASSES:
+                handle_exit(
+                    f"The optimization pass {name} is not supported. Supported passes: {', '.join(OPTIMIZATION_PASSES)}."
+                )
+        self.optimization_report = OptimizationReport()
+        self.metrics = RunMetrics()
+        if self.config["select"] not in SELECTION_MODES:
+            handle_exit(
+                f"The selection mode {self.config['select']} is not supported. Supported modes: {', '.join(SELECTION_MODES)}."
+            )
+
         self.target = get_target_contract(self.slither, self.config["targetContract"])
         self.target_file_name = self.target.source_mapping.filename.relative.split("/")[-1]
         self.fuzzer = fuzzer
+        self.outputs = self._output_specs()
+        # Each parsed call sequence is rendered once for each distinct namedInputs setting of the outputs
+        self.render_variants: tuple[bool, ...] = tuple(
+            dict.fromkeys(output["namedInputs"] for output in self.outputs)
+        )
+
+    def create_poc(self, return_content: bool = False) -> str | None:
+        """
+        Generates the test files of each output from the fuzzer call sequences. Each corpus file is loaded, parsed,
+        and written to the test files one at a time, so memory usage doesn't grow with the size of the corpus. If
+        `testsPerFile` is set, the tests are split across numbered test files instead. The content of the test files
+        is only returned if `return_content` is set.
+        """
+        start = time.perf_counter()
+        # The metrics and the optimization report only cover this run, since `watch` calls this repeatedly
+        self.optimization_report = OptimizationReport()
+        self.metrics = RunMetrics()
+        template = get_template(templates["CONTRACT"])
+        writers: list[SingleFileWriter | ShardedFileWriter] = []
+
+        # The tests are parsed and rendered while they are written, in the nested stages of the write stage
+        with stage("write"), ExitStack() as stack:
+            for output in self.outputs:
+                writers.append(self._create_writer(output, template, stack))
+            variants = [
+                self.render_variants.index(output["namedInputs"]) for output in self.outputs
+            ]
+            for tests in self._generate_tests():
+                for writer, variant in zip(writers, variants):
+                    writer.add(tests[variant])
+            for writer in writers:
+                writer.finish()
+
+        output_paths: list[str] = []
+        for writer in writers:
+            output_paths.extend(writer.output_paths)
+            CryticPrint().print_success(writer.summary())
+        self.metrics.seconds = time.perf_counter() - start
 
-    def create_poc(self) -> str:
-        """Takes in a directory path to the echidna reproducers and generates a test file"""
+        if return_content:
+            content = ""
+            for output_path in output_paths:
+                with open(output_path, "r", encoding="utf-8") as file:
+                    content += file.read()
+            return content
+        return None
 
-        file_list: list[dict[str, Any]] = []
-        tests_list = []
-        dir_list = []
+    def _create_writer(
+        self, output: dict[str, Any], template: jinja2.Template, stack: ExitStack
+    ) -> SingleFileWriter | ShardedFileWriter:
+        """Returns the writer of the test files of an output"""
+        write_path = os.path.join(output["testsDir"], self.config["targetContract"])
+        template_args = {
+            "file_path": os.path.join(output["inheritancePath"]),
+            "target_name": self.config["targetContract"],
+            "amount": 0,
+            "fuzzer": self.fuzzer.name,
+        }
+        if output["testsPerFile"] > 0:
+            return ShardedFileWriter(
+                template,
+                template_args,
+                f"{write_path}_{self.fuzzer.name}_Test_",
+                output["testsPerFile"],
+            )
+        return SingleFileWriter(
+            template, template_args, f"{write_path}_{self.fuzzer.name}_Test.t.sol", stack
+        )
+
+    def _output_specs(self) -> list[dict[str, Any]]:
+        """
+        Returns the outputs of the run. The entries of the `outputs` list override the testsDir, inheritancePath,
+        namedInputs, and testsPerFile of the configuration, which is the only output if the list is empty
+        """
+        defaults = {
+            "testsDir": self.config["testsDir"],
+            "inheritancePath": self.config["inheritancePath"],
+            "namedInputs": self.fuzzer.named_inputs,
+            "testsPerFile": self.config["testsPerFile"],
+        }
+        outputs: list[dict[str, Any]] = []
+        written: set[tuple[str, bool]] = set()
+        for entry in self.config["outputs"]:
+            unknown = sorted(set(entry) - set(defaults))
+            if unknown:
+                handle_exit(
+                    f"The generate configuration output {entry} has unsupported fields: {', '.join(unknown)}. Supported fields: {', '.join(defaults)}."
+                )
+            output = defaults | entry
+            # Two outputs that write to the same test files would overwrite each other
+            files = (os.path.normpath(output["testsDir"]), output["testsPerFile"] > 0)
+            if files in written:
+                handle_exit(
+                    f"The generate configuration output {entry} writes to the same test files as another output."
+                )
+            written.add(files)
+            outputs.append(output)
+        return outputs or [defaults]
+
+    def corpus_directories(self) -> list[str]:
+        """Returns the directories that contain the corpus files that should be converted to tests"""
         if self.config["allSequences"]:
-            dir_list = self.fuzzer.corpus_dirs
-        else:
-            dir_list = [self.fuzzer.reproducer_dir]
-
-        # 1. Iterate over each directory and reproducer file (open it)
-        for directory in dir_list:
-            for entry in os.listdir(directory):
-                full_path = os.path.join(directory, entry)
-
-                if os.path.isfile(full_path):
-                    try:
-                        with open(full_path, "r", encoding="utf-8") as file:
-                            file_list.append({"path": full_path, "content": json.load(file)})
-                    except Exception:  # pylint: disable=broad-except
-                        print(f"Fail on {full_path}")
-
-        # 2. Parse each reproducer file and add each test function to the functions list
-        for idx, file_obj in enumerate(file_list):
+            return self.fuzzer.corpus_dirs
+        return [self.fuzzer.reproducer_dir]
+
+    def _corpus_files(self) -> Iterator[str]:
+        """Yields the paths of the corpus files that should be converted to tests"""
+        for directory in self.corpus_directories():
+            # The fuzzers only create the reproducer directories once a property fails
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self.metrics.files_scanned += 1
+                        yield os.path.join(directory, entry.name)
+
+    def _load_corpus_files(self) -> Iterator[tuple[int, str, Any]]:
+        """Yields the index, path, and content of each corpus file that could be loaded"""
+        idx = 0
+        for full_path in self._corpus_files():
             try:
-                tests_list.append(
-                    self.fuzzer.parse_reproducer(file_obj["path"], file_obj["content"], idx)
+                with stage("read"), open(full_path, "rb") as file:
+                    data = file.read()
+                self.metrics.bytes_read += len(data)
+                with stage("decode"):
+                    content = decode_corpus_file(data, self.fuzzer.name)
+            except Exception as e:  # pylint: disable=broad-except
+                self.metrics.add_error(sequence_error(full_path, "load", e))
+                continue
+            self.metrics.files_loaded += 1
+            yield idx, full_path, content
+            idx += 1
+
+    def _generate_tests(self) -> Iterator[tuple[str, ...]]:
+        """
+        Parses each loaded corpus file and yields its test function, rendered once for each of the render variants, in
+        corpus order
+        """
+        tests: Iterator[tuple[tuple[str, ...], str, list[str]]]
+        if self.config["incremental"]:
+            tests = self._generate_tests_incrementally()
+        else:
+            tests = (
+                (test, sequence_hash, features)
+                for _, _, test, sequence_hash, features in self._parse_corpus_files(
+                    self._load_corpus_files()
                 )
-            except Exception:  # pylint: disable=broad-except
-                print(f"Parsing fail on {file_obj['content']}: index: {idx}")
-
-        # 4. Generate the test file
-        template = jinja2.Template(templates["CONTRACT"])
-        write_path = os.path.join(self.config["testsDir"], self.config["targetContract"])
-        inheritance_path = os.path.join(self.config["inheritancePath"])
-        # 5. Save the test file
-        test_file_str = template.render(
-            file_path=inheritance_path,
-            target_name=self.config["targetContract"],
-            amount=0,
-            tests=tests_list,
-            fuzzer=self.fuzzer.name,
+            )
+
+        if self.config["deduplicate"]:
+            tests = _deduplicate_tests(tests)
+        # Setting a maximum number of tests implies the coverage selection
+        if self.config["select"] == "coverage" or self.config["maxTests"] > 0:
+            tests = _select_tests(tests, self.config["maxTests"])
+        for test, _, _ in tests:
+            self.metrics.tests_emitted += 1
+            yield test
+
+        if self.config["optimizations"]:
+            report = self.optimization_report
+            CryticPrint().print_information(
+                f"Sequence optimizations removed {report.lines_before - report.lines_after} of {report.lines_before} "
+                f"lines and {report.cheatcodes_before - report.cheatcodes_after} of {report.cheatcodes_before} "
+                f"cheatcode calls from {report.sequences} parsed sequences"
+            )
+        print_error_report(self.metrics.errors)
+
+    def _generate_tests_incrementally(self) -> Iterator[tuple[tuple[str, ...], str, list[str]]]:
+        """
+        Parses only the corpus files that are new or changed since the last run, and reuses the tests stored in the
+        manifest for the rest. The tests are yielded in the order of their index, which never changes between runs.
+        """
+        # The manifest is stored with the tests of the first output
+        manifest_path = os.path.join(
+            self.outputs[0]["testsDir"],
+            MANIFEST_DIR,
+            f"{self.config['targetContract']}_{self.fuzzer.name}.json",
+        )
+        with stage("manifest"):
+            manifest = CorpusManifest(manifest_path, self._manifest_settings())
+        file_paths = list(self._corpus_files())
+
+        for _, file_path, test, sequence_hash, features in self._parse_corpus_files(
+            _load_changed_corpus_files(manifest, file_paths, self.fuzzer.name, self.metrics)
+        ):
+            manifest.set_test(file_path, test, sequence_hash, features)
+
+        yield from manifest.tests(file_paths)
+        self.metrics.tests_reused += manifest.reused
+        with stage("manifest"):
+            manifest.save()
+        CryticPrint().print_information(
+            f"Parsed {manifest.parsed} new or changed corpus files, reused {manifest.reused} tests from {manifest_path}"
         )
-        with open(f"{write_path}_{self.fuzzer.name}_Test.t.sol", "w", encoding="utf-8") as outfile:
-            outfile.write(test_file_str)
-        CryticPrint().print_success(
-            f"Generated a test file in {write_path}_{self.fuzzer.name}_Test.t.sol"
+
+    def _manifest_settings(self) -> dict[str, Any]:
+        """Returns the settings that affect the rendered tests. A manifest written with other settings isn't reused"""
+        return {
+            "toolVersion": get_tool_version(),
+            "fuzzer": self.fuzzer.name,
+            "targetContract": self.config["targetContract"],
+            "namedInputs": list(self.render_variants),
+            "optimizations": sorted(self.config["optimizations"]),
+        }
+
+    def _parse_corpus_files(
+        self, entries: Iterator[tuple[int, str, Any]]
+    ) -> Iterator[tuple[int, str, tuple[str, ...], str, list[str]]]:
+        """
+        Parses the indexed corpus files and yields the index, path, rendered test variants, call sequence hash, and
+        features of each, in order
+        """
+        if self.config["jobs"] > 1:
+            for (
+                idx,
+                file_path,
+                test,
+                sequence_hash,
+                report,
+                features,
+                calls,
+            ) in self._parse_corpus_files_in_parallel(entries):
+                self.optimization_report.add(report)
+                self.metrics.sequences_parsed += 1
+                self.metrics.calls_decoded += calls
+                yield idx, file_path, test, sequence_hash, features
+            return
+
+        for idx, file_path, content in entries:
+            try:
+                test, sequence_hash, report, features, calls = _parse_corpus_file(
+                    self.fuzzer,
+                    file_path,
+                    content,
+                    idx,
+                    self.config["optimizations"],
+                    self.render_variants,
+                )
+            # A sequence that can't be parsed is skipped, so it doesn't discard the tests of the rest of the corpus
+            except Exception as e:  # pylint: disable=broad-except
+                self.metrics.add_error(sequence_error(file_path, "parse", e))
+                continue
+            self.optimization_report.add(report)
+            self.metrics.sequences_parsed += 1
+            self.metrics.calls_decoded += calls
+            yield idx, file_path, test, sequence_hash, features
+
+    def _parse_corpus_files_in_parallel(
+        self, entries: Iterator[tuple[int, str, Any]]
+    ) -> Iterator[tuple[int, str, tuple[str, ...], str, OptimizationReport, list[str], int]]:
+        """
+        Parses the corpus files in a process pool, preserving the order and indices of the tests. Only a bounded
+        number of batches is in flight at once, so the corpus is never fully loaded in memory.
+        """
+        max_pending = 2 * self.config["jobs"]
+        pending: deque[tuple[list[tuple[int, str, Any]], Future]] = deque()
+
+        with ProcessPoolExecutor(
+            max_workers=self.config["jobs"],
+            initializer=_init_worker,
+            initargs=(self.fuzzer, self.config["optimizations"], self.render_variants),
+        ) as executor:
+            for batch in _batched(entries, PARSE_BATCH_SIZE):
+                pending.append((batch, executor.submit(_parse_in_worker, batch)))
+                if len(pending) >= max_pending:
+                    yield from _collect_parsed_batch(*pending.popleft(), executor, self.metrics)
+            while pending:
+                yield from _collect_parsed_batch(*pending.popleft(), executor, self.metrics)
+
+
+def _load_changed_corpus_files(
+    manifest: CorpusManifest, file_paths: list[str], fuzzer_name: str, metrics: RunMetrics
+) -> Iterator[tuple[int, str, Any]]:
+    """
+    Yields the index, path, and content of each corpus file that is new or changed since the manifest was
+    written. Files whose size and mtime changed are only parsed again if their content changed too.
+    """
+    for full_path in file_paths:
+        try:
+            stat = os.stat(full_path)
+            if manifest.is_up_to_date(full_path, stat):
+                continue
+            with stage("read"), open(full_path, "rb") as file:
+                data = file.read()
+            metrics.bytes_read += len(data)
+            digest = hash_content(data)
+            if manifest.matches_content(full_path, stat, digest):
+                continue
+            with stage("decode"):
+                content = decode_corpus_file(data, fuzzer_name)
+        except Exception as e:  # pylint: disable=broad-except
+            metrics.add_error(sequence_error(full_path, "load", e))
+            continue
+        metrics.files_loaded += 1
+        yield manifest.update(full_path, stat, digest), full_path, content
+
+
+def _parse_corpus_file(
+    fuzzer: Echidna | Medusa,
+    file_path: str,
+    content: Any,
+    idx: int,
+    optimizations: list[str],
+    render_variants: tuple[bool, ...],
+) -> tuple[tuple[str, ...], str, OptimizationReport, list[str], int]:
+    """
+    Parses a corpus file into a test, after applying the optimization passes to its call sequence, and renders the
+    test once for each namedInputs setting in `render_variants`. Also returns the hash of the call sequence, which is
+    the same for corpus files that only differ by their path, or by fields that don't change the generated calls, the
+    report of the optimization passes, the features used to select tests, and the number of decoded calls
+    """
+    with stage("parse"):
+        sequence = fuzzer.parse_call_sequence(content)
+        calls = len(sequence.steps)
+        features = call_features(sequence.steps)
+        if os.path.dirname(file_path) == fuzzer.reproducer_dir:
+            features.append(reproducer_feature(file_path))
+        steps, report = optimize_sequence(sequence.steps, optimizations)
+    with stage("render"):
+        has_low_level_call = makes_low_level_call(steps)
+        call_lists = [render_calls(steps, named_inputs) for named_inputs in render_variants]
+        tests = tuple(
+            render_test(file_path, call_list, f"{sequence.function_name}_{idx}", has_low_level_call)
+            for call_list in call_lists
         )
+    # The calls of the first variant identify the call sequence
+    sequence_hash = hashlib.sha256("".join(call_lists[0]).encode("utf-8")).hexdigest()
+    return tests, sequence_hash, report, features, calls
+
+
+def _deduplicate_tests(
+    tests: Iterator[tuple[tuple[str, ...], str, list[str]]]
+) -> Iterator[tuple[tuple[str, ...], str, list[str]]]:
+    """Yields the first test of each unique call sequence, and reports how many duplicates were dropped"""
+    seen: set[str] = set()
+    dropped = 0
+    for test, sequence_hash, features in tests:
+        if sequence_hash in seen:
+            dropped += 1
+            continue
+        seen.add(sequence_hash)
+        yield test, sequence_hash, features
+    CryticPrint().print_information(
+        f"Dropped {dropped} duplicate call sequences, {len(seen)} unique call sequences remain"
+    )
+
+
+def _select_tests(
+    tests: Iterator[tuple[tuple[str, ...], str, list[str]]], max_tests: int
+) -> Iterator[tuple[tuple[str, ...], str, list[str]]]:
+    """
+    Yields the subset of tests that covers the features of all tests, in corpus order, and reports the achieved
+    coverage. The features of every test are needed before the first one is selected, so the tests are held in memory
+    """
+    candidates = list(tests)
+    with stage("select"):
+        selected, report = select_sequences([features for _, _, features in candidates], max_tests)
+    for idx in selected:
+        yield candidates[idx]
+    CryticPrint().print_information(
+        f"Selected {report.selected} of {report.sequences} call sequences, covering {report.covered_features} of "
+        f"{report.features} (function, selector, caller) combinations and {report.covered_reproducers} of "
+        f"{report.reproducers} reproducers"
+    )
+
+
+def _batched(
+    entries: Iterator[tuple[int, str, Any]], size: int
+) -> Iterator[list[tuple[int, str, Any]]]:
+    """Groups the indexed corpus files into batches of parsing jobs"""
+    while True:
+        batch = list(islice(entries, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _collect_parsed_batch(
+    batch: list[tuple[int, str, Any]],
+    future: Future,
+    executor: ProcessPoolExecutor,
+    metrics: RunMetrics,
+) -> Iterator[tuple[int, str, tuple[str, ...], str, OptimizationReport, list[str], int]]:
+    """Waits for a batch to be parsed by a worker process and yields its tests"""
+    # The worker processes parse and render the tests, so the parent process only times waiting for them
+    with stage("parse"):
+        results = future.result()
+    for (idx, file_path, _), (parsed, exited, error) in zip(batch, results):
+        if exited:
+            executor.shutdown(cancel_futures=True)
+            sys.exit()
+        if error is not None:
+            metrics.add_error(error)
+        elif parsed is not None:
+            yield idx, file_path, *parsed
+
 
-        return test_file_str
+# The fuzzer, optimization passes, and render variants used by a worker process, set once when the process pool starts
+_worker_fuzzer: Echidna | Medusa
+_worker_optimizations: list[str]
+_worker_render_variants: tuple[bool, ...]
+
+
+def _init_worker(
+    fuzzer: Echidna | Medusa, optimizations: list[str], render_variants: tuple[bool, ...]
+) -> None:
+    """Stores the fuzzer in the worker process so it isn't pickled for every reproducer"""
+    # pylint: disable=global-statement
+    global _worker_fuzzer, _worker_optimizations, _worker_render_variants
+    _worker_fuzzer = fuzzer
+    _worker_optimizations = optimizations
+    _worker_render_variants = render_variants
+    # The timings of the worker processes aren't reported, so the inherited profiler is stopped
+    stop_profiling()
+
+
+def _parse_in_worker(
+    batch: list[tuple[int, str, Any]]
+) -> list[
+    tuple[
+        tuple[tuple[str, ...], str, OptimizationReport, list[str], int] | None,
+        bool,
+        SequenceError | None,
+    ]
+]:
+    """
+    Parses a batch of corpus files in a worker process. Returns the test variants, call sequence hash, optimization
+    report, features, and number of calls of each, whether the fuzzer requested an exit, and the error of the sequences that failed
+    """
+    results: list[
+        tuple[
+            tuple[tuple[str, ...], str, OptimizationReport, list[str], int] | None,
+            bool,
+            SequenceError | None,
+        ]
+    ] = []
+    for idx, file_path, content in batch:
+        try:
+            results.append(
+                (
+                    _parse_corpus_file(
+                        _worker_fuzzer,
+                        file_path,
+                        content,
+                        idx,
+                        _worker_optimizations,
+                        _worker_render_variants,
+                    ),
+                    False,
+                    None,
+                )
+            )
+        except SystemExit:
+            results.append((None, True, None))
+            break
+        except Exception as e:  # pylint: disable=broad-except
+            results.append((None, False, sequence_error(file_path, "parse", e)))
+    return results
@@ -0,0 +1,279 @@
+""" Defines the steps of a call sequence, the passes that optimize them, and their rendering """
+import sys
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from fuzz_utils.templates.template_cache import get_template
+from fuzz_utils.templates.foundry_templates import templates
+from fuzz_utils.utils.target_snapshot import FunctionSnapshot
+
+# The templates of the steps that make a call to the target
+CALL_TEMPLATES = ("CALL", "TRANSFER")
+# Shorter runs of calls from the same caller take as many cheatcode calls with `vm.startPrank` and `vm.stopPrank`
+MIN_PRANK_RUN = 3
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(slots=True)
+class CallStep:
+    """
+    A step of a call sequence, which doesn't depend on the fuzzer it was parsed from. Calls hold the resolved function
+    of the target, which is shared by every call to it, and the Solidity literal of each argument. The steps are
+    slotted, so large corpora can be held in memory between the parsing and the rendering.
+    """
+
+    template: str
+    time_delay: int = 0
+    block_delay: int = 0
+    caller: str = ""
+    value: int = 0
+    function: FunctionSnapshot | None = None
+    arguments: tuple[str, ...] = ()
+    variable_definition: str = ""
+    # Whether the `vm.warp`, `vm.roll`, `vm.prank`, `vm.startPrank` and `vm.stopPrank` cheatcodes are rendered
+    warp: bool = False
+    roll: bool = False
+    prank: bool = False
+    start_prank: bool = False
+    stop_prank: bool = False
+
+    def __post_init__(self) -> None:
+        # A campaign only has a few senders, and the fuzzers mutate the sequences of their corpus, so most callers and
+        # arguments are repeated across sequences. The steps share their strings instead of holding copies
+        self.caller = sys.intern(self.caller)
+        if self.arguments:
+            self.arguments = tuple(map(sys.intern, self.arguments))
+
+    @property
+    def function_name(self) -> str:
+        """Returns the name of the called function, or an empty string if the step doesn't call a function"""
+        return self.function.name if self.function is not None else ""
+
+    @property
+    def selector(self) -> str:
+        """Returns the selector of the called function, or an empty string if the step doesn't call a function"""
+        return self.function.selector if self.function is not None else ""
+
+
+@dataclass(slots=True)
+class CallSequence:
+    """The steps of a call sequence, and the name of its last called function, which names its test"""
+
+    steps: list[CallStep]
+    function_name: str
+
+
+@dataclass
+class OptimizationReport:
+    """Counts the lines and cheatcode calls of the optimized sequences, before and after the passes"""
+
+    sequences: int = 0
+    lines_before: int = 0
+    lines_after: int = 0
+    cheatcodes_before: int = 0
+    cheatcodes_after: int = 0
+
+    def add(self, other: "OptimizationReport") -> None:
+        """Adds the counts of another report"""
+        self.sequences += other.sequences
+        self.lines_before += other.lines_before
+        self.lines_after += other.lines_after
+        self.cheatcodes_before += other.cheatcodes_before
+        self.cheatcodes_after += other.cheatcodes_after
+
+
+def render_calls(steps: list[CallStep], named_inputs: bool = False) -> list[str]:
+    """Returns the call strings of the steps, naming the arguments of the calls if `named_inputs` is set"""
+    call_list: list[str] = []
+    for step in steps:
+        template = get_template(templates[step.template])
+        call_list.append(
+            step.variable_definition
+            + template.render(
+                warp=step.warp,
+                roll=step.roll,
+                prank=step.prank,
+                start_prank=step.start_prank,
+                stop_prank=step.stop_prank,
+                time_delay=step.time_delay,
+                block_delay=step.block_delay,
+                caller=step.caller,
+                value=step.value,
+                function_parameters=format_arguments(step, named_inputs),
+                function_name=step.function_name,
+            )
+        )
+    return call_list
+
+
+def format_arguments(step: CallStep, named_inputs: bool) -> str:
+    """Returns the arguments of a call, e.g. `5, true`, or `{amount: 5, flag: true}` if `named_inputs` is set"""
+    if named_inputs and step.function is not None and step.function.parameters:
+        named = (
+            f"{parameter.name}: {argument}"
+            for parameter, argument in zip(step.function.parameters, step.arguments)
+        )
+        return "{" + ", ".join(named) + "}"
+    return ", ".join(step.arguments)
+
+
+def render_test(
+    file_path: str, call_list: list[str], function_name: str, has_low_level_call: bool
+) -> str:
+    """Returns a Foundry unit test string containing the call strings"""
+    template = get_template(templates["TEST"])
+    return template.render(
+        function_name=function_name,
+        call_list=call_list,
+        file_path=file_path,
+        has_low_level_call=has_low_level_call,
+    )
+
+
+def render_sequence(
+    sequence: CallSequence, file_path: str, index: int, named_inputs: bool = False
+) -> str:
+    """Returns the Foundry unit test of a call sequence, named after its last function and its index in the corpus"""
+    return render_test(
+        file_path,
+        render_calls(sequence.steps, named_inputs),
+        f"{sequence.function_name}_{index}",
+        makes_low_level_call(sequence.steps),
+    )
+
+
+def makes_low_level_call(steps: list[CallStep]) -> bool:
+    """Returns True if a step transfers value to the target with a low level call"""
+    return any(step.template == "TRANSFER" for step in steps)
+
+
+def call_features(steps: list[CallStep]) -> list[str]:
+    """Returns the sorted (function, selector, caller) combinations of the calls to the target in the steps"""
+    features: set[str] = set()
+    for step in steps:
+        if step.template == "CALL":
+            features.add(f"{step.function_name}:{step.selector}:{step.caller}")
+        elif step.template == "TRANSFER":
+            features.add(f"<transfer>::{step.caller}")
+    return sorted(features)
+
+
+def coalesce_delays(steps: list[CallStep]) -> list[CallStep]:
+    """Merges the delays of consecutive empty calls into the warp and roll of the next call"""
+    optimized: list[CallStep] = []
+    pending: CallStep | None = None
+    for step in steps:
+        if step.template == "EMPTY_CALL":
+            if pending is None:
+                pending = replace(step)
+            else:
+                pending.time_delay += step.time_delay
+                pending.block_delay += step.block_delay
+            continue
+
+        # Transfers don't render their own delays, so the pending delays are kept in an empty call before them
+        if pending is not None and step.template == "CALL":
+            step = replace(
+                step,
+                time_delay=step.time_delay + pending.time_delay,
+                block_delay=step.block_delay + pending.block_delay,
+            )
+            step.warp = step.roll = step.time_delay > 0 or step.block_delay > 0
+            pending = None
+        elif pending is not None:
+            optimized.append(pending)
+            pending = None
+        optimized.append(step)
+
+    # The delays of empty calls at the end of the sequence have no call to be merged into
+    if pending is not None:
+        optimized.append(pending)
+    return optimized
+
+
+def drop_zero_delays(steps: list[CallStep]) -> list[CallStep]:
+    """Drops the warps and rolls by zero, and the empty calls that don't advance the block"""
+    optimized: list[CallStep] = []
+    for step in steps:
+        step = replace(
+            step,
+            warp=step.warp and step.time_delay > 0,
+            roll=step.roll and step.block_delay > 0,
+        )
+        if step.template == "EMPTY_CALL" and not step.warp and not step.roll:
+            continue
+        optimized.append(step)
+    return optimized
+
+
+def collapse_pranks(steps: list[CallStep]) -> list[CallStep]:
+    """Replaces the pranks of consecutive calls from the same caller with a single `vm.startPrank`"""
+    optimized: list[CallStep] = []
+    idx = 0
+    while idx < len(steps):
+        end = idx
+        while (
+            end < len(steps)
+            and steps[end].template in CALL_TEMPLATES
+            and steps[end].prank
+            and steps[end].caller == steps[idx].caller
+        ):
+            end += 1
+
+        if end - idx < MIN_PRANK_RUN:
+            optimized.append(steps[idx])
+            idx += 1
+            continue
+
+        run = [replace(step, prank=False) for step in steps[idx:end]]
+        run[0].start_prank = True
+        run[-1].stop_prank = True
+        optimized.extend(run)
+        idx = end
+    return optimized
+
+
+# The optimization passes, in the order they are applied
+OPTIMIZATION_PASSES: dict[str, Callable[[list[CallStep]], list[CallStep]]] = {
+    "coalesce-delays": coalesce_delays,
+    "drop-zero-delays": drop_zero_delays,
+    "collapse-pranks": collapse_pranks,
+}
+
+
+def optimize_sequence(
+    steps: list[CallStep], passes: list[str]
+) -> tuple[list[CallStep], OptimizationReport]:
+    """Applies the selected optimization passes to the steps, and reports the lines and cheatcode calls removed"""
+    optimized = steps
+    for name, optimization_pass in OPTIMIZATION_PASSES.items():
+        if name in passes:
+            optimized = optimization_pass(optimized)
+
+    return optimized, OptimizationReport(
+        sequences=1,
+        lines_before=sum(count_lines(step) for step in steps),
+        lines_after=sum(count_lines(step) for step in optimized),
+        cheatcodes_before=sum(count_cheatcodes(step) for step in steps),
+        cheatcodes_after=sum(count_cheatcodes(step) for step in optimized),
+    )
+
+
+def count_cheatcodes(step: CallStep) -> int:
+    """Returns the number of cheatcode calls in the rendered step"""
+    return step.warp + step.roll + step.prank + step.start_prank + step.stop_prank
+
+
+def count_lines(step: CallStep) -> int:
+    """Returns the number of lines of the rendered step in the test, without rendering it"""
+    # Each step starts on a new line, followed by the lines of its template
+    lines = 1 + count_cheatcodes(step) + step.variable_definition.count("\n")
+    match step.template:
+        case "CALL":
+            lines += 1
+        case "TRANSFER":
+            lines += 2
+        case "EMPTY_CALL":
+            # The comment, and the line left by the indentation of the template's end
+            lines += 2
+    return lines
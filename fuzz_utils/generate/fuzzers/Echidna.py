@@ -1,21 +1,28 @@
 """ Generates a test file from Echidna reproducers """
 # type: ignore[misc] # Ignores 'Any' input parameter
-from typing import Any, NoReturn
-import jinja2
+from typing import Any
 
 from slither import Slither
-from slither.core.declarations.function_contract import FunctionContract
-from slither.core.solidity_types.elementary_type import ElementaryType
-from slither.core.solidity_types.user_defined_type import UserDefinedType
-from slither.core.solidity_types.array_type import ArrayType
-from slither.core.declarations.structure import Structure
-from slither.core.declarations.structure_contract import StructureContract
-from slither.core.declarations.enum import Enum
 from fuzz_utils.utils.crytic_print import CryticPrint
-from fuzz_utils.templates.foundry_templates import templates
+from fuzz_utils.utils.corpus_decoding import unpack_echidna_call
+from fuzz_utils.generate.call_sequence import CallSequence, CallStep, render_sequence
 from fuzz_utils.utils.encoding import parse_echidna_byte_string
-from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.error_handler import (
+    ParameterTypeError,
+    UnknownFunctionError,
+    UnknownTagError,
+)
 from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.utils.target_snapshot import (
+    ArrayTypeSnapshot,
+    ElementaryTypeSnapshot,
+    EnumTypeSnapshot,
+    FunctionSnapshot,
+    StructTypeSnapshot,
+    UserDefinedTypeSnapshot,
+    create_target_snapshot,
+    index_entry_points,
+)
 
 
 # pylint: disable=too-few-public-methods,too-many-instance-attributes
@@ -30,81 +37,92 @@ class Echidna:
         self.name = "Echidna"
         self.target_name = target_name
         self.slither = slither
-        self.target = get_target_contract(slither, target_name)
+        self.target = create_target_snapshot(get_target_contract(slither, target_name))
+        self.entry_points_by_name, _ = index_entry_points(self.target)
         self.reproducer_dir = f"{corpus_path}/reproducers"
         self.corpus_dirs = [f"{corpus_path}/coverage", self.reproducer_dir]
         self.named_inputs = named_inputs
         self.declared_variables: set[tuple[str, str]] = set()
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Slither cannot be pickled, worker processes only need the target snapshot
+        state = self.__dict__.copy()
+        state["slither"] = None
+        return state
+
     def parse_reproducer(self, file_path: str, calls: Any, index: int) -> str:
         """
         Takes a list of call dicts and returns a Foundry unit test string containing the call sequence.
         """
-        call_list = []
-        end = len(calls) - 1
+        return render_sequence(self.parse_call_sequence(calls), file_path, index, self.named_inputs)
+
+    def parse_call_sequence(self, calls: Any) -> CallSequence:
+        """
+        Takes a list of call dicts and returns the call sequence, along with the name of the last function. The steps
+        don't depend on the corpus file or the fuzzer, so they identify the call sequence.
+        """
+        steps = []
         function_name = ""
-        has_low_level_call: bool = False
 
         # before each test case, we clear the declared variables, as those are locals
         self.declared_variables = set()
 
         # 1. For each object in the list process the call object and add it to the call list
-        for idx, call in enumerate(calls):
-            call_str, fn_name = self._parse_call_object(call)
-            call_list.append(call_str)
-            has_low_level_call = has_low_level_call or ("(success, " in call_str)
-            if idx == end:
-                function_name = fn_name + "_" + str(index)
-
-        # 2. Generate the test string and return it
-        template = jinja2.Template(templates["TEST"])
-        return template.render(
-            function_name=function_name,
-            call_list=call_list,
-            file_path=file_path,
-            has_low_level_call=has_low_level_call,
-        )
+        for call in calls:
+            step, function_name = self._parse_call_object(call)
+            steps.append(step)
+
+        return CallSequence(steps, function_name)
 
     # pylint: disable=too-many-locals,too-many-branches
-    def _parse_call_object(self, call_dict: dict[Any, Any]) -> tuple[str, str]:
+    def _parse_call_object(self, call_dict: Any) -> tuple[CallStep, str]:
         """
-        Takes a single call dictionary, parses it, and returns the series of function calls as a string, along with
-        the name of the last function, which is used as the name of the test.
+        Takes a single call dictionary, parses it, and returns the step of the call sequence, along with the name
+        of the last function, which is used as the name of the test.
         """
         # 1. Parse call object and save the variables
-        time_delay = int(call_dict["delay"][0], 16)
-        block_delay = int(call_dict["delay"][1], 16)
+        (
+            time_delay,
+            block_delay,
+            value,
+            caller,
+            function_name,
+            function_parameters,
+        ) = unpack_echidna_call(call_dict)
         has_delay = time_delay > 0 or block_delay > 0
-        value = int(call_dict["value"], 16)
-        caller = call_dict["src"]
-
-        if call_dict["call"]["tag"] == "NoCall":
-            template = jinja2.Template(templates["EMPTY_CALL"])
-            call_str = template.render(time_delay=time_delay, block_delay=block_delay)
-            return (call_str, "")
 
-        function_name = call_dict["call"]["contents"][0]
+        if function_name is None:
+            step = CallStep(
+                "EMPTY_CALL",
+                time_delay=time_delay,
+                block_delay=block_delay,
+                warp=True,
+                roll=True,
+            )
+            return (step, "")
 
         if not function_name:
-            template = jinja2.Template(templates["TRANSFER"])
-            call_str = template.render(
-                time_delay=time_delay, block_delay=block_delay, value=value, caller=caller
+            step = CallStep(
+                "TRANSFER",
+                time_delay=time_delay,
+                block_delay=block_delay,
+                caller=caller,
+                value=value,
+                prank=True,
             )
-            return (call_str, "")
-
-        function_parameters = call_dict["call"]["contents"][1]
-        if len(function_parameters) == 0:
-            function_parameters = ""
-
-        slither_entry_point: FunctionContract
-
-        for entry_point in self.target.functions_entry_points:
-            if entry_point.name == function_name:
-                slither_entry_point = entry_point
-
-        if "slither_entry_point" not in locals():
-            handle_exit(
-                f"\n* Slither could not find the function `{function_name}` specified in the call object"
+            return (step, "")
+
+        overloads = self.entry_points_by_name.get(function_name, [])
+        slither_entry_point: FunctionSnapshot | None = overloads[-1] if overloads else None
+        # Echidna calls only have a name, so overloaded functions are told apart by their number of parameters
+        if len(overloads) > 1:
+            for entry_point in overloads:
+                if len(entry_point.parameters) == len(function_parameters):
+                    slither_entry_point = entry_point
+
+        if slither_entry_point is None:
+            raise UnknownFunctionError(
+                f"Slither could not find the function `{function_name}` specified in the call object"
             )
 
         if not slither_entry_point.payable:
@@ -114,35 +132,25 @@ class Echidna:
         variable_definition, call_definition = self._decode_function_params(
             function_parameters, False, slither_entry_point
         )
-        parameters_str: str = ""
-        if isinstance(slither_entry_point.parameters, list):
-            if self.named_inputs and len(slither_entry_point.parameters) > 0:
-                for idx, input_param in enumerate(slither_entry_point.parameters):
-                    call_definition[idx] = input_param.name + ": " + call_definition[idx]
-                parameters_str = "{" + ", ".join(call_definition) + "}"
-            else:
-                parameters_str = ", ".join(call_definition)
 
-        # 3. Generate a call string and return it
-        template = jinja2.Template(templates["CALL"])
-        call_str = template.render(
-            has_delay=has_delay,
+        # 3. Generate the call step and return it. If we need to define local variables, they precede the call
+        step = CallStep(
+            "CALL",
             time_delay=time_delay,
             block_delay=block_delay,
             caller=caller,
             value=value,
-            function_parameters=parameters_str,
-            function_name=function_name,
-            contract_name=self.target_name,
+            function=slither_entry_point,
+            arguments=tuple(call_definition),
+            variable_definition=variable_definition or "",
+            warp=has_delay,
+            roll=has_delay,
+            prank=True,
         )
-        # If we need to define local variables, append them to the call sequence
-        if variable_definition is not None:
-            call_str = variable_definition + call_str
-
-        return call_str, function_name
+        return step, function_name
 
     # pylint: disable=R0201
-    def _match_elementary_types(self, param: dict, recursive: bool) -> str | NoReturn:
+    def _match_elementary_types(self, param: dict, recursive: bool) -> str:
         """
         Returns a string which represents a elementary type literal value. e.g. "5" or "uint256(5)"
 
@@ -192,13 +200,13 @@ class Echidna:
                 interpreted_string = f'string(unicode"{hex_string}")'
                 return interpreted_string
             case _:
-                handle_exit(
-                    f"\n* The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
+                raise UnknownTagError(
+                    f"The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
                 )
 
     def _match_array_type(
         self, param: dict, index: int, input_parameter: Any
-    ) -> tuple[str, str, int] | NoReturn:
+    ) -> tuple[str, str, int]:
         match param["tag"]:
             case "AbiArray":
                 # Consider cases where the array items are more complex types (bytes, string, tuples)
@@ -220,37 +228,35 @@ class Echidna:
 
                 return name, definitions, index
             case _:
-                handle_exit(
-                    f"\n* The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
+                raise UnknownTagError(
+                    f"The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
                 )
 
-    def _match_user_defined_type(
-        self, param: dict, input_parameter: Any
-    ) -> tuple[str, str] | NoReturn:
+    def _match_user_defined_type(self, param: dict, input_parameter: Any) -> tuple[str, str]:
         match param["tag"]:
             case "AbiTuple":
-                match input_parameter.type:
-                    case Structure() | StructureContract():  # type: ignore[misc]
-                        definitions, func_params = self._decode_function_params(  # type: ignore[unreachable]
-                            param["contents"], True, input_parameter.type.elems_ordered
+                match input_parameter:
+                    case StructTypeSnapshot():
+                        definitions, func_params = self._decode_function_params(
+                            param["contents"], True, input_parameter.fields
                         )
                         return definitions, f"{input_parameter}({','.join(func_params)})"
                     case _:
-                        handle_exit(
-                            f"\n* The parameter type `{input_parameter.type}` could not be found. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
+                        raise ParameterTypeError(
+                            f"The parameter type `{input_parameter}` could not be found. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
                         )
             case "AbiUInt":
-                if isinstance(input_parameter.type, Enum):
+                if isinstance(input_parameter, EnumTypeSnapshot):
                     enum_uint = self._match_elementary_types(param, False)
                     return "", f"{input_parameter}({enum_uint})"
 
                 # TODO is this even reachable?
-                handle_exit(
-                    f"\n* The parameter type `{input_parameter.type}` does not match the intended type `Enum`. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
+                raise ParameterTypeError(
+                    f"The parameter type `{input_parameter}` does not match the intended type `Enum`. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
                 )
             case _:
-                handle_exit(
-                    f"\n* The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
+                raise UnknownTagError(
+                    f"The parameter tag `{param['tag']}` could not be found in the call object. This could indicate an issue in decoding the call sequence, or a missing feature. Please open an issue at https://github.com/crytic/fuzz-utils/issues"
                 )
 
     def _decode_function_params(
@@ -264,7 +270,7 @@ class Echidna:
         for param_idx, param in enumerate(function_params):
             input_parameter = None
             if recursive:
-                if isinstance(entry_point, list):
+                if isinstance(entry_point, tuple):
                     input_parameter = entry_point[param_idx].type
                 else:
                     input_parameter = entry_point.type
@@ -273,17 +279,17 @@ class Echidna:
                 input_parameter = entry_point.parameters[param_idx].type
 
             match input_parameter:
-                case ElementaryType():  # type: ignore[misc]
-                    params.append(self._match_elementary_types(param, recursive))  # type: ignore[unreachable]
-                case ArrayType():  # type: ignore[misc]
-                    inputs, definitions, new_index = self._match_array_type(  # type: ignore[unreachable,unpacking-non-sequence]
+                case ElementaryTypeSnapshot():
+                    params.append(self._match_elementary_types(param, recursive))
+                case ArrayTypeSnapshot():
+                    inputs, definitions, new_index = self._match_array_type(  # type: ignore[misc]
                         param, index, input_parameter
                     )
                     params.append(inputs)
                     variable_definitions += definitions
                     index = new_index
-                case UserDefinedType():  # type: ignore[misc]
-                    definitions, func_params = self._match_user_defined_type(param, input_parameter)  # type: ignore[unreachable, unpacking-non-sequence]
+                case UserDefinedTypeSnapshot():
+                    definitions, func_params = self._match_user_defined_type(param, input_parameter)  # type: ignore[misc]
                     variable_definitions += definitions
                     params.append(func_params)
                 case _:
@@ -305,7 +311,7 @@ class Echidna:
     ) -> tuple[str, str]:
         length = len(function_params[1])
 
-        input_type = input_parameter.type
+        input_type = str(input_parameter.type)
         name = f"dyn{input_type}Arr_{index}"
 
         # If the variable was already declared, just assign the new value
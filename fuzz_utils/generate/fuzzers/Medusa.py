@@ -1,21 +1,37 @@
 """ Generates a test file from Medusa reproducers """
-from typing import Any
-import jinja2
-from eth_abi import abi
+from dataclasses import dataclass
+from typing import Any, Callable
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
 from eth_utils import to_checksum_address
 from slither import Slither
-from slither.core.declarations.function_contract import FunctionContract
-from slither.core.solidity_types.elementary_type import ElementaryType
-from slither.core.solidity_types.user_defined_type import UserDefinedType
-from slither.core.solidity_types.array_type import ArrayType
-from slither.core.declarations.structure import Structure
-from slither.core.declarations.structure_contract import StructureContract
-from slither.core.declarations.enum import Enum
-from slither.core.declarations.enum_contract import EnumContract
-from fuzz_utils.templates.foundry_templates import templates
+from fuzz_utils.utils.corpus_decoding import unpack_medusa_call
+from fuzz_utils.generate.call_sequence import CallSequence, CallStep, render_sequence
 from fuzz_utils.utils.encoding import byte_to_escape_sequence
-from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.error_handler import CorpusFormatError, UnknownFunctionError
 from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.utils.target_snapshot import (
+    ArrayTypeSnapshot,
+    ElementaryTypeSnapshot,
+    EnumTypeSnapshot,
+    FunctionSnapshot,
+    StructTypeSnapshot,
+    create_target_snapshot,
+    index_entry_points,
+)
+
+# Returns the literal value, and the local variable definitions, of a decoded parameter value
+Formatter = Callable[[Any], tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class DecodePlan:
+    """The ABI types, decoder, and parameter formatters of an entry point, built once and reused for each call"""
+
+    types: tuple[str, ...]
+    decoder: TupleDecoder
+    formatters: tuple[Formatter, ...]
+
 
 # pylint: disable=too-few-public-methods,too-many-instance-attributes
 class Medusa:
@@ -30,7 +46,8 @@ class Medusa:
         self.target_name = target_name
         self.corpus_path = corpus_path
         self.slither = slither
-        self.target = get_target_contract(slither, target_name)
+        self.target = create_target_snapshot(get_target_contract(slither, target_name))
+        self.entry_points_by_name, self.entry_points_by_selector = index_entry_points(self.target)
         self.reproducer_dir = f"{corpus_path}/test_results"
         self.corpus_dirs = [
             f"{corpus_path}/call_sequences/immutable",
@@ -39,79 +56,81 @@ class Medusa:
         ]
         self.named_inputs = named_inputs
         self.declared_variables: set[tuple[str, str]] = set()
+        self.decode_plans: dict[str, DecodePlan] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Slither cannot be pickled, worker processes only need the target snapshot. The decode plans hold closures,
+        # so each worker process builds its own
+        state = self.__dict__.copy()
+        state["slither"] = None
+        state["decode_plans"] = {}
+        return state
 
     def parse_reproducer(self, file_path: str, calls: Any, index: int) -> str:
         """
         Takes a list of call dicts and returns a Foundry unit test string containing the call sequence.
         """
-        call_list = []
-        end = len(calls) - 1
+        return render_sequence(self.parse_call_sequence(calls), file_path, index, self.named_inputs)
+
+    def parse_call_sequence(self, calls: Any) -> CallSequence:
+        """
+        Takes a list of call dicts and returns the call sequence, along with the name of the last function. The steps
+        don't depend on the corpus file or the fuzzer, so they identify the call sequence.
+        """
+        steps = []
         function_name = ""
-        has_low_level_call: bool = False
 
         # before each test case, we clear the declared variables, as those are locals
         self.declared_variables = set()
 
-        for idx, call in enumerate(calls):
-            call_str, fn_name = self._parse_call_object(call)
-            call_list.append(call_str)
-            has_low_level_call = has_low_level_call or ("(success, " in call_str)
-            if idx == end:
-                function_name = fn_name + "_" + str(index)
-
-        template = jinja2.Template(templates["TEST"])
-        return template.render(
-            function_name=function_name,
-            call_list=call_list,
-            file_path=file_path,
-            has_low_level_call=has_low_level_call,
-        )
-        # 1. Take a reproducer list and create a test file based on the name of the last function of the list e.g. test_auto_$function_name
-        # 2. For each object in the list process the call object and add it to the call list
-        # 3. Using the call list to generate a test string
-        # 4. Return the test string
+        for call in calls:
+            step, function_name = self._parse_call_object(call)
+            steps.append(step)
+
+        return CallSequence(steps, function_name)
 
     # pylint: disable=too-many-locals,too-many-branches
-    def _parse_call_object(self, call_dict: dict) -> tuple[str, str]:
+    def _parse_call_object(self, call_dict: Any) -> tuple[CallStep, str]:
         """
-        Takes a single call dictionary, parses it, and returns the series of function calls as a string, along with
-        the name of the last function, which is used as the name of the test.
+        Takes a single call dictionary, parses it, and returns the step of the call sequence, along with the name
+        of the last function, which is used as the name of the test.
         """
         # 1. Parse call object and save the variables
-        time_delay = int(call_dict["blockTimestampDelay"])
-        block_delay = int(call_dict["blockNumberDelay"])
-        value = int(call_dict["call"]["value"], 16)
+        (
+            time_delay,
+            block_delay,
+            value,
+            caller,
+            data,
+            method_name,
+            method_signature,
+        ) = unpack_medusa_call(call_dict)
         has_delay = time_delay > 0 or block_delay > 0
         function_name: str = ""
 
         # @note Medusa has no concept of empty calls
         # @note Added to support Medusa <=0.1.3
-        if "methodName" in call_dict["call"]["dataAbiValues"]:
-            function_name = call_dict["call"]["dataAbiValues"]["methodName"]
-        elif "methodSignature" in call_dict["call"]["dataAbiValues"]:
-            function_name = call_dict["call"]["dataAbiValues"]["methodSignature"].split("(")[0]
+        if method_name is not None:
+            function_name = method_name
+        elif method_signature is not None:
+            function_name = method_signature.split("(")[0]
         else:
-            handle_exit(
+            raise CorpusFormatError(
                 "There was an issue parsing the Medusa call sequences. This indicates a breaking change in the call sequence format, please open an issue at https://github.com/crytic/fuzz-utils/issues"
             )
 
-        function_parameters = call_dict["call"]["dataAbiValues"]["inputValues"]
-        data = call_dict["call"]["data"]
         data_bytes = bytes.fromhex(data[10:]) if len(data) > 10 else b""
 
-        if len(function_parameters) == 0:
-            function_parameters = ""
-        caller = call_dict["call"]["from"]
-
-        slither_entry_point: FunctionContract
-
-        for entry_point in self.target.functions_entry_points:
-            if entry_point.name == function_name:
-                slither_entry_point = entry_point
+        # The selector identifies overloaded functions, the name is only used if the selector is unknown
+        slither_entry_point: FunctionSnapshot | None = self.entry_points_by_selector.get(
+            data[:10].lower()
+        )
+        if slither_entry_point is None and function_name in self.entry_points_by_name:
+            slither_entry_point = self.entry_points_by_name[function_name][-1]
 
-        if "slither_entry_point" not in locals():
-            handle_exit(
-                f"\n* Slither could not find the function `{function_name}` specified in the call object"
+        if slither_entry_point is None:
+            raise UnknownFunctionError(
+                f"Slither could not find the function `{function_name}` specified in the call object"
             )
 
         if not slither_entry_point.payable:
@@ -122,131 +141,131 @@ class Medusa:
         variable_definition: str = ""
 
         if len(data_bytes) > 0 and len(slither_entry_point.parameters) > 0:
-            types, _, _ = self._get_types_signature(slither_entry_point.parameters, None)
+            plan = self._get_decode_plan(slither_entry_point)
             # Nested tuple
-            decoded = abi.decode(types, data_bytes)
-            _, func_params, variable_definition = self._get_types_signature(
-                slither_entry_point.parameters, decoded
-            )
-            parameters.extend(func_params)
-
-        parameters_str: str = ""
-        if isinstance(slither_entry_point.parameters, list):
-            if self.named_inputs and len(slither_entry_point.parameters) > 0:
-                for idx, input_param in enumerate(slither_entry_point.parameters):
-                    parameters[idx] = input_param.name + ": " + parameters[idx]
-                parameters_str = "{" + ", ".join(parameters) + "}"
-            else:
-                parameters_str = ", ".join(parameters)
-
-        # 3. Generate a call string and return it
-        template = jinja2.Template(templates["CALL"])
-        call_str = template.render(
-            has_delay=has_delay,
+            decoded = plan.decoder(ContextFramesBytesIO(data_bytes))  # type: ignore[no-untyped-call]
+            for format_parameter, decoded_value in zip(plan.formatters, decoded):
+                parameter_value, parameter_definitions = format_parameter(decoded_value)
+                parameters.append(parameter_value)
+                variable_definition += parameter_definitions
+
+        # 3. Generate the call step and return it. If we need to define local variables, they precede the call
+        step = CallStep(
+            "CALL",
             time_delay=time_delay,
             block_delay=block_delay,
             caller=caller,
             value=value,
-            function_parameters=parameters_str,
-            function_name=function_name,
-            contract_name=self.target_name,
+            function=slither_entry_point,
+            arguments=tuple(parameters),
+            variable_definition=variable_definition,
+            warp=has_delay,
+            roll=has_delay,
+            prank=True,
         )
-        # If we need to define local variables, append them to the call sequence
-        if variable_definition is not None:
-            call_str = variable_definition + call_str
-
-        return call_str, function_name
-
-    def _get_types_signature(
-        self, parameters: list, decoded_values: tuple | None
-    ) -> tuple[list, list, str]:
-        types: list[str] = []
-        wrapped_parameters: list[str] = []
-        var_definitions: str = ""
-
-        for idx, parameter in enumerate(parameters):
-            value = None
-            if decoded_values:
-                value = decoded_values[idx]
-
-            (abi_type, param_value, var_def) = self._match_type(parameter, value)
-            types.append(abi_type)
-            wrapped_parameters.append(param_value)
-            var_definitions += var_def
-        return (types, wrapped_parameters, var_definitions)
-
-    def _match_type(self, parameter: Any, values: Any) -> tuple[str, str, str]:
-        abi_type: str = ""
-        param_value: str = ""
-        var_def: str = ""
-
+        return step, function_name
+
+    def _get_decode_plan(self, entry_point: FunctionSnapshot) -> DecodePlan:
+        """Returns the decode plan of an entry point, which is only built the first time it is called"""
+        plan = self.decode_plans.get(entry_point.selector)
+        if plan is None:
+            types: list[str] = []
+            formatters: list[Formatter] = []
+            for parameter in entry_point.parameters:
+                abi_type, formatter = self._compile_parameter(parameter)
+                types.append(abi_type)
+                formatters.append(formatter)
+            plan = DecodePlan(tuple(types), registry.get_tuple_decoder(*types), tuple(formatters))
+            self.decode_plans[entry_point.selector] = plan
+        return plan
+
+    def _compile_parameter(self, parameter: Any) -> tuple[str, Formatter]:
+        """
+        Walks the type of a parameter once, and returns its type for ABI decoding, along with a formatter that
+        returns the literal value and the local variable definitions of a decoded value of that type
+        """
         match parameter.type:
-            case ElementaryType():  # type: ignore[misc]
-                abi_type, param_value = process_elementary_type(parameter.type.type, values)  # type: ignore[unreachable]
-            case ArrayType():  # type: ignore[misc]
-                length = parameter.type.length if parameter.type.length else ""  # type: ignore[unreachable]
-                matched_type, _, _ = self._match_type(parameter.type, None)
-                abi_type = f"{matched_type}[{length}]"
-
-                if parameter.type.is_dynamic_array:
-                    # TODO make it work with multidim dynamic arrays
-                    if values:
-                        dyn_length = len(values)
-                        array_type: str = ""
-
-                        if isinstance(
-                            parameter.type.type,
-                            (Structure | StructureContract | Enum | EnumContract),
-                        ):
-                            array_type = parameter.type.type.name
-                        else:
-                            array_type = parameter.type.type
-                        # If dynamic array of the same name and type was already declared, reuse it. Else, declare a new one.
-                        if (array_type, parameter.name) in self.declared_variables:
-                            var_def += f"{parameter.name} = new {array_type}[]({dyn_length});\n"
-                        else:
-                            var_def += f"{array_type}[] memory {parameter.name} = new {array_type}[]({dyn_length});\n"
-
-                        self.declared_variables.add((array_type, parameter.name))
-
-                        for idx, value in enumerate(values):
-                            _, matched_value, _ = self._match_type(parameter.type, value)
-                            var_def += f"        {parameter.name}[{idx}] = {matched_value};\n"
-                        param_value = parameter.name
-                else:
-                    matched_values = []
-                    if values:
-                        for idx, value in enumerate(values):
-                            _, matched_value, _ = self._match_type(parameter.type, value)
-                            matched_values.append(matched_value)
-
-                        param_value = f"[{','.join(matched_values)}]"
-            case UserDefinedType():  # type: ignore[misc]
-                match parameter.type.type:  # type: ignore[unreachable]
-                    case Structure() | StructureContract():
-                        matched_types = []
-                        matched_values = []
-                        for idx, struct_field in enumerate(parameter.type.type.elems_ordered):
-                            value = None
-                            if values:
-                                value = values[idx]
-
-                            field_type, field_value, field_definitions = self._match_type(
-                                struct_field, value
-                            )
-                            var_def += field_definitions
-                            matched_types.append(field_type)
-
-                            if values:
-                                matched_values.append(field_value)
-                        abi_type = f"({','.join(matched_types)})"
-                        param_value = f"{parameter.type}({','.join(matched_values)})"
-                    case Enum() | EnumContract():
-                        abi_type = "uint8"
-                        if str(values):
-                            param_value = f"{parameter.type}({values})"
-
-        return (abi_type, param_value, var_def)
+            case ElementaryTypeSnapshot():
+                return self._compile_elementary_type(parameter.type.type)
+            case ArrayTypeSnapshot():
+                return self._compile_array_type(parameter)
+            case StructTypeSnapshot():
+                return self._compile_struct_type(parameter.type)
+            case EnumTypeSnapshot():
+                enum_name = str(parameter.type)
+                return "uint8", lambda values: (
+                    f"{enum_name}({values})" if str(values) else "",
+                    "",
+                )
+        return "", lambda _: ("", "")
+
+    # pylint: disable=R0201
+    def _compile_elementary_type(self, parameter_type: str) -> tuple[str, Formatter]:
+        abi_type, _ = process_elementary_type(parameter_type, None)
+
+        def format_elementary(values: Any) -> tuple[str, str]:
+            if values is None:
+                return "", ""
+            return populate_parameter_value(parameter_type, values), ""
+
+        return abi_type, format_elementary
+
+    def _compile_array_type(self, parameter: Any) -> tuple[str, Formatter]:
+        array_type = parameter.type
+        length = array_type.length if array_type.length else ""
+        element_type, format_element = self._compile_parameter(array_type)
+        abi_type = f"{element_type}[{length}]"
+
+        if not array_type.is_dynamic_array:
+
+            def format_fixed_array(values: Any) -> tuple[str, str]:
+                if not values:
+                    return "", ""
+                matched_values = [format_element(value)[0] for value in values]
+                return f"[{','.join(matched_values)}]", ""
+
+            return abi_type, format_fixed_array
+
+        def format_dynamic_array(values: Any) -> tuple[str, str]:
+            # TODO make it work with multidim dynamic arrays
+            if not values:
+                return "", ""
+            name = parameter.name
+            element_name = str(array_type.type)
+            dyn_length = len(values)
+            # If dynamic array of the same name and type was already declared, reuse it. Else, declare a new one.
+            if (element_name, name) in self.declared_variables:
+                var_def = f"{name} = new {element_name}[]({dyn_length});\n"
+            else:
+                var_def = f"{element_name}[] memory {name} = new {element_name}[]({dyn_length});\n"
+            self.declared_variables.add((element_name, name))
+
+            for idx, value in enumerate(values):
+                var_def += f"        {name}[{idx}] = {format_element(value)[0]};\n"
+            return name, var_def
+
+        return abi_type, format_dynamic_array
+
+    def _compile_struct_type(self, struct_type: StructTypeSnapshot) -> tuple[str, Formatter]:
+        field_types: list[str] = []
+        field_formatters: list[Formatter] = []
+        for struct_field in struct_type.fields:
+            field_type, format_field = self._compile_parameter(struct_field)
+            field_types.append(field_type)
+            field_formatters.append(format_field)
+        struct_name = str(struct_type)
+
+        def format_struct(values: Any) -> tuple[str, str]:
+            var_def = ""
+            matched_values = []
+            for idx, format_field in enumerate(field_formatters):
+                field_value, field_definitions = format_field(values[idx] if values else None)
+                var_def += field_definitions
+                if values:
+                    matched_values.append(field_value)
+            return f"{struct_name}({','.join(matched_values)})", var_def
+
+        return f"({','.join(field_types)})", format_struct
 
 
 def process_elementary_type(parameter_type: str, values: Any) -> tuple[str, str]:
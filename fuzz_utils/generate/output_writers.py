@@ -0,0 +1,117 @@
+"""Writes the rendered tests of a test generation run to the test files of an output"""
+import os
+from collections import deque
+from contextlib import ExitStack
+from typing import Any
+import jinja2
+
+from fuzz_utils.utils.file_manager import atomic_open, save_file_if_changed
+
+
+class _PendingTests:
+    """The tests added to a streamed test file that the template didn't consume yet"""
+
+    __slots__ = ("tests", "closed")
+
+    def __init__(self) -> None:
+        self.tests: deque[str] = deque()
+        self.closed = False
+
+    def __iter__(self) -> "_PendingTests":
+        return self
+
+    def __next__(self) -> str:
+        if self.tests:
+            return self.tests.popleft()
+        if self.closed:
+            raise StopIteration
+        raise RuntimeError("The test file template requested a test that wasn't added yet")
+
+
+class SingleFileWriter:
+    """
+    Streams the tests to a single test file. The template is rendered as the tests are added, so several test files
+    can be written from one pass over the corpus without holding the tests in memory.
+    """
+
+    def __init__(
+        self,
+        template: jinja2.Template,
+        template_args: dict[str, Any],
+        output_path: str,
+        stack: ExitStack,
+    ) -> None:
+        self.output_path = output_path
+        self.output_paths = [output_path]
+        self._pending = _PendingTests()
+        self._outfile = stack.enter_context(atomic_open(output_path))
+        self._chunks = template.generate(tests=self._pending, suffix="", **template_args)
+
+    def add(self, test: str) -> None:
+        """Writes the template up to, and including, the test"""
+        self._pending.tests.append(test)
+        while self._pending.tests:
+            self._outfile.write(next(self._chunks))
+
+    def finish(self) -> None:
+        """Writes the rest of the template. The test file replaces the previous one once the stack is closed"""
+        self._pending.closed = True
+        self._outfile.writelines(self._chunks)
+
+    def summary(self) -> str:
+        """Returns the message printed once the test file is written"""
+        return f"Generated a test file in {self.output_path}"
+
+
+class ShardedFileWriter:
+    """
+    Splits the tests across numbered test files, each containing its own test contract. Test files whose content
+    didn't change are not rewritten, and test files left over from a previous run with more shards are removed.
+    """
+
+    def __init__(
+        self,
+        template: jinja2.Template,
+        template_args: dict[str, Any],
+        shard_prefix: str,
+        tests_per_file: int,
+    ) -> None:
+        self.template = template
+        self.template_args = template_args
+        self.shard_prefix = shard_prefix
+        self.tests_per_file = tests_per_file
+        self.output_paths: list[str] = []
+        self.updated = 0
+        self._shard_tests: list[str] = []
+
+    def add(self, test: str) -> None:
+        """Adds a test to the current shard, and writes the shard once it is full"""
+        self._shard_tests.append(test)
+        if len(self._shard_tests) == self.tests_per_file:
+            self._write_shard()
+
+    def finish(self) -> None:
+        """Writes the last shard, and removes the shards of a previous run that produced more test files"""
+        if self._shard_tests or not self.output_paths:
+            self._write_shard()
+
+        stale_shard = len(self.output_paths)
+        while os.path.exists(f"{self.shard_prefix}{stale_shard}.t.sol"):
+            os.remove(f"{self.shard_prefix}{stale_shard}.t.sol")
+            stale_shard += 1
+
+    def summary(self) -> str:
+        """Returns the message printed once the test files are written"""
+        return f"Generated {len(self.output_paths)} test files in {self.shard_prefix}*.t.sol ({self.updated} updated)"
+
+    def _write_shard(self) -> None:
+        """Renders the tests of the current shard to the next numbered test file"""
+        shard = len(self.output_paths)
+        content = self.template.render(
+            tests=self._shard_tests, suffix=f"_{shard}", **self.template_args
+        )
+        output_path = f"{self.shard_prefix}{shard}.t.sol"
+        if save_file_if_changed(output_path, content):
+            self.updated += 1
+        self.output_paths.append(output_path)
+        self._shard_tests = []
@@ -0,0 +1,137 @@
+""" Counts the corpus files, sequences, calls, failures, and tests of a test generation run """
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.file_manager import atomic_open
+from fuzz_utils.utils.profiler import Profiler
+
+
+@dataclass
+class SequenceError:
+    """A corpus file that was skipped, the stage it failed in, and the type and message of the exception"""
+
+    file_path: str
+    stage: str
+    error: str
+    message: str
+
+    def to_json(self) -> dict[str, str]:
+        """Returns the error as a JSON object"""
+        return {
+            "filePath": self.file_path,
+            "stage": self.stage,
+            "error": self.error,
+            "message": self.message,
+        }
+
+
+def sequence_error(file_path: str, stage: str, exception: Exception) -> SequenceError:
+    """Returns the error of a corpus file that failed to load or parse"""
+    return SequenceError(file_path, stage, type(exception).__name__, str(exception).strip())
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class RunMetrics:
+    """The counts of a test generation run. The failures are grouped by the type of the exception that caused them"""
+
+    files_scanned: int = 0
+    bytes_read: int = 0
+    files_loaded: int = 0
+    sequences_parsed: int = 0
+    calls_decoded: int = 0
+    tests_reused: int = 0
+    tests_emitted: int = 0
+    load_failures: Counter[str] = field(default_factory=Counter)
+    parse_failures: Counter[str] = field(default_factory=Counter)
+    errors: list[SequenceError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def add_error(self, error: SequenceError) -> None:
+        """Records a corpus file that was skipped, and counts its failure"""
+        failures = self.load_failures if error.stage == "load" else self.parse_failures
+        failures[error.error] += 1
+        self.errors.append(error)
+
+    def add(self, other: "RunMetrics") -> None:
+        """Adds the counts of another run"""
+        self.files_scanned += other.files_scanned
+        self.bytes_read += other.bytes_read
+        self.files_loaded += other.files_loaded
+        self.sequences_parsed += other.sequences_parsed
+        self.calls_decoded += other.calls_decoded
+        self.tests_reused += other.tests_reused
+        self.tests_emitted += other.tests_emitted
+        self.load_failures.update(other.load_failures)
+        self.parse_failures.update(other.parse_failures)
+        self.errors.extend(other.errors)
+        self.seconds += other.seconds
+
+    def to_json(self) -> dict[str, Any]:
+        """Returns the counts, and the rates derived from them"""
+        parse_failures = sum(self.parse_failures.values())
+        attempted = self.sequences_parsed + parse_failures
+        return {
+            "filesScanned": self.files_scanned,
+            "bytesRead": self.bytes_read,
+            "filesLoaded": self.files_loaded,
+            "loadFailures": dict(self.load_failures),
+            "sequencesParsed": self.sequences_parsed,
+            "callsDecoded": self.calls_decoded,
+            "parseFailures": dict(self.parse_failures),
+            "testsReused": self.tests_reused,
+            "testsEmitted": self.tests_emitted,
+            "seconds": self.seconds,
+            "sequencesPerSecond": self.sequences_parsed / self.seconds if self.seconds else 0.0,
+            "parseFailureRate": parse_failures / attempted if attempted else 0.0,
+            "errors": [error.to_json() for error in self.errors],
+        }
+
+
+def print_error_report(errors: list[SequenceError], converted_to: str = "unit tests") -> None:
+    """Prints the corpus files that were skipped, grouped by the type of their exception"""
+    if not errors:
+        return
+    CryticPrint().print_warning(
+        f"Skipped {len(errors)} corpus files that could not be converted to {converted_to}:"
+    )
+    for error_type in sorted({error.error for error in errors}):
+        grouped = [error for error in errors if error.error == error_type]
+        CryticPrint().print_warning(f"    {error_type} ({len(grouped)}):")
+        for error in grouped:
+            CryticPrint().print_no_format(
+                f"        {error.file_path} ({error.stage}): {error.message}"
+            )
+
+
+def metrics_report(profiler: Profiler, targets: list[tuple[dict, RunMetrics]]) -> dict[str, Any]:
+    """
+    Returns the stage timings of the command, and the metrics of each target and of the whole run. The rates of the
+    whole run are relative to the wall time of the command
+    """
+    totals = RunMetrics()
+    for _, metrics in targets:
+        totals.add(metrics)
+    totals.seconds = profiler.seconds
+    return {
+        **profiler.report(),
+        "totals": totals.to_json(),
+        "targets": [
+            {
+                "targetContract": config["targetContract"],
+                "fuzzer": config["fuzzer"],
+                "corpusDir": config["corpusDir"],
+                **metrics.to_json(),
+            }
+            for config, metrics in targets
+        ],
+    }
+
+
+def save_metrics(output_path: str, report: dict[str, Any]) -> None:
+    """Saves the metrics report as JSON"""
+    with atomic_open(output_path) as outfile:
+        json.dump(report, outfile, indent=4)
+    CryticPrint().print_success(f"Saved the run metrics to {output_path}")
@@ -0,0 +1,71 @@
+""" Selects a subset of call sequences that covers the features of the whole corpus """
+import heapq
+from dataclasses import dataclass
+
+# Reproducers are features of their own, so every reproducer is kept by the selection
+REPRODUCER_FEATURE_PREFIX = "reproducer:"
+SELECTION_MODES = ("all", "coverage")
+
+
+@dataclass
+class CoverageReport:
+    """Counts the sequences and features of the corpus, and how many of them are covered by the selection"""
+
+    sequences: int = 0
+    selected: int = 0
+    features: int = 0
+    covered_features: int = 0
+    reproducers: int = 0
+    covered_reproducers: int = 0
+
+
+def reproducer_feature(file_path: str) -> str:
+    """Returns the feature that is only covered by the reproducer in the file"""
+    return f"{REPRODUCER_FEATURE_PREFIX}{file_path}"
+
+
+def select_sequences(
+    sequence_features: list[list[str]], max_tests: int
+) -> tuple[list[int], CoverageReport]:
+    """
+    Greedily selects the sequences that cover the most features not covered yet, until every feature is covered or
+    `max_tests` sequences are selected. Reproducers are selected first. Returns the indices of the selected sequences
+    in corpus order, and the achieved coverage. A `max_tests` of 0 doesn't limit the number of sequences.
+    """
+    features = [set(features) for features in sequence_features]
+    all_features = set().union(*features)
+    reproducers = {
+        feature for feature in all_features if feature.startswith(REPRODUCER_FEATURE_PREFIX)
+    }
+    covered: set[str] = set()
+    selected: list[int] = []
+
+    # Reproducers are ranked before the other sequences, then sequences are ranked by their gain, the number of
+    # features they cover that aren't covered yet. Gains only decrease as features are covered, so the stale gains in
+    # the heap are upper bounds, and a sequence is only selected once its recomputed rank is still the best
+    heap = [
+        (sequence.isdisjoint(reproducers), -len(sequence), idx)
+        for idx, sequence in enumerate(features)
+    ]
+    heapq.heapify(heap)
+    while (
+        heap and (max_tests == 0 or len(selected) < max_tests) and len(covered) < len(all_features)
+    ):
+        not_reproducer, _, idx = heapq.heappop(heap)
+        gain = len(features[idx] - covered)
+        if gain == 0:
+            continue
+        if heap and (not_reproducer, -gain, idx) > heap[0]:
+            heapq.heappush(heap, (not_reproducer, -gain, idx))
+            continue
+        selected.append(idx)
+        covered |= features[idx]
+
+    return sorted(selected), CoverageReport(
+        sequences=len(features),
+        selected=len(selected),
+        features=len(all_features) - len(reproducers),
+        covered_features=len(covered) - len(covered & reproducers),
+        reproducers=len(reproducers),
+        covered_reproducers=len(covered & reproducers),
+    )
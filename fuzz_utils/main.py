@@ -1,7 +1,7 @@
 """ Generates a test file from Echidna reproducers """
 import sys
 import argparse
-from pkg_resources import require
+from importlib import metadata
 from fuzz_utils.parsing.parser import define_subparsers, run_command
 
 # pylint: disable=too-many-locals,too-many-statements
@@ -13,11 +13,11 @@ def main() -> None:  # type: ignore[func-returns-value]
     parser.add_argument(
         "--version",
         help="displays the current version",
-        version=require("fuzz-utils")[0].version,
+        version=metadata.version("fuzz-utils"),
         action="version",
     )
     subparsers = parser.add_subparsers(dest="command", help="sub-command help")
-    define_subparsers(subparsers)
+    define_subparsers(subparsers, sys.argv[1:])
     args = parser.parse_args()
     command_success: bool = run_command(args)
     if not command_success:
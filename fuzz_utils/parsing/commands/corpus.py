@@ -0,0 +1,279 @@
+"""Defines the flags and logic associated with the `corpus` command"""
+import os
+import time
+from argparse import Namespace, ArgumentParser
+from fuzz_utils.corpus.CorpusConverter import CorpusConverter
+from fuzz_utils.corpus.CorpusSynthesizer import CorpusSynthesizer
+from fuzz_utils.generate.run_metrics import print_error_report
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.compile_cache import load_slither
+from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.utils.target_snapshot import ContractSnapshot, create_target_snapshot
+from fuzz_utils.parsing.parser_util import check_config_and_set_default_values, open_config
+
+COMMAND: str = "corpus"
+
+# The numeric `synth` flags and their configuration fields. Zero is a meaningful value for most of them
+SYNTH_NUMERIC_FLAGS = {
+    "sequences": "sequences",
+    "seed": "seed",
+    "min_length": "minLength",
+    "max_length": "maxLength",
+    "max_time_delay": "maxTimeDelay",
+    "max_block_delay": "maxBlockDelay",
+    "max_value": "maxValue",
+    "max_array_length": "maxArrayLength",
+}
+
+
+def corpus_flags(parser: ArgumentParser) -> None:
+    """The `corpus` command flags, which select one of its subcommands"""
+    subparsers = parser.add_subparsers(dest="corpus_command", help="Corpus subcommands")
+    synth_flags(
+        subparsers.add_parser(
+            "synth",
+            help="Generate random call sequences to a target, in the corpus format of a fuzzer.",
+        )
+    )
+    convert_flags(
+        subparsers.add_parser(
+            "convert",
+            help="Convert the call sequences of a corpus to the corpus format of the other fuzzer.",
+        )
+    )
+
+
+def synth_flags(parser: ArgumentParser) -> None:
+    """The `corpus synth` subcommand flags"""
+    parser.add_argument(
+        "compilation_path", help="Path to the Echidna/Medusa test harness or Foundry directory."
+    )
+    parser.add_argument("-c", "--contract", dest="target_contract", help="Define the contract name")
+    parser.add_argument(
+        "-cd",
+        "--corpus-dir",
+        dest="corpus_dir",
+        help="Path to the corpus directory the call sequences are written to.",
+    )
+    parser.add_argument(
+        "-f",
+        "--fuzzer",
+        dest="selected_fuzzer",
+        help="Define the corpus format of the call sequences. Valid inputs: 'echidna', 'medusa'",
+    )
+    parser.add_argument(
+        "-n", "--sequences", dest="sequences", type=int, help="Define the number of call sequences."
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        help="Define the seed of the random generator. The same seed always generates the same corpus.",
+    )
+    parser.add_argument(
+        "--min-length",
+        dest="min_length",
+        type=int,
+        help="Define the minimum number of calls of a sequence.",
+    )
+    parser.add_argument(
+        "--max-length",
+        dest="max_length",
+        type=int,
+        help="Define the maximum number of calls of a sequence.",
+    )
+    parser.add_argument(
+        "--length-distribution",
+        dest="length_distribution",
+        help="Define the distribution of the sequence lengths. Valid inputs: 'uniform', 'geometric'",
+    )
+    parser.add_argument(
+        "--max-time-delay",
+        dest="max_time_delay",
+        type=int,
+        help="Define the maximum number of seconds between two calls.",
+    )
+    parser.add_argument(
+        "--max-block-delay",
+        dest="max_block_delay",
+        type=int,
+        help="Define the maximum number of blocks between two calls.",
+    )
+    parser.add_argument(
+        "--max-value",
+        dest="max_value",
+        type=int,
+        help="Define the maximum value, in wei, sent to payable functions.",
+    )
+    parser.add_argument(
+        "--max-array-length",
+        dest="max_array_length",
+        type=int,
+        help="Define the maximum length of the dynamic arrays.",
+    )
+    parser.add_argument("--config", dest="config", help="Define the location of the config file.")
+    parser.add_argument(
+        "--no-compile-cache",
+        dest="no_compile_cache",
+        help="Always recompile the project, instead of reusing the cached compilation when the sources didn't change.",
+        default=False,
+        action="store_true",
+    )
+
+
+def convert_flags(parser: ArgumentParser) -> None:
+    """The `corpus convert` subcommand flags"""
+    parser.add_argument(
+        "compilation_path", help="Path to the Echidna/Medusa test harness or Foundry directory."
+    )
+    parser.add_argument("-c", "--contract", dest="target_contract", help="Define the contract name")
+    parser.add_argument(
+        "-cd",
+        "--corpus-dir",
+        dest="corpus_dir",
+        help="Path to the corpus directory whose call sequences are converted.",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_fuzzer",
+        help="Define the corpus format of the corpus directory. Valid inputs: 'echidna', 'medusa'",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_fuzzer",
+        help="Define the corpus format the call sequences are converted to. Valid inputs: 'echidna', 'medusa'",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        dest="output_dir",
+        help="Path to the corpus directory the converted call sequences are written to.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        help="Define the number of processes used to convert the call sequences.",
+    )
+    parser.add_argument("--config", dest="config", help="Define the location of the config file.")
+    parser.add_argument(
+        "--no-compile-cache",
+        dest="no_compile_cache",
+        help="Always recompile the project, instead of reusing the cached compilation when the sources didn't change.",
+        default=False,
+        action="store_true",
+    )
+
+
+def corpus_command(args: Namespace) -> None:
+    """The execution logic of the `corpus` command"""
+    match args.corpus_command:
+        case "synth":
+            synth_command(args)
+        case "convert":
+            convert_command(args)
+        case _:
+            handle_exit(
+                "Please specify a corpus subcommand. Supported subcommands: synth, convert."
+            )
+
+
+def synth_command(args: Namespace) -> None:
+    """The execution logic of the `corpus synth` subcommand"""
+    config: dict = {}
+    if args.config:
+        config = open_config(args.config, COMMAND)
+
+    if args.compilation_path:
+        config["compilationPath"] = args.compilation_path
+    if args.target_contract:
+        config["targetContract"] = args.target_contract
+    if args.corpus_dir:
+        config["corpusDir"] = args.corpus_dir
+    if args.selected_fuzzer:
+        config["fuzzer"] = args.selected_fuzzer.lower()
+    if args.length_distribution:
+        config["lengthDistribution"] = args.length_distribution.lower()
+    for flag, field in SYNTH_NUMERIC_FLAGS.items():
+        if getattr(args, flag) is not None:
+            config[field] = getattr(args, flag)
+    if args.no_compile_cache:
+        config["compileCache"] = False
+    elif "compileCache" not in config:
+        config["compileCache"] = True
+    check_config_and_set_default_values(
+        config, ["compilationPath", "fuzzer", "corpusDir"], [".", "medusa", "corpus"]
+    )
+
+    target = load_target(config)
+    synthesizer = CorpusSynthesizer(target, config["fuzzer"], config)
+    start = time.perf_counter()
+    sequence_dir = synthesizer.write_corpus(config["corpusDir"], synthesizer.config["sequences"])
+    CryticPrint().print_success(
+        f"Generated {synthesizer.config['sequences']} call sequences to {target.name} in {sequence_dir} in {time.perf_counter() - start:.2f}s"
+    )
+
+
+def convert_command(args: Namespace) -> None:
+    """The execution logic of the `corpus convert` subcommand"""
+    config: dict = {}
+    if args.config:
+        config = open_config(args.config, COMMAND)
+
+    if args.compilation_path:
+        config["compilationPath"] = args.compilation_path
+    if args.target_contract:
+        config["targetContract"] = args.target_contract
+    if args.corpus_dir:
+        config["corpusDir"] = args.corpus_dir
+    if args.from_fuzzer:
+        config["fromFuzzer"] = args.from_fuzzer.lower()
+    if args.to_fuzzer:
+        config["toFuzzer"] = args.to_fuzzer.lower()
+    if args.output_dir:
+        config["outputDir"] = args.output_dir
+    if args.jobs:
+        config["jobs"] = args.jobs
+    if args.no_compile_cache:
+        config["compileCache"] = False
+    elif "compileCache" not in config:
+        config["compileCache"] = True
+    check_config_and_set_default_values(
+        config, ["compilationPath", "corpusDir", "fromFuzzer"], [".", "corpus", "medusa"]
+    )
+    # The corpus is converted to the format of the other fuzzer by default
+    if not config.get("toFuzzer"):
+        config["toFuzzer"] = "echidna" if config["fromFuzzer"] == "medusa" else "medusa"
+    # The converted corpus is written next to the source corpus by default
+    if not config.get("outputDir"):
+        config["outputDir"] = f"{os.path.normpath(config['corpusDir'])}-{config['toFuzzer']}"
+
+    target = load_target(config)
+    converter = CorpusConverter(target, config["fromFuzzer"], config["toFuzzer"])
+    start = time.perf_counter()
+    sequence_dir, converted, errors = converter.convert_corpus(
+        config["corpusDir"], config["outputDir"], config.get("jobs", 1)
+    )
+    print_error_report(errors, f"the {converter.to_fuzzer} corpus format")
+    CryticPrint().print_success(
+        f"Converted {converted} call sequences to {target.name} from the {converter.from_fuzzer} to the {converter.to_fuzzer} corpus format in {sequence_dir} in {time.perf_counter() - start:.2f}s"
+    )
+
+
+def load_target(config: dict) -> ContractSnapshot:
+    """Runs Slither and returns the snapshot of the target contract, which is derived if the project only has one"""
+    CryticPrint().print_information("Running Slither...")
+    slither = load_slither(
+        config["compilationPath"],
+        config["compileCache"],
+        [config["targetContract"]] if config.get("targetContract") else [],
+    )
+    if not config.get("targetContract"):
+        if len(slither.contracts_derived) != 1:
+            handle_exit(
+                "Target contract cannot be determined. Please specify the target with `-c targetName`"
+            )
+        config["targetContract"] = slither.contracts_derived[0].name
+    return create_target_snapshot(get_target_contract(slither, config["targetContract"]))
@@ -1,20 +1,56 @@
 """Defines the flags and logic associated with the `generate` command"""
+import os
+import time
+import multiprocessing
 from pathlib import Path
 from argparse import Namespace, ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from slither import Slither
 from fuzz_utils.utils.crytic_print import CryticPrint
 from fuzz_utils.generate.FoundryTest import FoundryTest
+from fuzz_utils.generate.call_sequence import OPTIMIZATION_PASSES
 from fuzz_utils.generate.fuzzers.Medusa import Medusa
 from fuzz_utils.generate.fuzzers.Echidna import Echidna
+from fuzz_utils.generate.run_metrics import RunMetrics, metrics_report, save_metrics
 from fuzz_utils.utils.error_handler import handle_exit
 from fuzz_utils.parsing.parser_util import check_config_and_set_default_values, open_config
 from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.utils.compile_cache import load_slither
+from fuzz_utils.utils.profiler import finish_profiling, stage, start_profiling, stop_profiling
 
 COMMAND: str = "generate"
 
 
 def generate_flags(parser: ArgumentParser) -> None:
     """The unit test generation parser flags"""
+    unit_test_flags(parser)
+    parser.add_argument(
+        "--target-jobs",
+        dest="target_jobs",
+        type=int,
+        help="Define the number of processes used to generate the tests of the targets listed in the config file.",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        help="Print the time spent in each stage of the generation: compilation, corpus reading, parsing, rendering, and writing.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-output",
+        dest="profile_output",
+        help="Save the stage timings to PROFILE_OUTPUT.json and the cProfile statistics to PROFILE_OUTPUT.prof. Implies --profile.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        dest="metrics_json",
+        help="Save the metrics of the run to a JSON file: the files scanned, bytes read, sequences parsed, calls decoded, failures by cause, tests emitted, and the time spent in each stage.",
+    )
+
+
+def unit_test_flags(parser: ArgumentParser) -> None:
+    """The flags that define the target, the corpus, and the generated tests, shared with the `watch` command"""
     parser.add_argument(
         "compilation_path", help="Path to the Echidna/Medusa test harness or Foundry directory."
     )
@@ -59,11 +95,102 @@ def generate_flags(parser: ArgumentParser) -> None:
         default=False,
         action="store_true",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        help="Define the number of processes used to parse the corpus sequences.",
+    )
+    parser.add_argument(
+        "--tests-per-file",
+        dest="tests_per_file",
+        type=int,
+        help="Split the generated tests across multiple test files, each containing at most this many tests.",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        help="Only parse the corpus sequences that are new or changed since the last run, reusing the other tests.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--deduplicate",
+        dest="deduplicate",
+        help="Only generate one unit test for each unique call sequence.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--optimize",
+        dest="optimize",
+        help="Optimize the call sequences before rendering: coalesce delays, drop zero delays, and collapse pranks.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--select",
+        dest="select",
+        help="Define which corpus sequences are converted to unit tests: all, or a subset covering every (function, selector, caller) combination and every reproducer.",
+    )
+    parser.add_argument(
+        "--max-tests",
+        dest="max_tests",
+        type=int,
+        help="Define the maximum number of unit tests, selecting the corpus sequences that cover the most combinations.",
+    )
+    parser.add_argument(
+        "--no-compile-cache",
+        dest="no_compile_cache",
+        help="Always recompile the project, instead of reusing the cached compilation when the sources didn't change.",
+        default=False,
+        action="store_true",
+    )
 
 
-# pylint: disable=too-many-branches
 def generate_command(args: Namespace) -> None:
     """The execution logic of the `generate` command"""
+    print_stages = args.profile or bool(args.profile_output)
+    # The stage timings are also part of the metrics
+    if print_stages or args.metrics_json:
+        start_profiling(COMMAND, bool(args.profile_output))
+    config = build_config(args)
+    if args.target_jobs:
+        config["targetJobs"] = args.target_jobs
+    CryticPrint().print_information("Running Slither...")
+    with stage("compilation"):
+        slither = load_slither(
+            config["compilationPath"], config["compileCache"], target_contract_names(config)
+        )
+
+    if config.get("targets"):
+        target_metrics = generate_targets(config, slither)
+    else:
+        foundry_test = create_foundry_test(config, slither)
+        foundry_test.create_poc()
+        target_metrics = [(config, foundry_test.metrics)]
+    CryticPrint().print_success("Done!")
+    profiler = finish_profiling(args.profile_output, print_stages)
+    if args.metrics_json and profiler is not None:
+        save_metrics(args.metrics_json, metrics_report(profiler, target_metrics))
+
+
+def target_contract_names(config: dict) -> list[str]:
+    """Returns the names of the target contracts set in the configuration"""
+    if config.get("targets"):
+        return [
+            entry["targetContract"] for entry in config["targets"] if entry.get("targetContract")
+        ]
+    return [config["targetContract"]] if config.get("targetContract") else []
+
+
+# pylint: disable=too-many-branches
+def build_config(args: Namespace) -> dict:
+    """
+    Reads the `generate` configuration, overrides it with the values of the test generation flags, and sets the default
+    values
+    """
     config: dict = {}
     # If the config file is defined, read it
     if args.config:
@@ -91,15 +218,57 @@ def generate_command(args: Namespace) -> None:
     else:
         if "allSequences" not in config:
             config["allSequences"] = False
+    if args.jobs:
+        config["jobs"] = args.jobs
+    if args.tests_per_file:
+        config["testsPerFile"] = args.tests_per_file
+    if args.incremental:
+        config["incremental"] = args.incremental
+    if args.deduplicate:
+        config["deduplicate"] = args.deduplicate
+    if args.optimize:
+        config["optimizations"] = list(OPTIMIZATION_PASSES)
+    if args.select:
+        config["select"] = args.select.lower()
+    if args.max_tests:
+        config["maxTests"] = args.max_tests
+    if args.no_compile_cache:
+        config["compileCache"] = False
+    elif "compileCache" not in config:
+        config["compileCache"] = True
 
     check_config_and_set_default_values(
         config,
         ["compilationPath", "testsDir", "fuzzer", "corpusDir"],
         [".", "test", "medusa", "corpus"],
     )
+    if config.get("targets"):
+        check_target_test_files(config)
+    return config
 
-    CryticPrint().print_information("Running Slither...")
-    slither = Slither(args.compilation_path)
+
+def check_target_test_files(config: dict) -> None:
+    """Exits if two entries of the `targets` list write to the same test files, which would overwrite each other"""
+    written: dict[tuple[str, str, str], dict] = {}
+    for entry in config["targets"]:
+        target_config = config | entry
+        target_contract = target_config.get("targetContract", "")
+        fuzzer = target_config["fuzzer"].lower()
+        tests_dirs = [
+            output.get("testsDir", target_config["testsDir"])
+            for output in target_config.get("outputs", [])
+        ] or [target_config["testsDir"]]
+        for tests_dir in tests_dirs:
+            files = (os.path.normpath(tests_dir), target_contract, fuzzer)
+            if files in written:
+                handle_exit(
+                    f"The generate configuration targets {written[files]} and {entry} write to the same test files: {os.path.join(tests_dir, target_contract)}_{fuzzer.capitalize()}_Test*.t.sol."
+                )
+            written[files] = entry
+
+
+def create_foundry_test(config: dict, slither: Slither) -> FoundryTest:
+    """Sets up the fuzzer and the test generation for the target"""
     fuzzer: Echidna | Medusa
 
     derive_config(slither, config)
@@ -121,9 +290,75 @@ def generate_command(args: Namespace) -> None:
     CryticPrint().print_information(
         f"Generating Foundry unit tests based on the {fuzzer.name} reproducers..."
     )
-    foundry_test = FoundryTest(config, slither, fuzzer)
+    return FoundryTest(config, slither, fuzzer)
+
+
+def generate_targets(config: dict, slither: Slither) -> list[tuple[dict, RunMetrics]]:
+    """
+    Generates the unit tests of each target and corpus pair in the `targets` list, sharing the Slither object. The
+    entries can override the fuzzer, testsDir, and inheritancePath of the configuration. Returns the configuration
+    and metrics of each target.
+    """
+    target_configs: list[dict] = []
+    for entry in config["targets"]:
+        if not entry.get("targetContract") or not entry.get("corpusDir"):
+            handle_exit(
+                f"The generate configuration target {entry} must define the targetContract and corpusDir fields."
+            )
+        target_config = {key: value for key, value in config.items() if key != "targets"}
+        target_config.update(entry)
+        target_config["fuzzer"] = target_config["fuzzer"].lower()
+        target_configs.append(target_config)
+
+    start = time.perf_counter()
+    target_jobs = config.get("targetJobs", 1)
+    # The worker processes are forked, so they share the Slither object instead of pickling it
+    if target_jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(
+            max_workers=target_jobs,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_target_worker,
+            initargs=(slither,),
+        ) as executor:
+            results = list(executor.map(_generate_target_in_worker, target_configs))
+    else:
+        results = [generate_target(target_config, slither) for target_config in target_configs]
+
+    CryticPrint().print_information(
+        f"Generated the unit tests of {len(target_configs)} targets in {time.perf_counter() - start:.2f}s:"
+    )
+    for target_config, (elapsed, _) in zip(target_configs, results):
+        CryticPrint().print_no_format(
+            f"    {target_config['targetContract']} ({target_config['fuzzer']}, {target_config['corpusDir']}): {elapsed:.2f}s"
+        )
+    return [
+        (target_config, metrics) for target_config, (_, metrics) in zip(target_configs, results)
+    ]
+
+
+def generate_target(config: dict, slither: Slither) -> tuple[float, RunMetrics]:
+    """Generates the unit tests of a single target, and returns the seconds it took and its metrics"""
+    start = time.perf_counter()
+    foundry_test = create_foundry_test(config, slither)
     foundry_test.create_poc()
-    CryticPrint().print_success("Done!")
+    return time.perf_counter() - start, foundry_test.metrics
+
+
+# The Slither object used by a worker process, inherited from the parent process when it is forked
+_worker_slither: Slither
+
+
+def _init_target_worker(slither: Slither) -> None:
+    """Stores the Slither object in the worker process"""
+    global _worker_slither  # pylint: disable=global-statement
+    _worker_slither = slither
+    # The timings of the worker processes aren't reported, so the inherited profiler is stopped
+    stop_profiling()
+
+
+def _generate_target_in_worker(config: dict) -> tuple[float, RunMetrics]:
+    """Generates the unit tests of a single target in a worker process"""
+    return generate_target(config, _worker_slither)
 
 
 def derive_config(slither: Slither, config: dict) -> None:
@@ -142,9 +377,24 @@ def derive_config(slither: Slither, config: dict) -> None:
 
     # Derive inheritance path if it is not defined
     if "inheritancePath" not in config or len(config["inheritancePath"]) == 0:
-        contract = get_target_contract(slither, config["targetContract"])
-        contract_path = Path(contract.source_mapping.filename.relative)
-        tests_path = Path(config["testsDir"])
-        config["inheritancePath"] = str(
-            Path(*([".." * len(tests_path.parts)])).joinpath(contract_path)
+        config["inheritancePath"] = derive_inheritance_path(
+            slither, config["targetContract"], config["testsDir"]
         )
+    # The outputs are copied, since the targets share the outputs list of the configuration
+    outputs = []
+    for output in config.get("outputs", []):
+        output = dict(output)
+        if output.get("testsDir") and not output.get("inheritancePath"):
+            output["inheritancePath"] = derive_inheritance_path(
+                slither, config["targetContract"], output["testsDir"]
+            )
+        outputs.append(output)
+    config["outputs"] = outputs
+
+
+def derive_inheritance_path(slither: Slither, target_contract: str, tests_dir: str) -> str:
+    """Derive the path of the target contract, relative to the tests directory"""
+    contract = get_target_contract(slither, target_contract)
+    contract_path = Path(contract.source_mapping.filename.relative)
+    tests_path = Path(tests_dir)
+    return str(Path(*([".." * len(tests_path.parts)])).joinpath(contract_path))
@@ -1,11 +1,12 @@
 """Defines the flags and logic associated with the `template` command"""
 import os
 from argparse import Namespace, ArgumentParser
-from slither import Slither
 from fuzz_utils.template.HarnessGenerator import HarnessGenerator
 from fuzz_utils.utils.crytic_print import CryticPrint
 from fuzz_utils.utils.remappings import find_remappings
+from fuzz_utils.utils.compile_cache import load_slither
 from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.profiler import finish_profiling, stage, start_profiling
 from fuzz_utils.parsing.parser_util import (
     check_configuration_field_exists_and_non_empty,
     open_config,
@@ -37,10 +38,31 @@ def template_flags(parser: ArgumentParser) -> None:
         dest="mode",
         help="Define the harness generation strategy you want to use. Valid options are `simple`, `prank`, `actor`",
     )
+    parser.add_argument(
+        "--no-compile-cache",
+        dest="no_compile_cache",
+        help="Always recompile the project, instead of reusing the cached compilation when the sources didn't change.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        help="Print the time spent in each stage of the generation: compilation, remapping detection, rendering, and writing.",
+        default=False,
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-output",
+        dest="profile_output",
+        help="Save the stage timings to PROFILE_OUTPUT.json and the cProfile statistics to PROFILE_OUTPUT.prof. Implies --profile.",
+    )
 
 
 def template_command(args: Namespace) -> None:
     """The execution logic of the `generate` command"""
+    if args.profile or args.profile_output:
+        start_profiling(COMMAND, bool(args.profile_output))
     config: dict = {}
     if args.output_dir:
         output_dir = os.path.join("./test", args.output_dir)
@@ -58,16 +80,25 @@ def template_command(args: Namespace) -> None:
     if args.mode:
         config["mode"] = args.mode.lower()
     config["outputDir"] = output_dir
+    if args.no_compile_cache:
+        config["compileCache"] = False
+    elif "compileCache" not in config:
+        config["compileCache"] = True
 
     CryticPrint().print_information("Running Slither...")
-    slither = Slither(config["compilationPath"])
+    with stage("compilation"):
+        slither = load_slither(
+            config["compilationPath"], config["compileCache"], config.get("targets", [])
+        )
 
     # Check if dependencies are installed
     include_attacks = bool("attacks" in config and len(config["attacks"]) > 0)
-    remappings = find_remappings(include_attacks, slither)
+    with stage("remappings"):
+        remappings = find_remappings(include_attacks, slither)
 
     generator = HarnessGenerator(config, slither, remappings)
     generator.generate_templates()
+    finish_profiling(args.profile_output)
 
 
 def check_configuration(config: dict) -> None:
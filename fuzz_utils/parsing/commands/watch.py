@@ -0,0 +1,70 @@
+"""Defines the flags and logic associated with the `watch` command"""
+from argparse import Namespace, ArgumentParser
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.file_watcher import DirectoryWatcher, has_inotify
+from fuzz_utils.utils.compile_cache import load_slither
+from fuzz_utils.parsing.commands.generate import (
+    build_config,
+    create_foundry_test,
+    target_contract_names,
+    unit_test_flags,
+)
+
+
+def watch_flags(parser: ArgumentParser) -> None:
+    """The `watch` command flags, which extend the flags of the generated unit tests"""
+    unit_test_flags(parser)
+    parser.add_argument(
+        "--debounce",
+        dest="debounce",
+        type=float,
+        default=2.0,
+        help="Define the number of seconds without new corpus files to wait for before updating the tests.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        dest="poll_interval",
+        type=float,
+        default=1.0,
+        help="Define the number of seconds between checks of the corpus directories, if inotify isn't available.",
+    )
+    parser.add_argument(
+        "--max-wait",
+        dest="max_wait",
+        type=float,
+        default=30.0,
+        help="Define the maximum number of seconds to wait for the corpus files to stop changing before updating the tests.",
+    )
+
+
+def watch_command(args: Namespace) -> None:
+    """The execution logic of the `watch` command"""
+    config = build_config(args)
+    if config.get("targets"):
+        handle_exit(
+            "The watch command only supports a single target. Remove the targets field of the configuration, or run a watch command for each target."
+        )
+    # Only the new and changed corpus files are parsed each time the tests are updated
+    config["incremental"] = True
+    CryticPrint().print_information("Running Slither...")
+    slither = load_slither(
+        config["compilationPath"], config["compileCache"], target_contract_names(config)
+    )
+    foundry_test = create_foundry_test(config, slither)
+
+    directories = foundry_test.corpus_directories()
+    # The watcher is started first, so the corpus files written while the tests are generated aren't missed
+    watcher = DirectoryWatcher(directories, args.debounce, args.poll_interval, args.max_wait)
+    foundry_test.create_poc()
+
+    CryticPrint().print_information(
+        f"Watching {', '.join(directories)} for new corpus files using {'inotify' if has_inotify() else 'polling'}. Press Ctrl+C to stop."
+    )
+    try:
+        while True:
+            watcher.wait_for_changes()
+            CryticPrint().print_information("Corpus files changed, updating the tests...")
+            foundry_test.create_poc()
+    except KeyboardInterrupt:
+        CryticPrint().print_success("Stopped watching the corpus directories.")
@@ -1,34 +1,52 @@
 """Defines all the parser commands"""
-from typing import Any
+from typing import Any, Callable
+from importlib import import_module
 from argparse import Namespace, _SubParsersAction
-from fuzz_utils.parsing.commands.generate import generate_command, generate_flags
-from fuzz_utils.parsing.commands.template import template_command, template_flags
-from fuzz_utils.parsing.commands.init import init_command, init_flags
 
+# The command modules are only imported when their command is run, since they import slither,
+# eth_abi, and jinja2, which would slow down the startup of every other command
 parsers: dict[str, dict[str, Any]] = {
     "init": {
-        "command": init_command,
+        "module": "fuzz_utils.parsing.commands.init",
+        "command": "init_command",
         "help": "Generate an initial configuration file.",
-        "flags": init_flags,
+        "flags": "init_flags",
         "subparser": None,
     },
     "template": {
-        "command": template_command,
+        "module": "fuzz_utils.parsing.commands.template",
+        "command": "template_command",
         "help": "Generate an initial configuration file.",
-        "flags": template_flags,
+        "flags": "template_flags",
         "subparser": None,
     },
     "generate": {
-        "command": generate_command,
+        "module": "fuzz_utils.parsing.commands.generate",
+        "command": "generate_command",
         "help": "Generate unit tests from fuzzer corpora sequences.",
-        "flags": generate_flags,
+        "flags": "generate_flags",
+        "subparser": None,
+    },
+    "watch": {
+        "module": "fuzz_utils.parsing.commands.watch",
+        "command": "watch_command",
+        "help": "Watch the fuzzer corpora and update the unit tests as new sequences are found.",
+        "flags": "watch_flags",
+        "subparser": None,
+    },
+    "corpus": {
+        "module": "fuzz_utils.parsing.commands.corpus",
+        "command": "corpus_command",
+        "help": "Manage fuzzer corpora, e.g. synthesize random call sequences to a target.",
+        "flags": "corpus_flags",
         "subparser": None,
     },
 }
 
 
-def define_subparsers(subparser: _SubParsersAction) -> None:
-    """Defines the subparser flags and commands"""
+def define_subparsers(subparser: _SubParsersAction, argv: list[str]) -> None:
+    """Defines the subparsers, and the flags of the command selected in the arguments"""
+    selected_command = find_command(argv)
 
     for key, value in parsers.items():
         # Initialize subparser
@@ -36,13 +54,24 @@ def define_subparsers(subparser: _SubParsersAction) -> None:
         parser = subparser.add_parser(key, help=help_str)
         value["subparser"] = parser
         # Initialize subparser flags
-        value["flags"](parser)
+        if key == selected_command:
+            load_command_attribute(key, "flags")(parser)
+
+
+def find_command(argv: list[str]) -> str | None:
+    """Returns the command selected in the arguments, which is the first argument that isn't an option"""
+    return next((arg for arg in argv if not arg.startswith("-")), None)
+
+
+def load_command_attribute(command: str, attribute: str) -> Callable[..., None]:
+    """Imports the module of the command and returns its flags or command function"""
+    return getattr(import_module(parsers[command]["module"]), parsers[command][attribute])  # type: ignore[no-any-return]
 
 
 def run_command(args: Namespace) -> bool:
     """Runs the command associated with a particular subparser"""
     if args.command in parsers:
-        parsers[args.command]["command"](args)
+        load_command_attribute(args.command, "command")(args)
         return True
 
     return False
@@ -9,11 +9,12 @@ from slither.core.declarations.contract import Contract
 from slither.core.declarations.function_contract import FunctionContract
 from slither.core.solidity_types.user_defined_type import UserDefinedType
 from slither.core.solidity_types.array_type import ArrayType
-import jinja2
 from fuzz_utils.utils.crytic_print import CryticPrint
 from fuzz_utils.utils.file_manager import check_and_create_dirs, save_file
 from fuzz_utils.utils.error_handler import handle_exit
+from fuzz_utils.utils.profiler import stage
 from fuzz_utils.utils.slither_utils import get_target_contract
+from fuzz_utils.templates.template_cache import get_template
 from fuzz_utils.templates.harness_templates import templates
 from fuzz_utils.templates.default_config import default_config
 
@@ -137,7 +138,8 @@ class HarnessGenerator:
         check_and_create_dirs(self.output_dir, ["utils", "actors", "harnesses", "attacks"])
 
         # Generate the Attacks
-        attacks: list[Actor] = self._generate_attacks()
+        with stage("attacks"):
+            attacks: list[Actor] = self._generate_attacks()
         CryticPrint().print_success("    Attacks generated!")
         actors: list = []
 
@@ -145,15 +147,25 @@ class HarnessGenerator:
         match self.mode:
             case "actor":
                 # Generate the Actors
-                actors = self._generate_actors()
+                with stage("actors"):
+                    actors = self._generate_actors()
                 CryticPrint().print_success("    Actors generated!")
             case "prank":
                 actors = self.config["actors"]
             case _:
                 pass
 
+        # Compile the generated Attacks and Actors, which are wrapped by the harness
+        generated: list[tuple[Actor, str]] = [
+            (attack, f"{attack.name}Attack") for attack in attacks
+        ]
+        if self.mode == "actor":
+            generated.extend((actor, f"Actor{actor.name}") for actor in actors)
+        self._compile_generated_contracts(generated)
+
         # Generate the harness
-        self._generate_harness(actors, attacks)
+        with stage("harness"):
+            self._generate_harness(actors, attacks)
 
         CryticPrint().print_success("    Harness generated!")
         CryticPrint().print_success(f"Files saved to {self.config['outputDir']}")
@@ -281,9 +293,6 @@ class HarnessGenerator:
         CryticPrint().print_information("Generating Attack contracts:")
         attacks: list[Actor] = []
 
-        # Check if dir exists, if not, create it
-        attack_output_path = os.path.join(self.output_dir, "attacks")
-
         for attack_config in self.config["attacks"]:
             name = attack_config["name"]
             if name in templates["ATTACKS"]:
@@ -304,9 +313,6 @@ class HarnessGenerator:
                 attack.set_content(content)
                 attack.set_path(path)
 
-                attack_slither = Slither(f"{attack_output_path}/Attack{name}.sol")
-                attack.set_contract(get_target_contract(attack_slither, f"{name}Attack"))
-
                 attacks.append(attack)
             else:
                 CryticPrint().print_warning(
@@ -369,9 +375,6 @@ class HarnessGenerator:
         CryticPrint().print_information("Generating Actors:")
         actor_contracts: list[Actor] = []
 
-        # Check if dir exists, if not, create it
-        actor_output_path = os.path.join(self.output_dir, "actors")  # Input param: directory
-
         # Loop over actors list
         for actor_config in self.config["actors"]:
             name = actor_config["name"]
@@ -391,14 +394,35 @@ class HarnessGenerator:
             actor.set_content(content)
             actor.set_path(path)
 
-            actor_slither = Slither(f"{actor_output_path}/Actor{name}.sol")
-            actor.set_contract(get_target_contract(actor_slither, f"Actor{name}"))
-
             actor_contracts.append(actor)
 
         # Return Actors list
         return actor_contracts
 
+    def _compile_generated_contracts(self, generated: list[tuple[Actor, str]]) -> None:
+        """Compiles the generated contracts in a single compilation, and sets the contract of each one"""
+        if not generated:
+            return
+
+        CryticPrint().print_information("Compiling the generated contracts...")
+        # The temporary file imports the contracts the same way as the harness, from the same directory
+        compilation_path = os.path.join(self.output_dir, "harnesses", "GeneratedContracts.sol")
+        imports = "\n".join(f'import "{actor.path}";' for actor, _ in generated)
+        save_file(
+            os.path.join(self.output_dir, "harnesses"),
+            "/GeneratedContracts",
+            ".sol",
+            f"// SPDX-License-Identifier: UNLICENSED\npragma solidity ^0.8.0;\n\n{imports}\n",
+        )
+        try:
+            with stage("compilation"):
+                generated_slither = Slither(compilation_path)
+        finally:
+            os.remove(compilation_path)
+
+        for actor, contract_name in generated:
+            actor.set_contract(get_target_contract(generated_slither, contract_name))
+
     def _generate_functions(
         self,
         target_contract: Contract,
@@ -496,9 +520,11 @@ class HarnessGenerator:
         self, template_str: str, directory_name: str, file_name: str, target: Harness | Actor
     ) -> tuple[str, str]:
         output_path = os.path.join(self.output_dir, directory_name)
-        template = jinja2.Template(template_str)
-        content = template.render(target=target, remappings=self.remappings)
-        save_file(output_path, f"/{file_name}", ".sol", content)
+        template = get_template(template_str)
+        with stage("render"):
+            content = template.render(target=target, remappings=self.remappings)
+        with stage("write"):
+            save_file(output_path, f"/{file_name}", ".sol", content)
 
         return content, f"../{directory_name}/{file_name}.sol"
 
@@ -9,6 +9,17 @@ default_config: dict = {
         "inheritancePath": "",
         "namedInputs": False,
         "allSequences": False,
+        "jobs": 1,
+        "testsPerFile": 0,
+        "incremental": False,
+        "deduplicate": False,
+        "optimizations": [],
+        "select": "all",
+        "maxTests": 0,
+        "compileCache": True,
+        "targets": [],
+        "targetJobs": 1,
+        "outputs": [],
     },
     "template": {
         "name": "DefaultHarness",
@@ -16,6 +27,7 @@ default_config: dict = {
         "targets": [],
         "outputDir": "./test/fuzzing",
         "compilationPath": ".",
+        "compileCache": True,
         "actors": [
             {
                 "name": "Default",
@@ -31,4 +43,29 @@ default_config: dict = {
         ],
         "attacks": [],
     },
+    "corpus": {
+        "targetContract": "",
+        "compilationPath": ".",
+        "corpusDir": "corpus",
+        "fuzzer": "medusa",
+        "compileCache": True,
+        "sequences": 1000,
+        "seed": 0,
+        "minLength": 1,
+        "maxLength": 10,
+        "lengthDistribution": "uniform",
+        "maxTimeDelay": 604800,
+        "maxBlockDelay": 60480,
+        "maxValue": 100000000000000000000,
+        "maxArrayLength": 5,
+        "senders": [
+            "0x0000000000000000000000000000000000010000",
+            "0x0000000000000000000000000000000000020000",
+            "0x0000000000000000000000000000000000030000",
+        ],
+        "fromFuzzer": "medusa",
+        "toFuzzer": "",
+        "outputDir": "",
+        "jobs": 1,
+    },
 }
@@ -11,7 +11,7 @@ import "forge-std/Test.sol";
 import "forge-std/console2.sol";
 import "{{file_path}}";
 
-contract {{target_name}}_{{fuzzer}}_Test is Test {
+contract {{target_name}}_{{fuzzer}}_Test{{suffix}} is Test {
     {{target_name}} target;
 
     function setUp() public {
@@ -28,32 +28,54 @@ contract {{target_name}}_{{fuzzer}}_Test is Test {
     """
 
 __CALL_TEMPLATE: str = """
-        {%- if has_delay %}
+        {%- if warp %}
         vm.warp(block.timestamp + {{time_delay}});
+        {%- endif %}
+        {%- if roll %}
         vm.roll(block.number + {{block_delay}});
         {%- endif %}
+        {%- if prank %}
         vm.prank({{caller}});
+        {%- elif start_prank %}
+        vm.startPrank({{caller}});
+        {%- endif %}
         {%- if value > 0 %}
         target.{{function_name}}{value: {{value}}}({{function_parameters}});
         {%- else %}
         target.{{function_name}}({{function_parameters}});
         {%- endif %}
+        {%- if stop_prank %}
+        vm.stopPrank();
+        {%- endif %}
 """
 
 __TRANSFER__TEMPLATE: str = """
-        {%- if has_delay %}
+        {%- if warp %}
         vm.warp(block.timestamp + {{time_delay}});
+        {%- endif %}
+        {%- if roll %}
         vm.roll(block.number + {{block_delay}});
         {%- endif %}
+        {%- if prank %}
         vm.prank({{caller}});
+        {%- elif start_prank %}
+        vm.startPrank({{caller}});
+        {%- endif %}
         (success, ) = payable(address(target)).call{value: {{value}}}("");
         require(success, "Low level call failed.");
+        {%- if stop_prank %}
+        vm.stopPrank();
+        {%- endif %}
 """
 
 __EMPTY_CALL_TEMPLATE: str = """
         // This is an empty call which just increases the block number and timestamp
+        {%- if warp %}
         vm.warp(block.timestamp + {{time_delay}});
+        {%- endif %}
+        {%- if roll %}
         vm.roll(block.number + {{block_delay}});
+        {%- endif %}
     """
 
 __TEST_TEMPLATE: str = """
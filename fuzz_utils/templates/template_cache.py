@@ -0,0 +1,12 @@
+""" Compiles the template strings once per process and shares the compiled templates """
+from functools import lru_cache
+import jinja2
+
+# Uses the same default settings as `jinja2.Template`, so the rendered output doesn't change
+environment = jinja2.Environment()
+
+
+@lru_cache(maxsize=None)
+def get_template(source: str) -> jinja2.Template:
+    """Returns the compiled template of a template string, which is only compiled the first time"""
+    return environment.from_string(source)
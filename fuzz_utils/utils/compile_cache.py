@@ -0,0 +1,127 @@
+""" Caches the crytic-compile export of a project, so Slither only recompiles it when its inputs change """
+import os
+import json
+import hashlib
+import subprocess
+from typing import Iterable
+from slither import Slither
+from crytic_compile.utils.zip import load_from_zip, save_to_zip
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.file_manager import atomic_open
+
+CACHE_DIR = os.path.join(".fuzz-utils", "compile-cache")
+# Files that define the remappings and compiler settings of the supported frameworks
+CONFIG_FILES = (
+    "foundry.toml",
+    "remappings.txt",
+    "hardhat.config.js",
+    "hardhat.config.ts",
+    "truffle-config.js",
+)
+
+
+def load_slither(
+    compilation_path: str, use_cache: bool, contract_names: Iterable[str] = ()
+) -> Slither:
+    """
+    Returns the Slither object of the compilation path, reusing the cached compilation if its inputs didn't change
+    and it contains the contracts named in `contract_names`
+    """
+    if not use_cache:
+        return Slither(compilation_path)
+
+    name = hashlib.sha256(os.path.abspath(compilation_path).encode()).hexdigest()[:16]
+    archive_path = os.path.join(CACHE_DIR, f"{name}.zip")
+    fingerprint_path = os.path.join(CACHE_DIR, f"{name}.json")
+    fingerprint = get_compilation_fingerprint(compilation_path)
+
+    cached = _read_fingerprint(fingerprint_path)
+    if (
+        cached is not None
+        and cached["fingerprint"] == fingerprint
+        and cached["sources"] == hash_source_units(cached["sources"])
+        and os.path.exists(archive_path)
+    ):
+        try:
+            slither = Slither(load_from_zip(archive_path)[0])
+            missing = [
+                contract
+                for contract in contract_names
+                if not slither.get_contract_from_name(contract)
+            ]
+            if not missing:
+                CryticPrint().print_information(f"Compilation cache hit, loaded {archive_path}")
+                return slither
+            CryticPrint().print_information(
+                f"The cached compilation doesn't contain {', '.join(missing)}, recompiling"
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            CryticPrint().print_warning(f"Could not load the cached compilation, recompiling: {e}")
+
+    CryticPrint().print_information("Compilation cache miss, compiling the project")
+    slither = Slither(compilation_path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        save_to_zip([slither.crytic_compile], archive_path, "deflated")
+        sources = hash_source_units(
+            sorted(filename.absolute for filename in slither.crytic_compile.filenames)
+        )
+        with atomic_open(fingerprint_path) as outfile:
+            json.dump({"fingerprint": fingerprint, "sources": sources}, outfile)
+    except OSError as e:
+        CryticPrint().print_warning(f"Could not save the compilation cache: {e}")
+    return slither
+
+
+def get_compilation_fingerprint(compilation_path: str) -> str:
+    """
+    Returns a hash of the compilation path, the solc version, and the framework config files holding the remappings.
+    The source files are tracked separately by `hash_source_units`, since they're only known after compiling
+    """
+    root = compilation_path if os.path.isdir(compilation_path) else "."
+    digest = hashlib.sha256()
+    digest.update(os.path.abspath(compilation_path).encode())
+    digest.update(os.environ.get("SOLC_VERSION", "").encode())
+    digest.update(_get_solc_version().encode())
+
+    for config_file in CONFIG_FILES:
+        path = os.path.join(root, config_file)
+        if os.path.isfile(path):
+            with open(path, "rb") as file:
+                digest.update(config_file.encode())
+                digest.update(hashlib.sha256(file.read()).digest())
+
+    return digest.hexdigest()
+
+
+def hash_source_units(paths: Iterable[str]) -> dict[str, str | None]:
+    """Returns the content hash of each source unit used by a compilation, or None if it was removed"""
+    hashes: dict[str, str | None] = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                hashes[path] = hashlib.sha256(file.read()).hexdigest()
+        except OSError:
+            hashes[path] = None
+    return hashes
+
+
+def _get_solc_version() -> str:
+    """Returns the version output of the solc binary on the PATH, or an empty string if it can't be run"""
+    try:
+        output = subprocess.run(
+            ["solc", "--version"], capture_output=True, text=True, check=True, timeout=10
+        )
+        return output.stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _read_fingerprint(path: str) -> dict | None:
+    """Returns the fingerprint and the source unit hashes of the cached compilation, if there is one"""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            cached = json.load(file)
+        return {"fingerprint": cached["fingerprint"], "sources": cached["sources"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,89 @@
+""" Decodes corpus files into call sequences, using the typed records if msgspec is installed """
+import json
+from typing import Any
+
+try:
+    from msgspec import ValidationError
+    from fuzz_utils.utils.corpus_records import EchidnaNoCall, decoders
+except ImportError:  # msgspec is an optional dependency, installed with `fuzz-utils[fast]`
+    decoders = {}
+
+
+def has_fast_decoding() -> bool:
+    """Returns True if corpus files are decoded into typed records"""
+    return bool(decoders)
+
+
+def decode_corpus_file(data: bytes, fuzzer_name: str) -> Any:
+    """
+    Decodes the content of a corpus file. Files that don't match the typed records, e.g. because of a change in the
+    corpus format, are decoded with the stdlib `json` module instead
+    """
+    decoder = decoders.get(fuzzer_name)
+    if decoder is not None:
+        try:
+            return decoder.decode(data)
+        except ValidationError:
+            pass
+    return json.loads(data)
+
+
+def unpack_medusa_call(call: Any) -> tuple[int, int, int, str, str, str | None, str | None]:
+    """
+    Returns the timestamp delay, block delay, value, caller, calldata, method name, and method signature of a Medusa
+    call, which is either a typed record or a dictionary
+    """
+    if isinstance(call, dict):
+        abi_values = call["call"]["dataAbiValues"]
+        return (
+            int(call["blockTimestampDelay"]),
+            int(call["blockNumberDelay"]),
+            int(call["call"]["value"], 16),
+            call["call"]["from"],
+            call["call"]["data"],
+            abi_values.get("methodName"),
+            abi_values.get("methodSignature"),
+        )
+
+    abi_values = call.call.dataAbiValues
+    return (
+        call.blockTimestampDelay,
+        call.blockNumberDelay,
+        int(call.call.value, 16),
+        call.call.from_,
+        call.call.data,
+        abi_values.methodName,
+        abi_values.methodSignature,
+    )
+
+
+def unpack_echidna_call(call: Any) -> tuple[int, int, int, str, str | None, list[Any]]:
+    """
+    Returns the timestamp delay, block delay, value, caller, function name, and ABI values of an Echidna call, which
+    is either a typed record or a dictionary. The function name is None for empty calls
+    """
+    if isinstance(call, dict):
+        delay = call["delay"]
+        function_name, function_parameters = None, []
+        if call["call"]["tag"] != "NoCall":
+            function_name, function_parameters = call["call"]["contents"]
+        return (
+            int(delay[0], 16),
+            int(delay[1], 16),
+            int(call["value"], 16),
+            call["src"],
+            function_name,
+            function_parameters,
+        )
+
+    function_name, function_parameters = None, []
+    if not isinstance(call.call, EchidnaNoCall):
+        function_name, function_parameters = call.call.contents
+    return (
+        int(call.delay[0], 16),
+        int(call.delay[1], 16),
+        int(call.value, 16),
+        call.src,
+        function_name,
+        function_parameters,
+    )
@@ -0,0 +1,56 @@
+"""Typed records of the fuzzer corpus formats, decoded with msgspec. Fields the tool doesn't use are skipped"""
+# pylint: disable=too-few-public-methods
+from typing import Any
+import msgspec
+
+
+class MedusaAbiValues(msgspec.Struct, gc=False):
+    """The decoded ABI values of a Medusa call. Medusa <=0.1.3 only provides the method signature"""
+
+    methodName: str | None = None
+    methodSignature: str | None = None
+
+
+class MedusaCall(msgspec.Struct, gc=False, rename={"from_": "from"}):
+    """The transaction of a Medusa call"""
+
+    from_: str
+    value: str
+    data: str
+    dataAbiValues: MedusaAbiValues
+
+
+class MedusaTransaction(msgspec.Struct, gc=False):
+    """An element of a Medusa call sequence"""
+
+    call: MedusaCall
+    blockNumberDelay: int
+    blockTimestampDelay: int
+
+
+class EchidnaSolCall(msgspec.Struct, gc=False, tag="SolCall", tag_field="tag"):
+    """
+    An Echidna function call, made of the function name and its tagged ABI values. The ABI values are left as
+    dictionaries: typed records of the nested ABI value variants decode no faster than the untyped values
+    """
+
+    contents: tuple[str, list[Any]]
+
+
+class EchidnaNoCall(msgspec.Struct, gc=False, tag="NoCall", tag_field="tag"):
+    """An Echidna empty call, which only increases the block number and timestamp"""
+
+
+class EchidnaTransaction(msgspec.Struct, gc=False):
+    """An element of an Echidna call sequence"""
+
+    call: EchidnaSolCall | EchidnaNoCall
+    delay: tuple[str, str]
+    src: str
+    value: str
+
+
+decoders: dict[str, msgspec.json.Decoder] = {
+    "Medusa": msgspec.json.Decoder(list[MedusaTransaction]),
+    "Echidna": msgspec.json.Decoder(list[EchidnaTransaction]),
+}
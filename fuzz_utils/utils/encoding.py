@@ -42,53 +42,81 @@ ascii_escape_map = {
 }
 
 
+# Maps the token following a backslash to the latin-1 character of its byte. As in Haskell, decimal escapes take all
+# the following digits, so `\012` is the byte 12, and `\&` is an empty escape that separates an escape from a digit
+escape_tokens: dict[str | None, str] = {
+    seq[1:]: chr(byte[0]) for seq, byte in ascii_escape_map.items()
+}
+escape_tokens.update({str(value): chr(value) for value in range(1, 256)})
+escape_tokens.update({"\\": "\\", '"': '"', "'": "'", "&": ""})
+# An unknown escape only drops the backslash, and the following character is processed normally
+escape_tokens[None] = ""
+
+# Matches an escape sequence in a single pass, trying the named escapes in the order of `ascii_escape_map`
+escape_pattern = re.compile(
+    r"\\([0-9]+|" + "|".join(re.escape(seq[1:]) for seq in ascii_escape_map) + r"|[\\\"'&])?"
+)
+
+# The unicode escape sequence of each byte value
+unicode_escapes = [f"\\u{value:04x}" for value in range(256)]
+
+
+def _replace_escape(match: re.Match) -> str:
+    """Returns the latin-1 character of the byte represented by an escape sequence"""
+    token = match[1]
+    if token in escape_tokens:
+        return escape_tokens[token]
+    # Decimal escapes that are out of range, or written with leading zeros
+    value = int(token)
+    if value > 255:
+        raise ValueError(f"Escaped byte \\{token} is out of range")
+    return chr(value)
+
+
 def parse_echidna_byte_string(s: str, isBytes: bool) -> str:
     """Parses Haskell byte sequence into a Solidity hex literal or unicode literal"""
-    # Replace Haskell-specific escapes with Python bytes
-    # Resultant bytes object
-    result_bytes = bytearray()
-
-    # Regular expression to match decimal values like \160
-    decimal_pattern = re.compile(r"\\(\d{1,3})")
-
-    # Iterator over the string
-    i = 0
-    while i < len(s):
-        # Check for escape sequence
-        if s[i] == "\\":
-            matched = False
-            # Check for known escape sequences
-            for seq, byte in ascii_escape_map.items():
-                if s.startswith(seq, i):
-                    result_bytes.extend(byte)
-                    i += len(seq)
-                    matched = True
-                    break
-            if not matched:
-                # Check for decimal escape
-                dec_match = decimal_pattern.match(s, i)
-                if dec_match:
-                    # Convert the decimal escape to bytes
-                    decimal_value = int(dec_match.group(1))
-                    result_bytes.append(decimal_value)
-                    i += len(dec_match.group(0))
-                else:
-                    # Unknown escape, skip the backslash and process the next character normally
-                    i += 1
-        else:
-            # Normal character, encode and add
-            result_bytes.append(ord(s[i]))
-            i += 1
+    # Replace Haskell-specific escapes with their bytes, as a latin-1 string, then convert the whole string at once
+    result_bytes = escape_pattern.sub(_replace_escape, s).encode("latin-1")
 
     # Convert the resultant bytes to hexadecimal string
     if not isBytes:
-        return byte_to_escape_sequence(bytes(result_bytes))
+        return byte_to_escape_sequence(result_bytes)
     return result_bytes.hex()
 
 
 def byte_to_escape_sequence(byte_data: bytes) -> str:
     """Generates unicode escaped string from bytes"""
-    arr = []
-    for b in byte_data:
-        arr.append(f"\\u{b:04x}")
-    return "".join(arr)
+    return "".join([unicode_escapes[b] for b in byte_data])
+
+
+# The named escape of each control byte, in the format Echidna uses for its byte strings
+echidna_control_escapes = {
+    byte[0]: seq
+    for seq, byte in ascii_escape_map.items()
+    if seq not in ("\\0", "\\SP", "\\FF", "\\CR")
+}
+
+
+def bytes_to_echidna_byte_string(data: bytes) -> str:
+    """
+    Converts bytes into a quoted Haskell byte sequence, in the format of Haskell's `show`, that Echidna and
+    `parse_echidna_byte_string` read back into the same bytes. Quotes and backslashes are written as decimal escapes,
+    so the string can be unquoted with `strip('"')`
+    """
+    escaped: list[str] = ['"']
+    for idx, byte in enumerate(data):
+        next_byte = data[idx + 1] if idx + 1 < len(data) else None
+        if byte in echidna_control_escapes:
+            escaped.append(echidna_control_escapes[byte])
+            # `\SOH` would be read as a single escape
+            if byte == 0x0E and next_byte == ord("H"):
+                escaped.append("\\&")
+        elif byte >= 0x80 or byte in (ord('"'), ord("\\")):
+            escaped.append(f"\\{byte}")
+            # A decimal escape takes all the following digits
+            if next_byte is not None and ord("0") <= next_byte <= ord("9"):
+                escaped.append("\\&")
+        else:
+            escaped.append(chr(byte))
+    escaped.append('"')
+    return "".join(escaped)
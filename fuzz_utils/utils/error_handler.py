@@ -8,3 +8,23 @@ def handle_exit(reason: str) -> NoReturn:
     """Print an error message to the console and exit"""
     CryticPrint().print_error(reason)
     sys.exit()
+
+
+class SequenceDecodeError(Exception):
+    """Raised when a call sequence of a corpus can't be converted to a unit test"""
+
+
+class UnknownFunctionError(SequenceDecodeError):
+    """Raised when a call targets a function that Slither couldn't find in the target contract"""
+
+
+class UnknownTagError(SequenceDecodeError):
+    """Raised when a call parameter has a tag that isn't supported, e.g. after a change in the corpus format"""
+
+
+class ParameterTypeError(SequenceDecodeError):
+    """Raised when a call parameter doesn't match the type of the function parameter"""
+
+
+class CorpusFormatError(SequenceDecodeError):
+    """Raised when a call is missing fields that the corpus format is expected to contain"""
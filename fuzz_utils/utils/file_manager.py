@@ -1,5 +1,7 @@
 """ Manages creation of files and directories """
 import os
+from contextlib import contextmanager
+from typing import Iterator, TextIO
 
 
 def check_and_create_dirs(base_path: str, dirnames: list[str]) -> None:
@@ -14,3 +16,28 @@ def save_file(path: str, file_name: str, suffix: str, content: str) -> None:
     """Saves a file"""
     with open(f"{path}{file_name}{suffix}", "w", encoding="utf-8") as outfile:
         outfile.write(content)
+
+
+@contextmanager
+def atomic_open(path: str) -> Iterator[TextIO]:
+    """Opens a temporary file for writing, which replaces the file at `path` only once it is fully written"""
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as outfile:
+            yield outfile
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def save_file_if_changed(path: str, content: str) -> bool:
+    """Saves a file only if its content differs from the existing file. Returns True if the file was written"""
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            if file.read() == content:
+                return False
+
+    with atomic_open(path) as outfile:
+        outfile.write(content)
+    return True
@@ -0,0 +1,93 @@
+""" Watches directories for new, changed, and removed files """
+import os
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # Not installed, or not running on Linux
+    INotify = None
+
+# The inotify events of files that were fully written, moved, or removed
+WATCHED_EVENTS = (
+    flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE
+    if INotify is not None
+    else 0
+)
+
+
+def has_inotify() -> bool:
+    """Returns True if the directories are watched with inotify, instead of being polled"""
+    return INotify is not None
+
+
+# pylint: disable=too-few-public-methods
+class DirectoryWatcher:
+    """
+    Watches directories for new, changed, and removed files, using inotify when it is available and polling the
+    directories otherwise. Directories that don't exist yet are watched once they are created.
+    """
+
+    def __init__(
+        self, directories: list[str], debounce: float, poll_interval: float, max_wait: float
+    ) -> None:
+        self.directories = directories
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.inotify = INotify() if INotify is not None else None
+        self.watched: set[str] = set()
+        self.snapshot = self._take_snapshot() if self.inotify is None else {}
+        self._watch_new_directories()
+
+    def wait_for_changes(self) -> None:
+        """
+        Blocks until files change, and then until no other file changes for the debounce period. Files that keep
+        changing only delay the return by up to `max_wait` seconds after the first change
+        """
+        while not self._changed(self.poll_interval):
+            pass
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._changed(min(self.debounce, remaining)):
+                return
+
+    def _changed(self, timeout: float) -> bool:
+        """Returns True if a file changed within the timeout"""
+        if self.inotify is None:
+            time.sleep(timeout)
+            snapshot = self._take_snapshot()
+            changed = snapshot != self.snapshot
+            self.snapshot = snapshot
+            return changed
+
+        events = self.inotify.read(timeout=int(timeout * 1000))
+        # A directory created since the last check may already contain files
+        return self._watch_new_directories() or any(event.mask & WATCHED_EVENTS for event in events)
+
+    def _watch_new_directories(self) -> bool:
+        """Adds an inotify watch to the directories that were created, returns True if they contain files"""
+        if self.inotify is None:
+            return False
+
+        has_files = False
+        for directory in self.directories:
+            if directory not in self.watched and os.path.isdir(directory):
+                self.inotify.add_watch(directory, WATCHED_EVENTS)
+                self.watched.add(directory)
+                with os.scandir(directory) as entries:
+                    has_files = has_files or any(entries)
+        return has_files
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """Returns the size and mtime of every file in the watched directories"""
+        snapshot: dict[str, tuple[int, int]] = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
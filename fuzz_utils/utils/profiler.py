@@ -0,0 +1,157 @@
+""" Times the stages of a command, and optionally profiles the whole command with cProfile """
+import json
+import time
+import cProfile
+from dataclasses import asdict, dataclass
+from typing import Any
+from fuzz_utils.utils.crytic_print import CryticPrint
+from fuzz_utils.utils.file_manager import atomic_open
+
+
+@dataclass
+class StageTiming:
+    """The number of times a stage ran, and the seconds spent in it, excluding the stages nested in it"""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Profiler:
+    """
+    Accumulates the time spent in each stage of a command. Stages can be nested, e.g. the lazily generated tests are
+    parsed while the test file is written, and the time of a nested stage is only counted once, in the nested stage.
+    """
+
+    def __init__(self, command: str, use_cprofile: bool) -> None:
+        self.command = command
+        self.stages: dict[str, StageTiming] = {}
+        # The name, start time, and time spent in the nested stages of each running stage
+        self._running: list[list[Any]] = []
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+    def enter_stage(self, name: str) -> None:
+        """Starts timing a stage"""
+        self._running.append([name, time.perf_counter(), 0.0])
+
+    def exit_stage(self) -> None:
+        """Stops timing the last started stage"""
+        name, start, nested = self._running.pop()
+        elapsed = time.perf_counter() - start
+        if self._running:
+            self._running[-1][2] += elapsed
+        timing = self.stages.get(name)
+        if timing is None:
+            timing = self.stages[name] = StageTiming(name)
+        timing.calls += 1
+        timing.seconds += elapsed - nested
+
+    def report(self) -> dict[str, Any]:
+        """Returns the stage timings, and the time that wasn't spent in any stage"""
+        return {
+            "command": self.command,
+            "seconds": self.seconds,
+            "stages": [asdict(timing) for timing in self.stages.values()],
+            "otherSeconds": self.seconds - sum(timing.seconds for timing in self.stages.values()),
+        }
+
+
+class _Stage:
+    """Context manager that times a stage of the running profiler"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        if _profiler is not None:
+            _profiler.enter_stage(self.name)
+
+    def __exit__(self, *args: Any) -> None:
+        if _profiler is not None:
+            _profiler.exit_stage()
+
+
+# The profiler of the running command, if it is profiled
+_profiler: Profiler | None = None
+# The stage context managers are reused, so timing a stage costs one lookup when profiling is disabled
+_stages: dict[str, _Stage] = {}
+
+
+def stage(name: str) -> _Stage:
+    """Returns a context manager that times a stage of the command, if the command is profiled"""
+    timer = _stages.get(name)
+    if timer is None:
+        timer = _stages[name] = _Stage(name)
+    return timer
+
+
+def start_profiling(command: str, use_cprofile: bool) -> Profiler:
+    """Starts timing the stages of the command, and profiling it with cProfile if `use_cprofile` is set"""
+    global _profiler  # pylint: disable=global-statement
+    _profiler = Profiler(command, use_cprofile)
+    if _profiler.cprofile is not None:
+        _profiler.cprofile.enable()
+    return _profiler
+
+
+def stop_profiling() -> Profiler | None:
+    """Stops the running profiler and returns it"""
+    global _profiler  # pylint: disable=global-statement
+    profiler = _profiler
+    _profiler = None
+    if profiler is not None:
+        if profiler.cprofile is not None:
+            profiler.cprofile.disable()
+        profiler.seconds = time.perf_counter() - profiler.start
+    return profiler
+
+
+def finish_profiling(output_path: str | None, print_stages: bool = True) -> Profiler | None:
+    """
+    Stops the running profiler, prints its stage timings if `print_stages` is set, and saves them if `output_path` is
+    set. Returns the profiler, so the timings can be reported elsewhere
+    """
+    profiler = stop_profiling()
+    if profiler is None:
+        return None
+    if print_stages:
+        print_profile(profiler)
+    if output_path:
+        save_profile(profiler, output_path)
+    return profiler
+
+
+def print_profile(profiler: Profiler) -> None:
+    """Prints the seconds spent in each stage, and their share of the command's time"""
+    report = profiler.report()
+    CryticPrint().print_information(
+        f"Profile of the {profiler.command} command ({profiler.seconds:.3f}s):"
+    )
+    rows = [(timing.name, str(timing.calls), timing.seconds) for timing in profiler.stages.values()]
+    rows.append(("other", "", report["otherSeconds"]))
+    width = max(len(name) for name, _, _ in rows)
+    CryticPrint().print_no_format(
+        f"    {'stage'.ljust(width)}  {'seconds':>10}  {'share':>6}  calls"
+    )
+    for name, calls, seconds in rows:
+        share = seconds / profiler.seconds * 100 if profiler.seconds else 0.0
+        CryticPrint().print_no_format(
+            f"    {name.ljust(width)}  {seconds:9.3f}s  {share:5.1f}%  {calls}".rstrip()
+        )
+
+
+def save_profile(profiler: Profiler, output_path: str) -> None:
+    """Saves the stage timings to `<output_path>.json`, and the cProfile statistics to `<output_path>.prof`"""
+    with atomic_open(f"{output_path}.json") as outfile:
+        json.dump(profiler.report(), outfile, indent=4)
+    if profiler.cprofile is not None:
+        profiler.cprofile.dump_stats(f"{output_path}.prof")
+        CryticPrint().print_success(
+            f"Saved the profile to {output_path}.json and {output_path}.prof"
+        )
+    else:
+        CryticPrint().print_success(f"Saved the profile to {output_path}.json")
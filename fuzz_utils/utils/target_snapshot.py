@@ -0,0 +1,165 @@
+"""Picklable snapshot of the Slither information needed to decode call sequences"""
+from dataclasses import dataclass
+
+from slither.core.declarations.contract import Contract
+from slither.core.declarations.function_contract import FunctionContract
+from slither.core.declarations.structure import Structure
+from slither.core.declarations.enum import Enum
+from slither.core.solidity_types.type import Type
+from slither.core.solidity_types.elementary_type import ElementaryType
+from slither.core.solidity_types.array_type import ArrayType
+from slither.core.solidity_types.user_defined_type import UserDefinedType
+from slither.utils.function import get_function_id
+from slither.utils.integer_conversion import convert_string_to_int
+
+
+@dataclass(frozen=True)
+class TypeSnapshot:
+    """Base class for the snapshots of Slither types"""
+
+
+@dataclass(frozen=True)
+class ElementaryTypeSnapshot(TypeSnapshot):
+    """Snapshot of an elementary type, e.g. `uint256`"""
+
+    type: str
+
+    def __str__(self) -> str:
+        return self.type
+
+
+@dataclass(frozen=True)
+class ArrayTypeSnapshot(TypeSnapshot):
+    """Snapshot of a fixed-size or dynamic array type"""
+
+    type: TypeSnapshot
+    length: int | None
+
+    @property
+    def is_dynamic_array(self) -> bool:
+        """Returns True if the array is dynamically sized"""
+        return self.length is None
+
+    def __str__(self) -> str:
+        if self.length is not None:
+            return f"{self.type}[{self.length}]"
+        return f"{self.type}[]"
+
+
+@dataclass(frozen=True)
+class UserDefinedTypeSnapshot(TypeSnapshot):
+    """Snapshot of a user defined type that is neither a struct nor an enum, e.g. a contract"""
+
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True)
+class StructTypeSnapshot(UserDefinedTypeSnapshot):
+    """Snapshot of a struct type, along with its ordered fields"""
+
+    fields: tuple["ParameterSnapshot", ...]
+
+
+@dataclass(frozen=True)
+class EnumTypeSnapshot(UserDefinedTypeSnapshot):
+    """Snapshot of an enum type, along with the names of its members"""
+
+    values: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class UnsupportedTypeSnapshot(TypeSnapshot):
+    """Snapshot of a type that cannot be decoded from a call sequence, e.g. a function type"""
+
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True)
+class ParameterSnapshot:
+    """Snapshot of a function parameter or struct field"""
+
+    name: str
+    type: TypeSnapshot
+
+
+@dataclass(frozen=True)
+class FunctionSnapshot:
+    """Snapshot of a target contract entry point"""
+
+    name: str
+    selector: str
+    payable: bool
+    parameters: tuple[ParameterSnapshot, ...]
+
+
+@dataclass(frozen=True)
+class ContractSnapshot:
+    """Snapshot of a target contract, which can be shared with worker processes"""
+
+    name: str
+    functions_entry_points: tuple[FunctionSnapshot, ...]
+
+
+def create_type_snapshot(solidity_type: Type) -> TypeSnapshot:
+    """Converts a Slither type into its picklable snapshot"""
+    match solidity_type:
+        case ElementaryType():
+            return ElementaryTypeSnapshot(solidity_type.type)
+        case ArrayType():
+            length = None
+            if solidity_type.length_value:
+                length = int(convert_string_to_int(str(solidity_type.length_value)))
+            return ArrayTypeSnapshot(create_type_snapshot(solidity_type.type), length)
+        case UserDefinedType():
+            match solidity_type.type:
+                case Structure():
+                    fields = tuple(
+                        ParameterSnapshot(field.name, create_type_snapshot(field.type))
+                        for field in solidity_type.type.elems_ordered
+                    )
+                    return StructTypeSnapshot(str(solidity_type), fields)
+                case Enum():
+                    return EnumTypeSnapshot(str(solidity_type), tuple(solidity_type.type.values))
+                case _:
+                    return UserDefinedTypeSnapshot(str(solidity_type))
+        case _:
+            return UnsupportedTypeSnapshot(str(solidity_type))
+
+
+def create_function_snapshot(function: FunctionContract) -> FunctionSnapshot:
+    """Converts a Slither function into its picklable snapshot"""
+    parameters = tuple(
+        ParameterSnapshot(parameter.name, create_type_snapshot(parameter.type))
+        for parameter in function.parameters
+    )
+    selector = f"0x{get_function_id(function.solidity_signature):08x}"
+    return FunctionSnapshot(function.name, selector, function.payable, parameters)
+
+
+def create_target_snapshot(contract: Contract) -> ContractSnapshot:
+    """Converts the entry points of a Slither contract into a picklable snapshot"""
+    return ContractSnapshot(
+        contract.name,
+        tuple(create_function_snapshot(function) for function in contract.functions_entry_points),
+    )
+
+
+def index_entry_points(
+    contract: ContractSnapshot,
+) -> tuple[dict[str, list[FunctionSnapshot]], dict[str, FunctionSnapshot]]:
+    """
+    Returns the entry points of a contract indexed by name, where overloaded functions share a name, and indexed by
+    their 4-byte selector, e.g. `0xa9059cbb`
+    """
+    by_name: dict[str, list[FunctionSnapshot]] = {}
+    by_selector: dict[str, FunctionSnapshot] = {}
+    for function in contract.functions_entry_points:
+        by_name.setdefault(function.name, []).append(function)
+        by_selector[function.selector] = function
+    return by_name, by_selector
@@ -10,6 +10,15 @@ from slither import Slither
 from fuzz_utils.generate.FoundryTest import FoundryTest
 from fuzz_utils.generate.fuzzers.Echidna import Echidna
 from fuzz_utils.generate.fuzzers.Medusa import Medusa
+from fuzz_utils.utils.target_snapshot import (
+    ArrayTypeSnapshot,
+    ContractSnapshot,
+    ElementaryTypeSnapshot,
+    EnumTypeSnapshot,
+    FunctionSnapshot,
+    ParameterSnapshot,
+    StructTypeSnapshot,
+)
 
 
 class TestGenerator:
@@ -104,6 +113,40 @@ def value_transfer() -> TestGenerator:
     return TestGenerator(target, target_path, corpus_dir)
 
 
+@pytest.fixture  # type: ignore[misc]
+def market_target() -> ContractSnapshot:
+    """
+    Fixture for the snapshot of a Market contract, whose payable `place` function takes a struct with a dynamic
+    array, an enum, and a string, and whose `cancel` function takes a fixed-size array
+    """
+    order = StructTypeSnapshot(
+        "Market.Order",
+        (
+            ParameterSnapshot(
+                "amounts", ArrayTypeSnapshot(ElementaryTypeSnapshot("uint256"), None)
+            ),
+            ParameterSnapshot("side", EnumTypeSnapshot("Market.Side", ("BUY", "SELL"))),
+            ParameterSnapshot("memo", ElementaryTypeSnapshot("string")),
+        ),
+    )
+    return ContractSnapshot(
+        "Market",
+        (
+            FunctionSnapshot("place", "0x3f54ba0f", True, (ParameterSnapshot("order", order),)),
+            FunctionSnapshot(
+                "cancel",
+                "0x40e58ee5",
+                False,
+                (
+                    ParameterSnapshot(
+                        "ids", ArrayTypeSnapshot(ElementaryTypeSnapshot("bytes32"), 2)
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
 @pytest.fixture(scope="session")  # type: ignore[misc]
 def setup_foundry_temp_dir(tmp_path_factory: Any) -> None:
     """Sets up a temporary directory for the tests that contain all the necessary Foundry files"""
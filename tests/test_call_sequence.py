@@ -0,0 +1,90 @@
+"""Call sequence optimization pass unit tests"""
+from fuzz_utils.generate.call_sequence import (
+    CallStep,
+    OPTIMIZATION_PASSES,
+    count_lines,
+    optimize_sequence,
+    render_calls,
+)
+from fuzz_utils.utils.target_snapshot import (
+    ElementaryTypeSnapshot,
+    FunctionSnapshot,
+    ParameterSnapshot,
+)
+
+DEPOSIT = FunctionSnapshot(
+    "deposit",
+    "0xb6b55f25",
+    False,
+    (ParameterSnapshot("amount", ElementaryTypeSnapshot("uint256")),),
+)
+ALICE = "0x0000000000000000000000000000000000010000"
+BOB = "0x0000000000000000000000000000000000020000"
+
+
+def empty_call(time_delay: int, block_delay: int) -> CallStep:
+    """Returns an empty call step, which only advances the block"""
+    return CallStep("EMPTY_CALL", time_delay, block_delay, warp=True, roll=True)
+
+
+def call(caller: str, time_delay: int = 0, block_delay: int = 0) -> CallStep:
+    """Returns a call step to the target"""
+    has_delay = time_delay > 0 or block_delay > 0
+    return CallStep(
+        "CALL",
+        time_delay,
+        block_delay,
+        caller=caller,
+        function=DEPOSIT,
+        arguments=("uint256(5)",),
+        warp=has_delay,
+        roll=has_delay,
+        prank=True,
+    )
+
+
+def test_empty_calls_are_merged_into_the_next_call() -> None:
+    """Test that the delays of consecutive empty calls are added to the next call, and zero delays are dropped"""
+    steps = [empty_call(10, 1), empty_call(5, 0), call(ALICE, 0, 2), empty_call(0, 0), call(BOB)]
+    optimized, report = optimize_sequence(steps, ["coalesce-delays", "drop-zero-delays"])
+
+    assert [(step.template, step.time_delay, step.block_delay) for step in optimized] == [
+        ("CALL", 15, 3),
+        ("CALL", 0, 0),
+    ]
+    assert not optimized[1].warp and not optimized[1].roll
+    rendered = "".join(render_calls(optimized))
+    assert "vm.warp(block.timestamp + 15);" in rendered
+    assert "vm.roll(block.number + 3);" in rendered
+    assert rendered.count("vm.warp") == 1
+    assert report.cheatcodes_before == 10 and report.cheatcodes_after == 4
+
+
+def test_pranks_of_the_same_caller_are_collapsed() -> None:
+    """Test that runs of calls from the same caller share a single prank"""
+    steps = [call(ALICE), call(ALICE), call(ALICE), call(BOB), call(ALICE)]
+    optimized, _ = optimize_sequence(steps, ["collapse-pranks"])
+    rendered = "".join(render_calls(optimized))
+
+    assert rendered.count(f"vm.startPrank({ALICE});") == 1
+    assert rendered.count("vm.stopPrank();") == 1
+    assert rendered.count("vm.prank(") == 2
+    assert rendered.index("vm.stopPrank();") < rendered.index(f"vm.prank({BOB});")
+
+
+def test_line_counts_match_the_rendered_steps() -> None:
+    """Test that the reported line counts match the rendered steps"""
+    steps = [empty_call(10, 1), call(ALICE, 3, 0), call(ALICE), call(ALICE), empty_call(0, 7)]
+    for optimized in (steps, optimize_sequence(steps, list(OPTIMIZATION_PASSES))[0]):
+        for step, rendered in zip(optimized, render_calls(optimized)):
+            assert count_lines(step) == rendered.count("\n") + 1
+
+
+def test_arguments_are_rendered_with_their_names() -> None:
+    """Test that the renderer names the arguments of the calls, and that steps share their caller strings"""
+    step = call("".join(["0x0000000000000000000000000000", "000000010000"]))
+    assert step.caller is call(ALICE).caller
+    assert (step.function_name, step.selector) == ("deposit", "0xb6b55f25")
+
+    assert "target.deposit(uint256(5));" in render_calls([step])[0]
+    assert "target.deposit({amount: uint256(5)});" in render_calls([step], True)[0]
@@ -0,0 +1,47 @@
+"""Compilation cache fingerprint unit tests"""
+from pathlib import Path
+import pytest
+from fuzz_utils.utils import compile_cache
+from fuzz_utils.utils.compile_cache import get_compilation_fingerprint, hash_source_units
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Creates a Foundry project with a single contract"""
+    monkeypatch.setattr(compile_cache, "_get_solc_version", lambda: "0.8.19")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "Counter.sol").write_text("contract Counter {}")
+    (tmp_path / "foundry.toml").write_text("[profile.default]")
+    return tmp_path
+
+
+def test_fingerprint_tracks_remappings(project: Path) -> None:
+    """Test that changing the remappings changes the fingerprint"""
+    fingerprint = get_compilation_fingerprint(str(project))
+    assert get_compilation_fingerprint(str(project)) == fingerprint
+
+    (project / "remappings.txt").write_text("forge-std/=lib/forge-std/src/")
+    assert get_compilation_fingerprint(str(project)) != fingerprint
+
+
+def test_source_unit_hashes_track_generated_files_and_dependencies(project: Path) -> None:
+    """Test that edits to any source unit of the compilation are detected, including harnesses and dependencies"""
+    harness = project / "test" / "fuzzing" / "DefaultHarness.sol"
+    dependency = project / "node_modules" / "lib" / "Token.sol"
+    for path in (harness, dependency):
+        path.parent.mkdir(parents=True)
+        path.write_text(
+            "/// @notice This file was automatically generated using fuzz-utils\ncontract T {}"
+        )
+    source_units = [str(project / "src" / "Counter.sol"), str(harness), str(dependency)]
+    hashes = hash_source_units(source_units)
+    assert hash_source_units(source_units) == hashes
+
+    for path in (harness, dependency):
+        path.write_text(path.read_text() + "\ncontract U {}")
+        edited = hash_source_units(source_units)
+        assert edited != hashes
+        hashes = edited
+
+    dependency.unlink()
+    assert hash_source_units(source_units)[str(dependency)] is None
@@ -0,0 +1,109 @@
+"""Cross-fuzzer corpus conversion unit tests"""
+from eth_abi import decode
+from fuzz_utils.corpus.CorpusConverter import CorpusConverter
+from fuzz_utils.corpus.CorpusSynthesizer import echidna_call, medusa_call, synthesize_corpus
+from fuzz_utils.utils.target_snapshot import (
+    ArrayTypeSnapshot,
+    ContractSnapshot,
+    ElementaryTypeSnapshot,
+    FunctionSnapshot,
+    ParameterSnapshot,
+    StructTypeSnapshot,
+)
+
+SENDER = "0x0000000000000000000000000000000000010000"
+
+
+def echidna_empty_call(time_delay: int, block_delay: int, function_name: str | None) -> dict:
+    """Returns an Echidna empty call, or a transfer if the function name is empty"""
+    call = {"tag": "NoCall"} if function_name is None else {"tag": "SolCall", "contents": ["", []]}
+    return {
+        "call": call,
+        "delay": [hex(time_delay), hex(block_delay)],
+        "src": SENDER,
+        "value": hex(0 if function_name is None else 9),
+    }
+
+
+def test_converted_sequences_round_trip(market_target: ContractSnapshot) -> None:
+    """Test that converting Echidna sequences to Medusa and back returns the same sequences"""
+    to_medusa = CorpusConverter(market_target, "echidna", "medusa")
+    to_echidna = CorpusConverter(market_target, "medusa", "echidna")
+    for sequence in synthesize_corpus(market_target, "echidna", 20, {"seed": 3, "maxLength": 5}):
+        assert to_echidna.convert_sequence(to_medusa.convert_sequence(sequence)) == sequence
+
+
+def test_empty_calls_and_invalid_strings_are_converted(market_target: ContractSnapshot) -> None:
+    """
+    Test that the delays of Echidna empty calls are added to the next Medusa call, and that strings that aren't valid
+    UTF-8 keep their bytes in the calldata
+    """
+    place = market_target.functions_entry_points[0]
+    converted = CorpusConverter(market_target, "echidna", "medusa").convert_sequence(
+        [
+            echidna_empty_call(3, 4, None),
+            echidna_call(place, [([7], 1, b"\xffok")], SENDER, 5, 10, 20),
+        ]
+    )
+
+    assert len(converted) == 1
+    assert converted[0]["blockTimestampDelay"] == 13
+    assert converted[0]["blockNumberDelay"] == 24
+    assert converted[0]["call"]["value"] == hex(5)
+    assert converted[0]["call"]["dataAbiValues"]["inputValues"][0]["memo"] == "\ufffdok"
+    ((amounts, side, memo),) = decode(
+        ["(uint256[],uint8,bytes)"], bytes.fromhex(converted[0]["call"]["data"][10:])
+    )
+    assert (amounts, side, memo) == ((7,), 1, b"\xffok")
+
+
+def test_transfers_are_skipped_and_trailing_delays_dropped(market_target: ContractSnapshot) -> None:
+    """
+    Test that only the Echidna transfers of a sequence are skipped, with their delays added to the next call, and that
+    the delays after the last call don't change when it is made
+    """
+    place = market_target.functions_entry_points[0]
+    converted = CorpusConverter(market_target, "echidna", "medusa").convert_sequence(
+        [
+            echidna_call(place, [([1], 0, b"")], SENDER, 0, 1, 1),
+            echidna_empty_call(2, 3, ""),
+            echidna_call(place, [([2], 1, b"")], SENDER, 0, 10, 20),
+            echidna_empty_call(4, 5, ""),
+            echidna_empty_call(6, 7, None),
+        ]
+    )
+
+    assert len(converted) == 2
+    assert [call["call"]["nonce"] for call in converted] == [0, 1]
+    assert [call["blockTimestampDelay"] for call in converted] == [1, 12]
+    assert [call["blockNumberDelay"] for call in converted] == [1, 23]
+
+
+def test_medusa_addresses_are_checksummed() -> None:
+    """Test that the addresses of converted Medusa calls, including nested ones and the caller, are checksummed"""
+    address = ElementaryTypeSnapshot("address")
+    set_owners = FunctionSnapshot(
+        "setOwners",
+        "0x5a1f2b3c",
+        False,
+        (
+            ParameterSnapshot("owner", address),
+            ParameterSnapshot("backups", ArrayTypeSnapshot(address, None)),
+            ParameterSnapshot(
+                "pair", StructTypeSnapshot("Vault.Pair", (ParameterSnapshot("admin", address),))
+            ),
+        ),
+    )
+    target = ContractSnapshot("Vault", (set_owners,))
+    owner = "0xbf22cc12f0c22f0e146fa75f3d86c341c40edc2c"
+    sender = "0x00000000000000000000000000000000deadbeef"
+    medusa_sequence = [medusa_call(set_owners, [owner, [owner], (owner,)], sender, 0, 0, 0, 0)]
+
+    converted = CorpusConverter(target, "medusa", "echidna").convert_sequence(medusa_sequence)[0]
+
+    checksummed = "0xbf22cC12F0c22F0e146Fa75f3d86c341c40eDc2c"
+    owner_value, backups, pair = converted["call"]["contents"][1]
+    assert owner_value == {"contents": checksummed, "tag": "AbiAddress"}
+    assert backups["contents"][1] == [owner_value]
+    assert pair["contents"] == [owner_value]
+    assert converted["src"] == "0x00000000000000000000000000000000DeaDBeef"
@@ -0,0 +1,43 @@
+"""Corpus decoding unit tests"""
+import os
+import glob
+import json
+from typing import Any, Callable
+import pytest
+from fuzz_utils.utils.corpus_decoding import (
+    decode_corpus_file,
+    unpack_echidna_call,
+    unpack_medusa_call,
+)
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
+
+
+@pytest.mark.parametrize(
+    "fuzzer_name,pattern,unpack",
+    [
+        ("Echidna", "echidna-corpora/*/*/*.txt", unpack_echidna_call),
+        ("Medusa", "medusa-corpora/*/*/**/*.json", unpack_medusa_call),
+    ],
+)
+def test_typed_records_match_json_decoding(
+    fuzzer_name: str, pattern: str, unpack: Callable[[Any], tuple]
+) -> None:
+    """Test that the typed records unpack to the same values as the dictionaries decoded with `json`"""
+    pytest.importorskip("msgspec")
+    paths = glob.glob(os.path.join(TEST_DATA_DIR, pattern), recursive=True)
+    assert paths
+
+    for path in paths:
+        with open(path, "rb") as file:
+            data = file.read()
+        typed_calls = decode_corpus_file(data, fuzzer_name)
+        json_calls = json.loads(data)
+        assert not isinstance(typed_calls[0], dict)
+        assert [unpack(call) for call in typed_calls] == [unpack(call) for call in json_calls]
+
+
+def test_unknown_format_falls_back_to_json() -> None:
+    """Test that corpus files that don't match the typed records are still decoded"""
+    data = b'[{"call": {"tag": "SolCreate", "contents": []}}]'
+    assert decode_corpus_file(data, "Echidna") == json.loads(data)
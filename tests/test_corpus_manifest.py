@@ -0,0 +1,62 @@
+"""Incremental generation manifest unit tests"""
+import os
+from pathlib import Path
+from fuzz_utils.generate.CorpusManifest import CorpusManifest, hash_content
+
+SETTINGS = {"fuzzer": "Echidna", "targetContract": "BasicTypes", "namedInputs": False}
+TEST = "    function test_auto_check_bool_{index}() public {{}}"
+
+
+def write_corpus_file(path: Path, content: bytes) -> os.stat_result:
+    """Writes a corpus file and returns its stat"""
+    path.write_bytes(content)
+    return os.stat(path)
+
+
+def test_manifest_reuses_unchanged_files_and_keeps_indices(tmp_path: Path) -> None:
+    """Test that unchanged corpus files are reused and new files get the next index after a reload"""
+    manifest_path = str(tmp_path / "manifest" / "BasicTypes_Echidna.json")
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+
+    manifest = CorpusManifest(manifest_path, SETTINGS)
+    for path in (first, second):
+        stat = write_corpus_file(path, path.name.encode())
+        index = manifest.update(str(path), stat, hash_content(path.name.encode()))
+        manifest.set_test(str(path), (TEST.format(index=index),), path.name, [])
+    manifest.save()
+
+    # Touching a file keeps its test, while removing a file doesn't free its index
+    os.utime(first, ns=(0, 0))
+    os.remove(second)
+    third = tmp_path / "third.txt"
+    write_corpus_file(third, b"third")
+
+    manifest = CorpusManifest(manifest_path, SETTINGS)
+    stat = os.stat(first)
+    assert not manifest.is_up_to_date(str(first), stat)
+    assert manifest.matches_content(str(first), stat, hash_content(b"first.txt"))
+    assert manifest.update(str(third), os.stat(third), hash_content(b"third")) == 2
+    manifest.set_test(
+        str(third), (TEST.format(index=2),), "third", ["check_bool:0x1a4b4f5c:0x10000"]
+    )
+    assert manifest.entries[str(third)]["name"] == "test_auto_check_bool_2"
+    assert list(manifest.tests([str(third), str(first)])) == [
+        ((TEST.format(index=0),), "first.txt", []),
+        ((TEST.format(index=2),), "third", ["check_bool:0x1a4b4f5c:0x10000"]),
+    ]
+
+
+def test_manifest_discards_tests_when_settings_change(tmp_path: Path) -> None:
+    """Test that the tests are parsed again when the settings change, without reassigning indices"""
+    manifest_path = str(tmp_path / "BasicTypes_Echidna.json")
+    corpus_file = tmp_path / "first.txt"
+    stat = write_corpus_file(corpus_file, b"first")
+
+    manifest = CorpusManifest(manifest_path, SETTINGS)
+    manifest.update(str(corpus_file), stat, hash_content(b"first"))
+    manifest.set_test(str(corpus_file), (TEST.format(index=0),), "first", [])
+    manifest.save()
+
+    manifest = CorpusManifest(manifest_path, SETTINGS | {"namedInputs": True})
+    assert not manifest.is_up_to_date(str(corpus_file), stat)
+    assert manifest.update(str(corpus_file), stat, hash_content(b"first")) == 0
@@ -0,0 +1,47 @@
+"""Synthetic corpus generation unit tests"""
+from eth_abi import decode
+from fuzz_utils.corpus.CorpusSynthesizer import synthesize_corpus
+from fuzz_utils.utils.corpus_decoding import unpack_echidna_call, unpack_medusa_call
+from fuzz_utils.utils.target_snapshot import ContractSnapshot
+
+CONFIG = {"seed": 7, "minLength": 2, "maxLength": 4}
+
+
+def test_synthetic_sequences_are_deterministic(market_target: ContractSnapshot) -> None:
+    """Test that the same seed generates the same sequences, within the configured lengths"""
+    first = list(synthesize_corpus(market_target, "echidna", 20, CONFIG))
+    assert first == list(synthesize_corpus(market_target, "echidna", 20, CONFIG))
+    assert first != list(synthesize_corpus(market_target, "echidna", 20, CONFIG | {"seed": 8}))
+    assert all(2 <= len(sequence) <= 4 for sequence in first)
+
+    for sequence in first:
+        for call in sequence:
+            _, _, value, _, function_name, parameters = unpack_echidna_call(call)
+            assert function_name in ("place", "cancel")
+            assert value == 0 or function_name == "place"
+            if function_name == "cancel":
+                assert parameters[0]["tag"] == "AbiArray"
+                assert parameters[0]["contents"][0] == 2
+
+
+def test_synthetic_medusa_calldata_is_abi_encoded(market_target: ContractSnapshot) -> None:
+    """Test that the Medusa calldata starts with the selector and decodes to the input values"""
+    for sequence in synthesize_corpus(market_target, "medusa", 20, CONFIG):
+        for call in sequence:
+            _, _, _, _, data, method_name, _ = unpack_medusa_call(call)
+            input_values = call["call"]["dataAbiValues"]["inputValues"]
+            if method_name == "place":
+                assert data.startswith("0x3f54ba0f")
+                ((amounts, side, memo),) = decode(
+                    ["(uint256[],uint8,string)"], bytes.fromhex(data[10:])
+                )
+                assert input_values[0] == {
+                    "amounts": [str(amount) for amount in amounts],
+                    "side": str(side),
+                    "memo": memo,
+                }
+                assert side in (0, 1)
+            else:
+                assert data.startswith("0x40e58ee5")
+                (ids,) = decode(["bytes32[2]"], bytes.fromhex(data[10:]))
+                assert input_values[0] == [value.hex() for value in ids]
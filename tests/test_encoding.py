@@ -0,0 +1,70 @@
+"""Echidna byte string decoding unit tests"""
+import pytest
+from fuzz_utils.utils.encoding import (
+    byte_to_escape_sequence,
+    bytes_to_echidna_byte_string,
+    parse_echidna_byte_string,
+)
+
+
+@pytest.mark.parametrize(
+    "byte_string,hex_string",
+    [
+        ("abc", "616263"),
+        ("\\SOH\\SO\\DEL", "010e7f"),
+        ("\\v\\252\\180", "0bfcb4"),
+        ("\\012", "0c"),
+        ('a\\"b', "612262"),
+        ("\\200\\&1", "c831"),
+        ("\\SO\\&H", "0e48"),
+        ("\\\\a\\&", "5c61"),
+        ("", ""),
+    ],
+)
+def test_echidna_byte_strings_are_decoded(byte_string: str, hex_string: str) -> None:
+    """Test that named, decimal, empty, and unknown escapes are decoded to the expected bytes, as Haskell reads them"""
+    assert parse_echidna_byte_string(byte_string, True) == hex_string
+    assert parse_echidna_byte_string(byte_string, False) == byte_to_escape_sequence(
+        bytes.fromhex(hex_string)
+    )
+
+
+def test_out_of_range_escape_fails() -> None:
+    """Test that decimal escapes that don't fit in a byte are rejected"""
+    with pytest.raises(ValueError):
+        parse_echidna_byte_string("\\300", True)
+    # Without `\&`, the digit is part of the decimal escape
+    with pytest.raises(ValueError):
+        parse_echidna_byte_string("\\2001", True)
+
+
+def test_unicode_escapes() -> None:
+    """Test that each byte is emitted as a unicode escape sequence"""
+    assert byte_to_escape_sequence(b"\x00a\xff") == "\\u0000\\u0061\\u00ff"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", bytes(range(256)), b'"quoted"', b"\\123", b"\x0eH\x0e\x0e1", b'\\"9\x0e0', b"\xc81\xff9"],
+)
+def test_echidna_byte_strings_are_encoded(data: bytes) -> None:
+    """Test that encoded byte strings, including escapes followed by digits or letters, decode to the same bytes"""
+    byte_string = bytes_to_echidna_byte_string(data)
+    assert byte_string.startswith('"') and byte_string.endswith('"')
+    assert parse_echidna_byte_string(byte_string.strip('"'), True) == data.hex()
+
+
+@pytest.mark.parametrize(
+    "data,byte_string",
+    [
+        (b"\xc81", '"\\200\\&1"'),
+        (b"\xc8a", '"\\200a"'),
+        (b"\x0eH", '"\\SO\\&H"'),
+        (b"\x0e1", '"\\SO1"'),
+        (b"\x001\x7f1", '"\\NUL1\\DEL1"'),
+        (b'"1\\', '"\\34\\&1\\92"'),
+    ],
+)
+def test_echidna_byte_strings_match_haskell_show(data: bytes, byte_string: str) -> None:
+    """Test that numeric escapes followed by a digit, and `\\SO` followed by `H`, are separated with `\\&` as in `show`"""
+    assert bytes_to_echidna_byte_string(data) == byte_string
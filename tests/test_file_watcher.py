@@ -0,0 +1,60 @@
+"""Corpus directory watcher unit tests"""
+import threading
+import time
+from pathlib import Path
+import pytest
+from fuzz_utils.utils import file_watcher
+from fuzz_utils.utils.file_watcher import DirectoryWatcher
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_new_files_are_detected(
+    use_inotify: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that files written to a directory created after the watcher started are detected"""
+    if use_inotify and not file_watcher.has_inotify():
+        pytest.skip("inotify is not available")
+    if not use_inotify:
+        monkeypatch.setattr(file_watcher, "INotify", None)
+
+    reproducer_dir = tmp_path / "reproducers"
+    watcher = DirectoryWatcher([str(reproducer_dir)], debounce=0.2, poll_interval=0.1, max_wait=5)
+
+    def write_reproducers() -> None:
+        reproducer_dir.mkdir()
+        for idx in range(3):
+            (reproducer_dir / f"{idx}.txt").write_text("[]")
+
+    timer = threading.Timer(0.2, write_reproducers)
+    timer.start()
+    watcher.wait_for_changes()
+    timer.join()
+    assert len(list(reproducer_dir.iterdir())) == 3
+
+
+def test_changes_are_reported_after_the_maximum_wait(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that files that keep changing don't block the watcher past the maximum wait"""
+    monkeypatch.setattr(file_watcher, "INotify", None)
+    watcher = DirectoryWatcher([str(tmp_path)], debounce=0.3, poll_interval=0.05, max_wait=0.5)
+    stop = threading.Event()
+
+    def write_files() -> None:
+        # The writer gives up eventually, so the test fails instead of hanging if the maximum wait is ignored
+        deadline = time.monotonic() + 10
+        idx = 0
+        while not stop.is_set() and time.monotonic() < deadline:
+            (tmp_path / f"{idx}.txt").write_text("[]")
+            idx += 1
+            stop.wait(0.05)
+
+    writer = threading.Thread(target=write_files)
+    writer.start()
+    start = time.monotonic()
+    try:
+        watcher.wait_for_changes()
+    finally:
+        stop.set()
+        writer.join()
+    assert time.monotonic() - start < 5
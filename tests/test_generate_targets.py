@@ -0,0 +1,24 @@
+"""Multi-target generation configuration unit tests"""
+import pytest
+from fuzz_utils.parsing.commands.generate import check_target_test_files
+
+CONFIG = {"testsDir": "test", "fuzzer": "medusa"}
+
+
+def test_targets_writing_the_same_test_files_are_rejected() -> None:
+    """Test that targets resolving to the same test directory, contract, and fuzzer are rejected"""
+    targets = [
+        {"targetContract": "Vault", "corpusDir": "medusa-corpus"},
+        {"targetContract": "Vault", "corpusDir": "echidna-corpus", "fuzzer": "echidna"},
+        {"targetContract": "Vault", "corpusDir": "other", "testsDir": "test/other"},
+    ]
+    check_target_test_files(CONFIG | {"targets": targets})
+
+    duplicate = {"targetContract": "Vault", "corpusDir": "other-corpus", "testsDir": "./test/"}
+    with pytest.raises(SystemExit):
+        check_target_test_files(CONFIG | {"targets": [*targets, duplicate]})
+    with pytest.raises(SystemExit):
+        check_target_test_files(
+            CONFIG
+            | {"targets": targets, "outputs": [{"testsDir": "test/named"}, {"testsDir": "test"}]}
+        )
@@ -0,0 +1,49 @@
+"""Test file writer unit tests"""
+from contextlib import ExitStack
+from pathlib import Path
+from fuzz_utils.generate.output_writers import SingleFileWriter, ShardedFileWriter
+from fuzz_utils.templates.foundry_templates import templates
+from fuzz_utils.templates.template_cache import get_template
+
+TEMPLATE_ARGS = {
+    "file_path": "../src/BasicTypes.sol",
+    "target_name": "BasicTypes",
+    "amount": 0,
+    "fuzzer": "Echidna",
+}
+TESTS = [f"\n    function test_auto_check_bool_{idx}() public {{}}" for idx in range(5)]
+
+
+def test_streamed_test_files_match_the_rendered_template(tmp_path: Path) -> None:
+    """Test that test files written side by side, one test at a time, match the template rendered at once"""
+    template = get_template(templates["CONTRACT"])
+    paths = [str(tmp_path / "first.t.sol"), str(tmp_path / "second.t.sol")]
+    with ExitStack() as stack:
+        writers = [SingleFileWriter(template, TEMPLATE_ARGS, path, stack) for path in paths]
+        for test in TESTS:
+            for writer in writers:
+                writer.add(test)
+        for writer in writers:
+            writer.finish()
+
+    expected = template.render(tests=TESTS, suffix="", **TEMPLATE_ARGS)
+    for path in paths:
+        assert Path(path).read_text(encoding="utf-8") == expected
+
+
+def test_shards_are_split_and_stale_shards_removed(tmp_path: Path) -> None:
+    """Test that the tests are split across shards, and that the shards of a previous run are removed"""
+    template = get_template(templates["CONTRACT"])
+    prefix = str(tmp_path / "BasicTypes_Echidna_Test_")
+    (tmp_path / "BasicTypes_Echidna_Test_3.t.sol").write_text("", encoding="utf-8")
+
+    writer = ShardedFileWriter(template, TEMPLATE_ARGS, prefix, 2)
+    for test in TESTS:
+        writer.add(test)
+    writer.finish()
+
+    assert writer.output_paths == [f"{prefix}{shard}.t.sol" for shard in range(3)]
+    assert not (tmp_path / "BasicTypes_Echidna_Test_3.t.sol").exists()
+    assert Path(writer.output_paths[2]).read_text(encoding="utf-8") == template.render(
+        tests=TESTS[4:], suffix="_2", **TEMPLATE_ARGS
+    )
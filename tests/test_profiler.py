@@ -0,0 +1,29 @@
+"""Stage profiler unit tests"""
+import time
+from fuzz_utils.utils.profiler import stage, start_profiling, stop_profiling
+
+
+def test_nested_stages_are_only_counted_once() -> None:
+    """Test that the time of a nested stage is excluded from the stage it runs in"""
+    start_profiling("generate", False)
+    with stage("write"):
+        for _ in range(2):
+            with stage("parse"):
+                time.sleep(0.02)
+    profiler = stop_profiling()
+
+    assert profiler is not None
+    write, parse = profiler.stages["write"], profiler.stages["parse"]
+    assert (write.calls, parse.calls) == (1, 2)
+    assert parse.seconds >= 0.04
+    assert write.seconds < 0.02
+    report = profiler.report()
+    assert report["otherSeconds"] >= 0
+    assert sorted(timing["name"] for timing in report["stages"]) == ["parse", "write"]
+
+
+def test_stages_are_not_timed_without_profiler() -> None:
+    """Test that the stages are no-ops when no command is profiled"""
+    with stage("parse"):
+        pass
+    assert stop_profiling() is None
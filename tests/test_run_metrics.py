@@ -0,0 +1,38 @@
+"""Test generation run metrics unit tests"""
+from collections import Counter
+from fuzz_utils.generate.run_metrics import RunMetrics, sequence_error
+from fuzz_utils.utils.error_handler import UnknownFunctionError
+
+
+def test_metrics_are_added_and_rates_derived() -> None:
+    """Test that the counts of several runs are summed, and the rates are derived from the totals"""
+    totals = RunMetrics()
+    totals.add(RunMetrics(files_scanned=3, sequences_parsed=2, parse_failures=Counter(KeyError=1)))
+    totals.add(RunMetrics(files_scanned=5, sequences_parsed=5, parse_failures=Counter(KeyError=1)))
+    totals.seconds = 0.5
+
+    report = totals.to_json()
+    assert report["filesScanned"] == 8
+    assert report["parseFailures"] == {"KeyError": 2}
+    assert report["sequencesPerSecond"] == 14
+    assert report["parseFailureRate"] == 2 / 9
+    assert RunMetrics().to_json()["parseFailureRate"] == 0
+
+
+def test_errors_are_recorded_with_their_file() -> None:
+    """Test that skipped corpus files are counted by stage and exception type, and kept for the error report"""
+    metrics = RunMetrics()
+    metrics.add_error(sequence_error("corpus/coverage/0.txt", "load", ValueError("truncated")))
+    metrics.add_error(
+        sequence_error("corpus/coverage/1.txt", "parse", UnknownFunctionError("`f` not found"))
+    )
+
+    report = metrics.to_json()
+    assert report["loadFailures"] == {"ValueError": 1}
+    assert report["parseFailures"] == {"UnknownFunctionError": 1}
+    assert report["errors"][1] == {
+        "filePath": "corpus/coverage/1.txt",
+        "stage": "parse",
+        "error": "UnknownFunctionError",
+        "message": "`f` not found",
+    }
@@ -0,0 +1,32 @@
+"""Coverage-guided call sequence selection unit tests"""
+from fuzz_utils.generate.sequence_selection import reproducer_feature, select_sequences
+
+DEPOSIT = "deposit:0xb6b55f25:0x10000"
+WITHDRAW = "withdraw:0x2e1a7d4d:0x10000"
+TRANSFER = "<transfer>::0x20000"
+
+
+def test_selection_covers_every_feature_and_reproducer() -> None:
+    """Test that the greedy selection covers all features with fewer sequences, and keeps every reproducer"""
+    sequences = [
+        [DEPOSIT],
+        [DEPOSIT, WITHDRAW],
+        [WITHDRAW],
+        [DEPOSIT, WITHDRAW, TRANSFER],
+        [DEPOSIT, reproducer_feature("corpus/reproducers/0.txt")],
+    ]
+    selected, report = select_sequences(sequences, 0)
+
+    assert selected == [3, 4]
+    assert (report.sequences, report.selected) == (5, 2)
+    assert (report.covered_features, report.features) == (3, 3)
+    assert (report.covered_reproducers, report.reproducers) == (1, 1)
+
+
+def test_selection_is_limited_by_max_tests() -> None:
+    """Test that the selection stops at the maximum number of tests, and reports the features left uncovered"""
+    sequences = [[DEPOSIT], [WITHDRAW], [TRANSFER], [DEPOSIT, WITHDRAW]]
+    selected, report = select_sequences(sequences, 1)
+
+    assert selected == [3]
+    assert (report.covered_features, report.features) == (2, 3)
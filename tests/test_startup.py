@@ -0,0 +1,26 @@
+"""Command-line startup tests"""
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+
+HEAVY_MODULES = ("slither", "crytic_compile", "eth_abi", "jinja2")
+
+
+def run_cli(arguments: list[str], cwd: Path) -> str:
+    """Runs the CLI and returns the modules it imported"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "fuzz_utils.main", *arguments],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stderr
+
+
+@pytest.mark.parametrize("arguments", [["--version"], ["init"]])
+def test_startup_skips_heavy_imports(arguments: list[str], tmp_path: Path) -> None:
+    """Test that commands which don't compile the project don't import the heavy dependencies"""
+    imported = {line.split("|")[-1].strip() for line in run_cli(arguments, tmp_path).splitlines()}
+    assert not imported & set(HEAVY_MODULES)
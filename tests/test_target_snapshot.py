@@ -0,0 +1,21 @@
+"""Target snapshot unit tests"""
+from fuzz_utils.utils.target_snapshot import (
+    ContractSnapshot,
+    ElementaryTypeSnapshot,
+    FunctionSnapshot,
+    ParameterSnapshot,
+    index_entry_points,
+)
+
+
+def test_overloaded_entry_points_are_indexed() -> None:
+    """Test that overloaded functions share a name, but are told apart by their selector"""
+    amount = ParameterSnapshot("amount", ElementaryTypeSnapshot("uint256"))
+    recipient = ParameterSnapshot("recipient", ElementaryTypeSnapshot("address"))
+    single = FunctionSnapshot("transfer", "0x12514bba", False, (amount,))
+    double = FunctionSnapshot("transfer", "0xa9059cbb", False, (recipient, amount))
+    contract = ContractSnapshot("Token", (single, double))
+
+    by_name, by_selector = index_entry_points(contract)
+    assert by_name == {"transfer": [single, double]}
+    assert by_selector == {"0x12514bba": single, "0xa9059cbb": double}